@@ -10,6 +10,8 @@ from alembic import context
 
 from app.db.engine import Base
 from app.models.currency import Currency  # noqa: F401  # ensure model is imported
+from app.models.row_count import RowCount  # noqa: F401
+from app.models.candle import Candle  # noqa: F401
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,32 @@
+"""maintained row counter for currencies
+
+Revision ID: 20251018_000002
+Revises: 20251016_000001
+Create Date: 2025-10-18
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20251018_000002"
+down_revision = "20251016_000001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "row_counts",
+        sa.Column("table_name", sa.String(length=64), primary_key=True),
+        sa.Column("value", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    op.execute(
+        "INSERT INTO row_counts (table_name, value) "
+        "SELECT 'currencies', COUNT(*) FROM currencies"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("row_counts")
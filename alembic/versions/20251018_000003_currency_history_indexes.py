@@ -0,0 +1,67 @@
+"""composite per-currency history index and BRIN on date_
+
+Revision ID: 20251018_000003
+Revises: 20251018_000002
+Create Date: 2025-10-18
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20251018_000003"
+down_revision = "20251018_000002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    is_postgres = op.get_bind().dialect.name == "postgresql"
+    # Build indexes without blocking writes on a live table
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_currencies_currency_date_id",
+            "currencies",
+            ["currency", sa.text("date_ DESC"), sa.text("id DESC")],
+            unique=False,
+            postgresql_concurrently=is_postgres,
+        )
+        if is_postgres:
+            op.create_index(
+                "ix_currencies_date_brin",
+                "currencies",
+                ["date_"],
+                unique=False,
+                postgresql_using="brin",
+                postgresql_concurrently=True,
+            )
+        # The composite index's leading column makes this one redundant
+        op.drop_index(
+            "ix_currencies_currency",
+            table_name="currencies",
+            postgresql_concurrently=is_postgres,
+        )
+
+
+def downgrade() -> None:
+    is_postgres = op.get_bind().dialect.name == "postgresql"
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_currencies_currency",
+            "currencies",
+            ["currency"],
+            unique=False,
+            postgresql_concurrently=is_postgres,
+        )
+        if is_postgres:
+            op.drop_index(
+                "ix_currencies_date_brin",
+                table_name="currencies",
+                postgresql_concurrently=True,
+            )
+        op.drop_index(
+            "ix_currencies_currency_date_id",
+            table_name="currencies",
+            postgresql_concurrently=is_postgres,
+        )
@@ -0,0 +1,129 @@
+"""range-partition currencies by date_ (Postgres only)
+
+Revision ID: 20251018_000004
+Revises: 20251018_000003
+Create Date: 2025-10-18
+
+The existing table is kept as-is and attached as the first partition
+(MINVALUE up to the next period boundary), so no rows are copied. New
+partitions are created for the following periods; the application keeps
+creating future ones (see app.db.partitions.PartitionManager).
+The unique (id, date_) index the partitioned primary key needs and a
+CHECK constraint matching the partition bound are built and validated
+on the live table first, without blocking writes, so ATTACH PARTITION
+neither builds an index nor scans the table under its lock.
+Granularity comes from PARTITION_GRANULARITY (day|month, default month).
+On other databases this revision is a no-op.
+"""
+from __future__ import annotations
+
+import os
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.partitions import create_partition_sql, next_period, period_start
+
+# revision identifiers, used by Alembic.
+revision = "20251018_000004"
+down_revision = "20251018_000003"
+branch_labels = None
+depends_on = None
+
+PREMAKE = 3
+
+_INDEXES = (
+    ("ix_currencies_date_", "(date_)"),
+    ("ix_currencies_currency_date_id", "(currency, date_ DESC, id DESC)"),
+    ("ix_currencies_date_brin", "USING brin (date_)"),
+)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    granularity = os.getenv("PARTITION_GRANULARITY", "month").lower()
+
+    max_date = None
+    if not op.get_context().as_sql:
+        max_date = bind.execute(sa.text("SELECT max(date_) FROM currencies")).scalar()
+    now = datetime.now(tz=timezone.utc).replace(tzinfo=None)
+    boundary = next_period(period_start(max(max_date or now, now), granularity), granularity)
+    bound = boundary.isoformat(sep=" ")
+
+    # Each statement commits on its own; CONCURRENTLY and VALIDATE do not block writes
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS currencies_legacy_id_date_key "
+            "ON currencies (id, date_)"
+        )
+        op.execute(
+            "ALTER TABLE currencies ADD CONSTRAINT currencies_legacy_id_date_key "
+            "UNIQUE USING INDEX currencies_legacy_id_date_key"
+        )
+        op.execute(
+            "ALTER TABLE currencies ADD CONSTRAINT currencies_legacy_bound "
+            f"CHECK (date_ IS NOT NULL AND date_ < '{bound}') NOT VALID"
+        )
+        op.execute("ALTER TABLE currencies VALIDATE CONSTRAINT currencies_legacy_bound")
+
+    op.execute("ALTER TABLE currencies RENAME TO currencies_legacy")
+    op.execute("ALTER TABLE currencies_legacy RENAME CONSTRAINT currencies_pkey TO currencies_legacy_pkey")
+    for name, _ in _INDEXES:
+        op.execute(f"ALTER INDEX {name} RENAME TO {name}_legacy")
+
+    op.execute(
+        """
+        CREATE TABLE currencies (
+            id INTEGER NOT NULL DEFAULT nextval('currencies_id_seq'::regclass),
+            currency VARCHAR(32) NOT NULL,
+            date_ TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            price NUMERIC(24, 10) NOT NULL,
+            CONSTRAINT currencies_pkey PRIMARY KEY (id, date_)
+        ) PARTITION BY RANGE (date_)
+        """
+    )
+    op.execute("ALTER SEQUENCE currencies_id_seq OWNED BY currencies.id")
+    op.execute("ALTER TABLE currencies_legacy ALTER COLUMN id DROP DEFAULT")
+    # The validated CHECK implies the bound, so no scan; the (id, date_) constraint becomes the PK's partition index
+    op.execute(
+        "ALTER TABLE currencies ATTACH PARTITION currencies_legacy "
+        f"FOR VALUES FROM (MINVALUE) TO ('{bound}')"
+    )
+    op.execute("ALTER TABLE currencies_legacy DROP CONSTRAINT currencies_legacy_bound")
+    # Matching indexes already present on the legacy partition are attached, not rebuilt
+    for name, definition in _INDEXES:
+        op.execute(f"CREATE INDEX {name} ON currencies {definition}")
+
+    start = boundary
+    for _ in range(PREMAKE):
+        op.execute(create_partition_sql(start, granularity))
+        start = next_period(start, granularity)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    op.execute("ALTER TABLE currencies RENAME TO currencies_partitioned")
+    op.execute("ALTER TABLE currencies_partitioned RENAME CONSTRAINT currencies_pkey TO currencies_partitioned_pkey")
+    for name, _ in _INDEXES:
+        op.execute(f"ALTER INDEX {name} RENAME TO {name}_partitioned")
+    op.execute(
+        """
+        CREATE TABLE currencies (
+            id INTEGER NOT NULL DEFAULT nextval('currencies_id_seq'::regclass),
+            currency VARCHAR(32) NOT NULL,
+            date_ TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            price NUMERIC(24, 10) NOT NULL,
+            CONSTRAINT currencies_pkey PRIMARY KEY (id)
+        )
+        """
+    )
+    op.execute("INSERT INTO currencies SELECT id, currency, date_, price FROM currencies_partitioned")
+    op.execute("ALTER SEQUENCE currencies_id_seq OWNED BY currencies.id")
+    op.execute("DROP TABLE currencies_partitioned CASCADE")
+    for name, definition in _INDEXES:
+        op.execute(f"CREATE INDEX {name} ON currencies {definition}")
@@ -0,0 +1,36 @@
+"""OHLC candle rollups
+
+Revision ID: 20251018_000005
+Revises: 20251018_000004
+Create Date: 2025-10-18
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20251018_000005"
+down_revision = "20251018_000004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "candles",
+        sa.Column("currency", sa.String(length=32), primary_key=True),
+        sa.Column("interval_", sa.String(length=8), primary_key=True),
+        sa.Column("bucket_start", sa.DateTime(timezone=False), primary_key=True),
+        sa.Column("open", sa.Numeric(precision=24, scale=10), nullable=False),
+        sa.Column("high", sa.Numeric(precision=24, scale=10), nullable=False),
+        sa.Column("low", sa.Numeric(precision=24, scale=10), nullable=False),
+        sa.Column("close", sa.Numeric(precision=24, scale=10), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("open_id", sa.Integer(), nullable=False),
+        sa.Column("close_id", sa.Integer(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("candles")
@@ -0,0 +1,46 @@
+"""stripe the currencies row counter across several rows
+
+Revision ID: 20251018_000006
+Revises: 20251018_000005
+Create Date: 2025-10-18
+
+Every insert used to UPDATE the single row_counts row, serializing writers
+on its row lock until commit. The counter is split into 16 stripes: writers
+bump a random one and readers sum them. The existing total stays in stripe 0.
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20251018_000006"
+down_revision = "20251018_000005"
+branch_labels = None
+depends_on = None
+
+STRIPES = 16
+
+
+def upgrade() -> None:
+    op.add_column(
+        "row_counts", sa.Column("stripe", sa.SmallInteger(), nullable=False, server_default="0")
+    )
+    op.drop_constraint("row_counts_pkey", "row_counts", type_="primary")
+    op.create_primary_key("row_counts_pkey", "row_counts", ["table_name", "stripe"])
+    op.execute(
+        "INSERT INTO row_counts (table_name, stripe, value) "
+        f"SELECT table_name, s, 0 FROM row_counts, generate_series(1, {STRIPES - 1}) AS s"
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        "UPDATE row_counts AS r SET value = t.total FROM "
+        "(SELECT table_name, SUM(value) AS total FROM row_counts GROUP BY table_name) AS t "
+        "WHERE r.table_name = t.table_name AND r.stripe = 0"
+    )
+    op.execute("DELETE FROM row_counts WHERE stripe <> 0")
+    op.drop_constraint("row_counts_pkey", "row_counts", type_="primary")
+    op.create_primary_key("row_counts_pkey", "row_counts", ["table_name"])
+    op.drop_column("row_counts", "stripe")
@@ -0,0 +1,58 @@
+"""
+Rebuild OHLC candle rollups from raw price history.
+
+Usage:
+    python -m app.commands.backfill_candles [--from 2025-10-01] [--to 2025-11-01]
+
+With RETENTION_RAW_DAYS set, only whole days after the raw cutoff are rebuilt;
+older candles may be the only copy of compacted history and are left alone.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+
+from app.config import AppConfig
+from app.db.engine import create_engine_and_sessionmaker
+from app.services.candle_service import backfill_candles
+from app.services.retention import RetentionPolicy
+from app.services.validation import DateTimeValidator
+
+
+logger = logging.getLogger(__name__)
+
+
+async def run(date_from, date_to, batch_size: int) -> int:
+    config = AppConfig.load()
+    engine, session_factory = create_engine_and_sessionmaker(config.database_url)
+    try:
+        return await backfill_candles(
+            session_factory,
+            date_from=date_from,
+            date_to=date_to,
+            batch_size=batch_size,
+            retention=RetentionPolicy(
+                raw_days=config.retention_raw_days, minute_days=config.retention_minute_days
+            ),
+        )
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild candle rollups from raw price history")
+    parser.add_argument("--from", dest="date_from", help="ISO 8601 start (inclusive, widened to whole days)")
+    parser.add_argument("--to", dest="date_to", help="ISO 8601 end (exclusive, widened to whole days)")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    date_from = DateTimeValidator.parse_utc_naive(args.date_from) if args.date_from else None
+    date_to = DateTimeValidator.parse_utc_naive(args.date_to) if args.date_to else None
+    rows = asyncio.run(run(date_from, date_to, args.batch_size))
+    logger.info(f"Candle backfill done: {rows} raw rows processed")
+
+
+if __name__ == "__main__":
+    main()
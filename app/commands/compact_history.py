@@ -0,0 +1,60 @@
+"""
+Apply the history retention policy once (for cron when COMPACTION_ENABLED=false).
+
+Usage:
+    python -m app.commands.compact_history [--raw-days 7] [--minute-days 90]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+from typing import Dict, Optional
+
+from app.config import AppConfig
+from app.db.engine import create_engine_and_sessionmaker
+from app.db.partitions import is_partitioned
+from app.services.retention import RetentionCompactor, RetentionPolicy
+
+
+logger = logging.getLogger(__name__)
+
+
+async def run(raw_days: Optional[int], minute_days: Optional[int], batch_size: Optional[int]) -> Dict[str, int]:
+    config = AppConfig.load()
+    policy = RetentionPolicy(
+        raw_days=config.retention_raw_days if raw_days is None else raw_days,
+        minute_days=config.retention_minute_days if minute_days is None else minute_days,
+    )
+    engine, session_factory = create_engine_and_sessionmaker(config.database_url)
+    try:
+        async with engine.connect() as conn:
+            partitioned = await is_partitioned(conn)
+        compactor = RetentionCompactor(
+            session_factory,
+            policy,
+            batch_size=batch_size or config.compaction_batch_size,
+            pause_seconds=config.compaction_pause_ms / 1000,
+            partitioned=lambda: partitioned,
+        )
+        return await compactor.compact()
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Delete price history past its retention")
+    parser.add_argument("--raw-days", type=int, help="Days of raw rows to keep (default RETENTION_RAW_DAYS)")
+    parser.add_argument(
+        "--minute-days", type=int, help="Days of 1m/5m candles to keep (default RETENTION_MINUTE_DAYS)"
+    )
+    parser.add_argument("--batch-size", type=int)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    deleted = asyncio.run(run(args.raw_days, args.minute_days, args.batch_size))
+    logger.info(f"History compaction done: {deleted['raw']} raw rows, {deleted['minute_candles']} minute candles")
+
+
+if __name__ == "__main__":
+    main()
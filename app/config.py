@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import json
 import os
 from dataclasses import dataclass
-from typing import Optional
+from typing import Mapping, Optional, Tuple
 
 from dotenv import load_dotenv
 
@@ -16,6 +17,72 @@ class AppConfig:
     enable_uvloop: bool = True
     env: str = "development"
     run_create_all: bool = True
+    exchanges: Tuple[str, ...] = ("kucoin",)
+    exchange_symbol_map: Optional[Mapping[str, Mapping[str, str]]] = None
+    exchange_hedge_percentile: float = 0.95
+    exchange_hedge_delay_ms: int = 200
+    exchange_hedge_min_delay_ms: int = 20
+    exchange_timeout_ms: int = 5000
+    exchange_breaker_failures: int = 5
+    exchange_breaker_reset_ms: int = 10000
+    exchange_concurrency_initial: int = 10
+    exchange_concurrency_max: int = 100
+    exchange_queue_size: int = 100
+    exchange_queue_timeout_ms: int = 1000
+    exchange_latency_target_ms: int = 1000
+    exchange_serve_stale_ms: int = 0
+    exchange_http_limit: int = 100
+    exchange_http_limit_per_host: int = 20
+    exchange_http_keepalive_ms: int = 30000
+    exchange_http_dns_cache_ttl_ms: int = 300000
+    exchange_http_timeout_ms: int = 10000
+    symbol_negative_cache_size: int = 10000
+    symbol_negative_cache_ttl_ms: int = 600000
+    markets_warmup_enabled: bool = True
+    # Keep well below gunicorn's worker timeout (30s): the worker sends no heartbeat until warm-up ends
+    markets_warmup_timeout_ms: int = 10000
+    markets_snapshot_dir: Optional[str] = None
+    markets_snapshot_max_age_ms: int = 3600000
+    markets_refresh_interval_ms: int = 3600000
+    ticker_cache_ttl_ms: int = 1000
+    ticker_cache_max_size: int = 1024
+    price_stream_symbols: Tuple[str, ...] = ()
+    price_stream_url: Optional[str] = None
+    price_stream_stale_ms: int = 5000
+    write_behind_enabled: bool = False
+    write_behind_ack: str = "flush"
+    write_behind_interval_ms: int = 50
+    write_behind_max_batch: int = 500
+    write_behind_queue_size: int = 10000
+    candle_rollup_interval_ms: int = 1000
+    history_total_mode: str = "counter"
+    history_cache_size: int = 256
+    history_cache_max_bytes: int = 8 * 1024 * 1024
+    history_cache_ttl_ms: int = 5000
+    purge_batch_size: int = 5000
+    purge_pause_ms: int = 50
+    retention_raw_days: int = 0
+    retention_minute_days: int = 0
+    compaction_enabled: bool = True
+    compaction_interval_ms: int = 3600000
+    compaction_batch_size: int = 5000
+    compaction_pause_ms: int = 50
+    recent_prices_capacity: int = 4096
+    recent_prices_max_currencies: int = 1024
+    recent_prices_warmup_ms: int = 3600000
+    web_concurrency: int = 1
+    health_probe_interval_ms: int = 5000
+    health_probe_timeout_ms: int = 2000
+    partition_granularity: str = "month"
+    partition_premake: int = 3
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = -1
+    db_pool_pre_ping: bool = False
+    db_statement_cache_size: int = 100
+    metrics_shm_path: Optional[str] = None
+    metrics_shm_slot: Optional[int] = None
 
     @staticmethod
     def load(env_file: Optional[str] = None) -> "AppConfig":
@@ -27,6 +94,78 @@ class AppConfig:
         enable_uvloop = os.getenv("ENABLE_UVLOOP", "true").lower() in {"1", "true", "yes"}
         env = os.getenv("ENV", "development").lower()
         run_create_all = os.getenv("RUN_CREATE_ALL", "").lower() in {"1", "true", "yes"}
+        exchanges = tuple(
+            e.strip().lower() for e in os.getenv("EXCHANGES", "kucoin").split(",") if e.strip()
+        ) or ("kucoin",)
+        # JSON: {"exchange": {"CURRENCY": "SYMBOL"}} for listings that are not CURRENCY/USDT
+        exchange_symbol_map = json.loads(os.getenv("EXCHANGE_SYMBOL_MAP") or "{}") or None
+        exchange_hedge_percentile = float(os.getenv("EXCHANGE_HEDGE_PERCENTILE", "0.95"))
+        exchange_hedge_delay_ms = int(os.getenv("EXCHANGE_HEDGE_DELAY_MS", "200"))
+        exchange_hedge_min_delay_ms = int(os.getenv("EXCHANGE_HEDGE_MIN_DELAY_MS", "20"))
+        exchange_timeout_ms = int(os.getenv("EXCHANGE_TIMEOUT_MS", "5000"))
+        exchange_breaker_failures = int(os.getenv("EXCHANGE_BREAKER_FAILURES", "5"))
+        exchange_breaker_reset_ms = int(os.getenv("EXCHANGE_BREAKER_RESET_MS", "10000"))
+        exchange_concurrency_initial = int(os.getenv("EXCHANGE_CONCURRENCY_INITIAL", "10"))
+        exchange_concurrency_max = int(os.getenv("EXCHANGE_CONCURRENCY_MAX", "100"))
+        exchange_queue_size = int(os.getenv("EXCHANGE_QUEUE_SIZE", "100"))
+        exchange_queue_timeout_ms = int(os.getenv("EXCHANGE_QUEUE_TIMEOUT_MS", "1000"))
+        exchange_latency_target_ms = int(os.getenv("EXCHANGE_LATENCY_TARGET_MS", "1000"))
+        exchange_serve_stale_ms = int(os.getenv("EXCHANGE_SERVE_STALE_MS", "0"))
+        exchange_http_limit = int(os.getenv("EXCHANGE_HTTP_LIMIT", "100"))
+        exchange_http_limit_per_host = int(os.getenv("EXCHANGE_HTTP_LIMIT_PER_HOST", "20"))
+        exchange_http_keepalive_ms = int(os.getenv("EXCHANGE_HTTP_KEEPALIVE_MS", "30000"))
+        exchange_http_dns_cache_ttl_ms = int(os.getenv("EXCHANGE_HTTP_DNS_CACHE_TTL_MS", "300000"))
+        exchange_http_timeout_ms = int(os.getenv("EXCHANGE_HTTP_TIMEOUT_MS", "10000"))
+        symbol_negative_cache_size = int(os.getenv("SYMBOL_NEGATIVE_CACHE_SIZE", "10000"))
+        symbol_negative_cache_ttl_ms = int(os.getenv("SYMBOL_NEGATIVE_CACHE_TTL_MS", "600000"))
+        markets_warmup_enabled = os.getenv("MARKETS_WARMUP_ENABLED", "true").lower() in {"1", "true", "yes"}
+        markets_warmup_timeout_ms = int(os.getenv("MARKETS_WARMUP_TIMEOUT_MS", "10000"))
+        markets_snapshot_dir = os.getenv("MARKETS_SNAPSHOT_DIR") or None
+        markets_snapshot_max_age_ms = int(os.getenv("MARKETS_SNAPSHOT_MAX_AGE_MS", "3600000"))
+        markets_refresh_interval_ms = int(os.getenv("MARKETS_REFRESH_INTERVAL_MS", "3600000"))
+        ticker_cache_ttl_ms = int(os.getenv("TICKER_CACHE_TTL_MS", "1000"))
+        ticker_cache_max_size = int(os.getenv("TICKER_CACHE_MAX_SIZE", "1024"))
+        price_stream_symbols = tuple(
+            s.strip().upper() for s in os.getenv("PRICE_STREAM_SYMBOLS", "").split(",") if s.strip()
+        )
+        price_stream_url = os.getenv("PRICE_STREAM_URL") or None
+        price_stream_stale_ms = int(os.getenv("PRICE_STREAM_STALE_MS", "5000"))
+        write_behind_enabled = os.getenv("WRITE_BEHIND_ENABLED", "").lower() in {"1", "true", "yes"}
+        write_behind_ack = os.getenv("WRITE_BEHIND_ACK", "flush").lower()
+        write_behind_interval_ms = int(os.getenv("WRITE_BEHIND_INTERVAL_MS", "50"))
+        write_behind_max_batch = int(os.getenv("WRITE_BEHIND_MAX_BATCH", "500"))
+        write_behind_queue_size = int(os.getenv("WRITE_BEHIND_QUEUE_SIZE", "10000"))
+        candle_rollup_interval_ms = int(os.getenv("CANDLE_ROLLUP_INTERVAL_MS", "1000"))
+        history_total_mode = os.getenv("HISTORY_TOTAL_MODE", "counter").lower()
+        history_cache_size = int(os.getenv("HISTORY_CACHE_SIZE", "256"))
+        history_cache_max_bytes = int(os.getenv("HISTORY_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+        history_cache_ttl_ms = int(os.getenv("HISTORY_CACHE_TTL_MS", "5000"))
+        purge_batch_size = int(os.getenv("PURGE_BATCH_SIZE", "5000"))
+        purge_pause_ms = int(os.getenv("PURGE_PAUSE_MS", "50"))
+        retention_raw_days = int(os.getenv("RETENTION_RAW_DAYS", "0"))
+        retention_minute_days = int(os.getenv("RETENTION_MINUTE_DAYS", "0"))
+        compaction_enabled = os.getenv("COMPACTION_ENABLED", "true").lower() in {"1", "true", "yes"}
+        compaction_interval_ms = int(os.getenv("COMPACTION_INTERVAL_MS", "3600000"))
+        compaction_batch_size = int(os.getenv("COMPACTION_BATCH_SIZE", "5000"))
+        compaction_pause_ms = int(os.getenv("COMPACTION_PAUSE_MS", "50"))
+        recent_prices_capacity = int(os.getenv("RECENT_PRICES_CAPACITY", "4096"))
+        recent_prices_max_currencies = int(os.getenv("RECENT_PRICES_MAX_CURRENCIES", "1024"))
+        recent_prices_warmup_ms = int(os.getenv("RECENT_PRICES_WARMUP_MS", "3600000"))
+        # Number of app processes writing prices (gunicorn exports its worker count)
+        web_concurrency = int(os.getenv("WEB_CONCURRENCY", "1"))
+        health_probe_interval_ms = int(os.getenv("HEALTH_PROBE_INTERVAL_MS", "5000"))
+        health_probe_timeout_ms = int(os.getenv("HEALTH_PROBE_TIMEOUT_MS", "2000"))
+        partition_granularity = os.getenv("PARTITION_GRANULARITY", "month").lower()
+        partition_premake = int(os.getenv("PARTITION_PREMAKE", "3"))
+        db_pool_size = int(os.getenv("DB_POOL_SIZE", "5"))
+        db_max_overflow = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+        db_pool_timeout = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+        db_pool_recycle = int(os.getenv("DB_POOL_RECYCLE", "-1"))
+        db_pool_pre_ping = os.getenv("DB_POOL_PRE_PING", "").lower() in {"1", "true", "yes"}
+        db_statement_cache_size = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+        # Set by the gunicorn hooks for each worker; unset means single-process metrics
+        metrics_shm_path = os.getenv("METRICS_SHM_PATH") or None
+        metrics_shm_slot = int(os.environ["METRICS_SHM_SLOT"]) if os.getenv("METRICS_SHM_SLOT") else None
         return AppConfig(
             database_url=database_url,
             host=host,
@@ -35,4 +174,69 @@ class AppConfig:
             enable_uvloop=enable_uvloop,
             env=env,
             run_create_all=run_create_all,
+            exchanges=exchanges,
+            exchange_symbol_map=exchange_symbol_map,
+            exchange_hedge_percentile=exchange_hedge_percentile,
+            exchange_hedge_delay_ms=exchange_hedge_delay_ms,
+            exchange_hedge_min_delay_ms=exchange_hedge_min_delay_ms,
+            exchange_timeout_ms=exchange_timeout_ms,
+            exchange_breaker_failures=exchange_breaker_failures,
+            exchange_breaker_reset_ms=exchange_breaker_reset_ms,
+            exchange_concurrency_initial=exchange_concurrency_initial,
+            exchange_concurrency_max=exchange_concurrency_max,
+            exchange_queue_size=exchange_queue_size,
+            exchange_queue_timeout_ms=exchange_queue_timeout_ms,
+            exchange_latency_target_ms=exchange_latency_target_ms,
+            exchange_serve_stale_ms=exchange_serve_stale_ms,
+            exchange_http_limit=exchange_http_limit,
+            exchange_http_limit_per_host=exchange_http_limit_per_host,
+            exchange_http_keepalive_ms=exchange_http_keepalive_ms,
+            exchange_http_dns_cache_ttl_ms=exchange_http_dns_cache_ttl_ms,
+            exchange_http_timeout_ms=exchange_http_timeout_ms,
+            symbol_negative_cache_size=symbol_negative_cache_size,
+            symbol_negative_cache_ttl_ms=symbol_negative_cache_ttl_ms,
+            markets_warmup_enabled=markets_warmup_enabled,
+            markets_warmup_timeout_ms=markets_warmup_timeout_ms,
+            markets_snapshot_dir=markets_snapshot_dir,
+            markets_snapshot_max_age_ms=markets_snapshot_max_age_ms,
+            markets_refresh_interval_ms=markets_refresh_interval_ms,
+            ticker_cache_ttl_ms=ticker_cache_ttl_ms,
+            ticker_cache_max_size=ticker_cache_max_size,
+            price_stream_symbols=price_stream_symbols,
+            price_stream_url=price_stream_url,
+            price_stream_stale_ms=price_stream_stale_ms,
+            write_behind_enabled=write_behind_enabled,
+            write_behind_ack=write_behind_ack,
+            write_behind_interval_ms=write_behind_interval_ms,
+            write_behind_max_batch=write_behind_max_batch,
+            write_behind_queue_size=write_behind_queue_size,
+            candle_rollup_interval_ms=candle_rollup_interval_ms,
+            history_total_mode=history_total_mode,
+            history_cache_size=history_cache_size,
+            history_cache_max_bytes=history_cache_max_bytes,
+            history_cache_ttl_ms=history_cache_ttl_ms,
+            purge_batch_size=purge_batch_size,
+            purge_pause_ms=purge_pause_ms,
+            retention_raw_days=retention_raw_days,
+            retention_minute_days=retention_minute_days,
+            compaction_enabled=compaction_enabled,
+            compaction_interval_ms=compaction_interval_ms,
+            compaction_batch_size=compaction_batch_size,
+            compaction_pause_ms=compaction_pause_ms,
+            recent_prices_capacity=recent_prices_capacity,
+            recent_prices_max_currencies=recent_prices_max_currencies,
+            recent_prices_warmup_ms=recent_prices_warmup_ms,
+            web_concurrency=web_concurrency,
+            health_probe_interval_ms=health_probe_interval_ms,
+            health_probe_timeout_ms=health_probe_timeout_ms,
+            partition_granularity=partition_granularity,
+            partition_premake=partition_premake,
+            db_pool_size=db_pool_size,
+            db_max_overflow=db_max_overflow,
+            db_pool_timeout=db_pool_timeout,
+            db_pool_recycle=db_pool_recycle,
+            db_pool_pre_ping=db_pool_pre_ping,
+            db_statement_cache_size=db_statement_cache_size,
+            metrics_shm_path=metrics_shm_path,
+            metrics_shm_slot=metrics_shm_slot,
         )
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from aiohttp import web
+
+from app.services.candle_service import CandleService
+from app.services.serialization import json_response
+from app.services.validation import CurrencyValidator, DateTimeValidator
+
+
+class CandleController:
+    def __init__(self, candle_service: CandleService) -> None:
+        self._candles = candle_service
+
+    async def get_candles(self, request: web.Request) -> web.Response:
+        query = request.rel_url.query
+        interval = query.get("interval", "1m")
+        try:
+            currency = CurrencyValidator.normalize_and_validate(request.match_info.get("currency", ""))
+            date_from = DateTimeValidator.parse_utc_naive(query["from"]) if query.get("from") else None
+            date_to = DateTimeValidator.parse_utc_naive(query["to"]) if query.get("to") else None
+            limit = int(query.get("limit", "500"))
+            candles = await self._candles.get_candles(
+                currency=currency,
+                interval=interval,
+                date_from=date_from,
+                date_to=date_to,
+                limit=limit,
+            )
+        except ValueError as e:
+            return json_response(
+                {"status": "error", "message": str(e) or "invalid request"},
+                status=400
+            )
+        return json_response({
+            "status": "ok",
+            "data": {"currency": currency.lower(), "interval": interval, "candles": candles},
+        })
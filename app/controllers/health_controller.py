@@ -1,27 +1,34 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from aiohttp import web
 from sqlalchemy import text
 
+from app.services.health_prober import HealthProber
+from app.services.serialization import json_response
+
 
 class HealthController:
-    def __init__(self, session_factory) -> None:
+    def __init__(self, session_factory, prober: Optional[HealthProber] = None) -> None:
         self._session_factory = session_factory
+        self._prober = prober
 
     async def check(self, request: web.Request) -> web.Response:
         """
         Health check endpoint.
-        
+
         Returns application health status including database connectivity.
+        Served from the background prober's cached result when one is running.
         """
         health_data: Dict[str, Any] = {
             "status": "ok",
             "timestamp": datetime.now(tz=timezone.utc).isoformat(),
         }
-        
+        if self._prober is not None:
+            return self._cached_check(health_data)
+
         try:
             async with self._session_factory() as session:
                 result = await session.execute(text("SELECT 1"))
@@ -30,6 +37,35 @@ class HealthController:
         except Exception as e:
             health_data["status"] = "degraded"
             health_data["database"] = f"error: {str(e)}"
-            return web.json_response(health_data, status=503)
-        
-        return web.json_response(health_data)
+            return json_response(health_data, status=503)
+
+        return json_response(health_data)
+
+    def _cached_check(self, health_data: Dict[str, Any]) -> web.Response:
+        # Same status values and meaning as the direct check: degraded means the
+        # database is not known to be reachable. Probe details are extra fields.
+        result = self._prober.result()
+        if result is None:
+            health_data.update(status="degraded", database="error: first health probe pending")
+            return json_response(health_data, status=503)
+        health_data.update(
+            database=result["database"],
+            exchanges=result["exchanges"],
+            checked_at=result["checked_at"],
+            age_seconds=result["age_seconds"],
+        )
+        if not result["ready"]:
+            health_data["status"] = "degraded"
+            return json_response(health_data, status=503)
+        return json_response(health_data)
+
+    async def live(self, request: web.Request) -> web.Response:
+        """Liveness: the event loop is serving requests. Does no I/O."""
+        return json_response({"status": "ok"})
+
+    async def ready(self, request: web.Request) -> web.Response:
+        """Readiness: the last cached probe result and its age; 503 until the first probe or when stale."""
+        result = self._prober.result() if self._prober is not None else None
+        if result is None:
+            return json_response({"status": "starting", "ready": False}, status=503)
+        return json_response(result, status=200 if result["ready"] else 503)
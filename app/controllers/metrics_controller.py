@@ -3,6 +3,7 @@ from __future__ import annotations
 from aiohttp import web
 
 from app.services.metrics_service import MetricsService
+from app.services.serialization import json_response
 
 
 class MetricsController:
@@ -15,7 +16,22 @@ class MetricsController:
         """
         Get application metrics.
         
-        Returns metrics in JSON format suitable for monitoring systems.
+        Returns metrics in JSON format suitable for monitoring systems, or in
+        Prometheus text format when requested via ``?format=prometheus`` or an
+        ``Accept`` header asking for ``text/plain``/OpenMetrics.
         """
+        if self._wants_prometheus(request):
+            return web.Response(
+                text=self._metrics_service.render_prometheus(),
+                content_type="text/plain",
+                headers={"X-Metrics-Format": "prometheus-0.0.4"},
+            )
         metrics_data = self._metrics_service.get_metrics()
-        return web.json_response(metrics_data)
+        return json_response(metrics_data)
+
+    @staticmethod
+    def _wants_prometheus(request: web.Request) -> bool:
+        if request.query.get("format") == "prometheus":
+            return True
+        accept = request.headers.get("Accept", "")
+        return "text/plain" in accept or "application/openmetrics-text" in accept
@@ -1,45 +1,305 @@
 from __future__ import annotations
 
+import logging
+from contextlib import aclosing
+from datetime import timedelta
+from typing import Optional
+
 from aiohttp import web
 
 from app.services.exchange_service import ExchangeService
+from app.services.history_cache import HistoryCache
+from app.services.history_export import EXPORT_FORMATS
+from app.services.price_writer import WriteBufferFull
+from app.services.purge_jobs import PurgeJobManager
+from app.services.recent_prices import RecentPrices, utc_now
+from app.services.resilience import ExchangeUnavailable
+from app.services.serialization import json_response
 from app.services.currency_service import CurrencyService
-from app.services.validation import CurrencyValidator
+from app.services.validation import CurrencyValidator, DateTimeValidator, DurationValidator
+from app.repositories.currency_repository import HistoryFilter
+
+
+logger = logging.getLogger(__name__)
 
 
 class PriceController:
-    def __init__(self, exchange_service: ExchangeService, currency_service: CurrencyService) -> None:
+    MAX_BATCH_SIZE = 50
+
+    def __init__(
+        self,
+        exchange_service: ExchangeService,
+        currency_service: CurrencyService,
+        history_cache: Optional[HistoryCache] = None,
+        purge_jobs: Optional[PurgeJobManager] = None,
+        recent_prices: Optional[RecentPrices] = None,
+    ) -> None:
         self._exchange = exchange_service
         self._currency = currency_service
+        self._history_cache = history_cache
+        self._purge_jobs = purge_jobs
+        self._recent_prices = recent_prices
 
     async def get_price(self, request: web.Request) -> web.Response:
         raw = request.match_info.get("currency", "")
         try:
             currency_norm = CurrencyValidator.normalize_and_validate(raw)
         except ValueError as e:
-            return web.json_response(
+            return json_response(
                 {"status": "error", "message": str(e) or "invalid currency"},
                 status=400
             )
         try:
             bid = await self._exchange.get_bid_price_usdt_pair(currency_norm)
         except ValueError as e:
-            return web.json_response(
+            return json_response(
                 {"status": "error", "message": str(e) or "currency not found"},
                 status=400
             )
-        data = await self._currency.record_current_price(currency=currency_norm, price=bid)
-        return web.json_response({"status": "ok", "data": data})
+        except ExchangeUnavailable as e:
+            return self._stale_price_or_unavailable(currency_norm, e)
+        try:
+            data = await self._currency.record_current_price(currency=currency_norm, price=bid)
+        except WriteBufferFull as e:
+            return json_response(
+                {"status": "error", "message": str(e)},
+                status=503
+            )
+        return json_response({"status": "ok", "data": data})
+
+    async def get_recent_prices(self, request: web.Request) -> web.Response:
+        if self._recent_prices is None:
+            return json_response(
+                {"status": "error", "message": "recent prices are disabled"},
+                status=404
+            )
+        try:
+            currency_norm = CurrencyValidator.normalize_and_validate(request.match_info.get("currency", ""))
+            window = DurationValidator.parse_seconds(request.rel_url.query.get("window", "300"))
+        except ValueError as e:
+            return json_response(
+                {"status": "error", "message": str(e) or "invalid request"},
+                status=400
+            )
+        prices, complete = self._recent_prices.window(currency_norm, utc_now() - timedelta(seconds=window))
+        return json_response({
+            "status": "ok",
+            "data": {
+                "currency": currency_norm.lower(),
+                "window_seconds": window,
+                "complete": complete,
+                "prices": prices,
+            },
+        })
+
+    def _stale_price_or_unavailable(self, currency: str, error: ExchangeUnavailable) -> web.Response:
+        stale = self._exchange.get_stale_bid(currency)
+        if stale is None:
+            logger.warning(f"Exchange unavailable for {currency}: {error}")
+            return json_response(
+                {"status": "error", "message": str(error) or "exchange unavailable"},
+                status=503,
+                headers={"Retry-After": "1"},
+            )
+        bid, age = stale
+        # Not recorded: the bid is not a current observation
+        return json_response(
+            {
+                "status": "ok",
+                "stale": True,
+                "data": {"currency": currency, "price": str(bid), "age_seconds": round(age, 3)},
+            },
+            headers={"Warning": '110 - "Response is Stale"'},
+        )
+
+    async def get_prices(self, request: web.Request) -> web.Response:
+        raw = request.rel_url.query.get("currencies", "")
+        candidates = [c for c in raw.split(",") if c.strip()]
+        if not candidates:
+            return json_response(
+                {"status": "error", "message": "currencies parameter is required"},
+                status=400
+            )
+        if len(candidates) > self.MAX_BATCH_SIZE:
+            return json_response(
+                {"status": "error", "message": f"at most {self.MAX_BATCH_SIZE} currencies per request"},
+                status=400
+            )
+
+        errors = []
+        currencies = []
+        for candidate in candidates:
+            try:
+                currency_norm = CurrencyValidator.normalize_and_validate(candidate)
+            except ValueError as e:
+                errors.append({"currency": candidate.strip(), "message": str(e) or "invalid currency"})
+                continue
+            if currency_norm not in currencies:
+                currencies.append(currency_norm)
+
+        prices, fetch_errors = await self._exchange.get_bid_prices_usdt_pairs(currencies)
+        errors.extend({"currency": c, "message": m} for c, m in fetch_errors.items())
+        if not prices:
+            return json_response(
+                {"status": "error", "message": "no prices fetched", "errors": errors},
+                status=400
+            )
+        data = await self._currency.record_current_prices(prices)
+        return json_response({"status": "ok", "data": data, "errors": errors})
 
     async def get_history(self, request: web.Request) -> web.Response:
+        cache = self._history_cache
+        if cache is None:
+            return await self._get_history(request)
+        key = cache.key(request.rel_url.query)
+        cached = cache.get(key)
+        if cached is not None:
+            etag, body = cached
+            if self._etag_matches(request, etag):
+                cache.record_not_modified()
+                return web.Response(status=304, headers={"ETag": etag})
+            return web.Response(body=body, content_type="application/json", headers={"ETag": etag})
+
+        generation = cache.generation
+        response = await self._get_history(request)
+        if response.status != 200:
+            return response
+        etag = cache.put(key, response.body, generation)
+        if self._etag_matches(request, etag):
+            cache.record_not_modified()
+            return web.Response(status=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        return response
+
+    @staticmethod
+    def _etag_matches(request: web.Request, etag: str) -> bool:
+        candidates = request.if_none_match
+        if not candidates:
+            return False
+        value = etag.strip('"')
+        return any(c.value == value or c.value == "*" for c in candidates)
+
+    async def _get_history(self, request: web.Request) -> web.Response:
+        try:
+            flt = self._parse_history_filter(request)
+        except ValueError as e:
+            return json_response(
+                {"status": "error", "message": str(e) or "invalid filter"},
+                status=400
+            )
+        if "cursor" in request.rel_url.query:
+            return await self._get_history_by_cursor(request, flt)
         page_str = request.rel_url.query.get("page", "1")
         try:
             page = int(page_str)
         except ValueError:
             page = 1
-        page_data = await self._currency.get_history(page=page)
-        return web.json_response({"status": "ok", "data": page_data.__dict__})
+        include_total = request.rel_url.query.get("include_total", "true").lower() not in {"0", "false", "no"}
+        page_data = await self._currency.get_history(page=page, include_total=include_total, flt=flt)
+        return json_response({"status": "ok", "data": page_data.__dict__})
+
+    async def _get_history_by_cursor(self, request: web.Request, flt: HistoryFilter) -> web.Response:
+        cursor = request.rel_url.query.get("cursor") or None
+        try:
+            page_data = await self._currency.get_history_after(cursor=cursor, flt=flt)
+        except ValueError as e:
+            return json_response(
+                {"status": "error", "message": str(e) or "invalid cursor"},
+                status=400
+            )
+        return json_response({"status": "ok", "data": page_data.__dict__})
+
+    @staticmethod
+    def _parse_history_filter(request: web.Request) -> HistoryFilter:
+        query = request.rel_url.query
+        currency = query.get("currency")
+        date_from = query.get("from")
+        date_to = query.get("to")
+        return HistoryFilter(
+            currency=CurrencyValidator.normalize_and_validate(currency).lower() if currency else None,
+            date_from=DateTimeValidator.parse_utc_naive(date_from) if date_from else None,
+            date_to=DateTimeValidator.parse_utc_naive(date_to) if date_to else None,
+        )
+
+    async def export_history(self, request: web.Request) -> web.StreamResponse:
+        fmt = request.rel_url.query.get("format", "ndjson").lower()
+        if fmt not in EXPORT_FORMATS:
+            return json_response(
+                {"status": "error", "message": f"format must be one of: {', '.join(EXPORT_FORMATS)}"},
+                status=400
+            )
+        try:
+            flt = self._parse_history_filter(request)
+        except ValueError as e:
+            return json_response(
+                {"status": "error", "message": str(e) or "invalid filter"},
+                status=400
+            )
+
+        content_type, header, formatter = EXPORT_FORMATS[fmt]
+        response = web.StreamResponse(
+            headers={
+                "Content-Type": f"{content_type}; charset=utf-8",
+                "Content-Disposition": f'attachment; filename="price_history.{fmt}"',
+            }
+        )
+        response.enable_chunked_encoding()
+        await response.prepare(request)
+        if header:
+            await response.write(header.encode())
+
+        rows = 0
+        try:
+            # aclosing closes the server-side cursor as soon as the loop exits, not at GC time
+            async with aclosing(self._currency.stream_history(flt=flt)) as batches:
+                async for batch in batches:
+                    await response.write(formatter(batch).encode())
+                    rows += len(batch)
+        except ConnectionResetError:
+            # Client went away; the cursor and its connection are already released
+            logger.info(f"History export cancelled by client after {rows} rows")
+            return response
+        await response.write_eof()
+        logger.info(f"Exported {rows} history rows as {fmt}")
+        return response
 
     async def delete_history(self, request: web.Request) -> web.Response:
-        deleted = await self._currency.delete_all()
-        return web.json_response({"status": "ok", "deleted": deleted})
+        if self._purge_jobs is None:
+            deleted = await self._currency.delete_all()
+            if self._recent_prices is not None:
+                self._recent_prices.clear()
+            return json_response({"status": "ok", "deleted": deleted})
+        query = request.rel_url.query
+        currency = query.get("currency")
+        before = query.get("before")
+        try:
+            flt = HistoryFilter(
+                currency=CurrencyValidator.normalize_and_validate(currency).lower() if currency else None,
+                date_to=DateTimeValidator.parse_utc_naive(before) if before else None,
+            )
+        except ValueError as e:
+            return json_response(
+                {"status": "error", "message": str(e) or "invalid filter"},
+                status=400
+            )
+        job = self._purge_jobs.submit(flt)
+        if self._recent_prices is not None:
+            # Purged ticks must not keep being served from memory
+            if flt.date_to is None:
+                self._recent_prices.clear(flt.currency)
+            else:
+                self._recent_prices.drop_before(flt.date_to, flt.currency)
+        return json_response(
+            {"status": "accepted", "job": job.to_dict()},
+            status=202,
+            headers={"Location": f"/price/history/purge/{job.id}"},
+        )
+
+    async def get_purge_status(self, request: web.Request) -> web.Response:
+        job = self._purge_jobs.get(request.match_info.get("job_id", "")) if self._purge_jobs else None
+        if job is None:
+            return json_response(
+                {"status": "error", "message": "purge job not found"},
+                status=404
+            )
+        return json_response({"status": "ok", "job": job.to_dict()})
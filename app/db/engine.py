@@ -1,17 +1,42 @@
 from __future__ import annotations
 
-from typing import AsyncIterator
+from typing import Any, AsyncIterator, Dict
 
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
+from app.db.pool_metrics import InstrumentedQueuePool
+
 
 class Base(DeclarativeBase):
     pass
 
 
-def create_engine_and_sessionmaker(database_url: str):
-    engine = create_async_engine(database_url, echo=False, future=True)
+def create_engine_and_sessionmaker(
+    database_url: str,
+    pool_size: int = 5,
+    max_overflow: int = 10,
+    pool_timeout: float = 30.0,
+    pool_recycle: int = -1,
+    pool_pre_ping: bool = False,
+    statement_cache_size: int = 100,
+):
+    url = make_url(database_url)
+    kwargs: Dict[str, Any] = {}
+    if url.get_backend_name() != "sqlite":
+        # SQLite uses a static/null pool; queue pool sizing only applies elsewhere
+        kwargs.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
+            pool_recycle=pool_recycle,
+            pool_pre_ping=pool_pre_ping,
+        )
+    if url.get_driver_name() == "asyncpg":
+        kwargs["connect_args"] = {"prepared_statement_cache_size": statement_cache_size}
+    engine = create_async_engine(database_url, echo=False, future=True, **kwargs)
     SessionLocal = async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
     return engine, SessionLocal
 
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "currencies"
+GRANULARITIES = ("day", "month")
+
+_UPPER_BOUND_RE = re.compile(r"TO \('([^']+)'\)")
+
+
+def period_start(value: datetime, granularity: str) -> datetime:
+    if granularity == "day":
+        return value.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == "month":
+        return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"unsupported partition granularity: {granularity}")
+
+
+def next_period(start: datetime, granularity: str) -> datetime:
+    if granularity == "day":
+        return datetime.fromordinal(start.toordinal() + 1)
+    if granularity == "month":
+        if start.month == 12:
+            return start.replace(year=start.year + 1, month=1)
+        return start.replace(month=start.month + 1)
+    raise ValueError(f"unsupported partition granularity: {granularity}")
+
+
+def partition_name(start: datetime, granularity: str) -> str:
+    suffix = start.strftime("%Y%m%d" if granularity == "day" else "%Y%m")
+    return f"{PARENT_TABLE}_p{suffix}"
+
+
+def create_partition_sql(start: datetime, granularity: str) -> str:
+    end = next_period(start, granularity)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(start, granularity)} "
+        f"PARTITION OF {PARENT_TABLE} "
+        f"FOR VALUES FROM ('{start.isoformat(sep=' ')}') TO ('{end.isoformat(sep=' ')}')"
+    )
+
+
+def parse_upper_bound(bound_expr: str) -> Optional[datetime]:
+    """Upper bound of a range partition from pg_get_expr(relpartbound), None for DEFAULT/MAXVALUE."""
+    match = _UPPER_BOUND_RE.search(bound_expr or "")
+    if match is None:
+        return None
+    return datetime.fromisoformat(match.group(1))
+
+
+async def is_partitioned(conn: AsyncConnection) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    result = await conn.execute(
+        text(
+            "SELECT 1 FROM pg_partitioned_table "
+            "WHERE partrelid = to_regclass(:name)"
+        ),
+        {"name": PARENT_TABLE},
+    )
+    return result.scalar_one_or_none() is not None
+
+
+async def list_partitions(conn: AsyncConnection) -> List[Tuple[str, Optional[datetime]]]:
+    """Return (partition name, upper bound) pairs ordered by name."""
+    result = await conn.execute(
+        text(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+            "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:name) ORDER BY c.relname"
+        ),
+        {"name": PARENT_TABLE},
+    )
+    return [(name, parse_upper_bound(bound)) for name, bound in result.all()]
+
+
+class PartitionManager:
+    """
+    Creates upcoming range partitions of ``currencies`` ahead of time.
+
+    Runs once on startup and then every ``interval_seconds`` in the background.
+    Does nothing unless the table is actually partitioned (Postgres only).
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        granularity: str = "month",
+        premake: int = 3,
+        interval_seconds: float = 3600.0,
+    ) -> None:
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"unsupported partition granularity: {granularity}")
+        self._engine = engine
+        self._granularity = granularity
+        self._premake = premake
+        self._interval = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._partitioned = False
+        self._created = 0
+        self._last_run: Optional[datetime] = None
+
+    @property
+    def partitioned(self) -> bool:
+        return self._partitioned
+
+    async def start(self) -> None:
+        async with self._engine.connect() as conn:
+            self._partitioned = await is_partitioned(conn)
+        if not self._partitioned:
+            logger.info(f"{PARENT_TABLE} is not partitioned, partition maintenance disabled")
+            return
+        await self.ensure_future_partitions()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def ensure_future_partitions(self) -> List[str]:
+        now = datetime.now(tz=timezone.utc).replace(tzinfo=None)
+        start = period_start(now, self._granularity)
+        created: List[str] = []
+        async with self._engine.connect() as conn:
+            existing = {name for name, _ in await list_partitions(conn)}
+            for _ in range(self._premake + 1):
+                name = partition_name(start, self._granularity)
+                if name not in existing:
+                    try:
+                        async with conn.begin():
+                            await conn.execute(text(create_partition_sql(start, self._granularity)))
+                        created.append(name)
+                    except Exception as e:  # noqa: BLE001
+                        # Usually an overlap with a partition of another granularity
+                        logger.warning(f"Could not create partition {name}: {e}")
+                start = next_period(start, self._granularity)
+        self._created += len(created)
+        self._last_run = now
+        if created:
+            logger.info(f"Created partitions: {', '.join(created)}")
+        return created
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                await self.ensure_future_partitions()
+            except Exception as e:  # noqa: BLE001
+                logger.error(f"Partition maintenance failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "partitioned": self._partitioned,
+            "granularity": self._granularity,
+            "premake": self._premake,
+            "created": self._created,
+            "last_run": self._last_run.isoformat(timespec="seconds") if self._last_run else None,
+        }
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+from app.services.metrics_service import Histogram
+
+
+class PoolMetrics:
+    """Connection pool counters fed by pool events and InstrumentedQueuePool."""
+
+    def __init__(self) -> None:
+        self.checkout_wait = Histogram()
+        self.waiters = 0
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.connects = 0
+        self.closes = 0
+        self.invalidations = 0
+        self._pool: Optional[Pool] = None
+
+    def attach(self, engine: AsyncEngine) -> None:
+        sync_engine = engine.sync_engine
+        pool = sync_engine.pool
+        if isinstance(pool, InstrumentedQueuePool):
+            pool._metrics = self
+        self._pool = pool
+        # Listeners on the engine survive pool.recreate() on dispose
+        event.listen(sync_engine, "connect", self._on_connect)
+        event.listen(sync_engine, "checkout", self._on_checkout)
+        event.listen(sync_engine, "close", self._on_close)
+        event.listen(sync_engine, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection, connection_record) -> None:
+        self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        self.checkouts += 1
+
+    def _on_close(self, dbapi_connection, connection_record) -> None:
+        self.closes += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception) -> None:
+        self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        pool = self._pool
+        stats: Dict[str, Any] = {
+            "waiters": self.waiters,
+            "checkouts": self.checkouts,
+            "checkout_timeouts": self.checkout_timeouts,
+            "connects": self.connects,
+            "closes": self.closes,
+            "invalidations": self.invalidations,
+            "checkout_wait_seconds": self.checkout_wait.snapshot(),
+        }
+        if isinstance(pool, AsyncAdaptedQueuePool):
+            stats.update({
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+            })
+        return stats
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records checkout wait time and the number of waiters."""
+
+    _metrics: Optional[PoolMetrics] = None
+
+    def _do_get(self):
+        metrics = self._metrics
+        if metrics is None:
+            return super()._do_get()
+        # Only a checkout that finds no idle connection and no overflow left has to wait
+        waiting = self._pool.empty() and -1 < self._max_overflow <= self._overflow
+        metrics.waiters += waiting
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            metrics.checkout_timeouts += 1
+            raise
+        finally:
+            metrics.waiters -= waiting
+            metrics.checkout_wait.observe(time.perf_counter() - started)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool._metrics = self._metrics
+        return pool
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import asyncio
 import logging
 import os
 
@@ -8,15 +7,36 @@ from aiohttp import web
 from aiohttp_apispec import setup_aiohttp_apispec, docs
 
 from app.config import AppConfig
+from app.controllers.candle_controller import CandleController
 from app.controllers.health_controller import HealthController
 from app.controllers.metrics_controller import MetricsController
 from app.controllers.price_controller import PriceController
 from app.db.engine import Base, create_engine_and_sessionmaker
+from app.db.partitions import PartitionManager
+from app.db.pool_metrics import PoolMetrics
 from app.middleware.error_middleware import error_middleware
 from app.middleware.metrics_middleware import metrics_middleware
+from app.services.candle_rollup import CandleRollup
+from app.services.candle_service import CandleService
 from app.services.currency_service import CurrencyService
 from app.services.exchange_service import ExchangeService
+from app.services.health_prober import HealthProber
+from app.services.history_cache import HistoryCache
+from app.services.http_pool import ExchangeHttpPool
+from app.services.markets_warmup import MarketsWarmup
 from app.services.metrics_service import MetricsService
+from app.services.price_writer import PriceWriteBuffer
+from app.services.purge_jobs import PurgeJobManager
+from app.services.recent_prices import RecentPrices
+from app.services.retention import RetentionCompactor, RetentionPolicy
+from app.services.shared_metrics import SharedMetricsSegment
+from app.services.price_stream import (
+    CcxtProTickerSource,
+    PriceBook,
+    PriceStreamService,
+    WebSocketTickerSource,
+)
+from app.services.ticker_cache import TickerCache
 
 
 logger = logging.getLogger(__name__)
@@ -39,20 +59,90 @@ async def _dispose_exchange(app: web.Application) -> None:
     await app["exchange_service"].close()
 
 
-async def create_app(config: AppConfig | None = None) -> web.Application:
+async def _start_health_prober(app: web.Application) -> None:
+    await app["health_prober"].start()
+
+
+async def _stop_health_prober(app: web.Application) -> None:
+    await app["health_prober"].stop()
+
+
+async def _stop_purge_jobs(app: web.Application) -> None:
+    await app["purge_jobs"].stop()
+
+
+async def _warm_recent_prices(app: web.Application) -> None:
+    config = app["config"]
+    try:
+        await app["recent_prices"].warm(app["session_factory"], config.recent_prices_warmup_ms / 1000)
+    except Exception as e:  # noqa: BLE001
+        # The store still fills from new writes; windows report complete=false until then
+        logger.warning(f"Recent prices warm-up failed: {e}")
+
+
+async def _start_retention_compactor(app: web.Application) -> None:
+    await app["retention_compactor"].start()
+
+
+async def _stop_retention_compactor(app: web.Application) -> None:
+    await app["retention_compactor"].stop()
+
+
+async def _start_markets_warmup(app: web.Application) -> None:
+    await app["markets_warmup"].start()
+
+
+async def _stop_markets_warmup(app: web.Application) -> None:
+    await app["markets_warmup"].stop()
+
+
+async def _start_price_stream(app: web.Application) -> None:
+    await app["price_stream"].start()
+
+
+async def _stop_price_stream(app: web.Application) -> None:
+    await app["price_stream"].stop()
+
+
+async def _start_partition_manager(app: web.Application) -> None:
+    await app["partition_manager"].start()
+
+
+async def _stop_partition_manager(app: web.Application) -> None:
+    await app["partition_manager"].stop()
+
+
+async def _start_candle_rollup(app: web.Application) -> None:
+    await app["candle_rollup"].start()
+
+
+async def _stop_candle_rollup(app: web.Application) -> None:
+    await app["candle_rollup"].stop()
+
+
+async def _start_write_buffer(app: web.Application) -> None:
+    await app["price_write_buffer"].start()
+
+
+async def _stop_write_buffer(app: web.Application) -> None:
+    await app["price_write_buffer"].stop()
+
+
+async def create_app(config: AppConfig | None = None, exchange_clients=None) -> web.Application:
     if config is None:
         config = AppConfig.load()
 
-    if config.enable_uvloop:
-        try:
-            import uvloop
-            uvloop.install()
-        except ImportError:
-            logger.warning(
-                "uvloop requested but not installed, using default event loop"
-            )
-
-    engine, session_factory = create_engine_and_sessionmaker(config.database_url)
+    engine, session_factory = create_engine_and_sessionmaker(
+        config.database_url,
+        pool_size=config.db_pool_size,
+        max_overflow=config.db_max_overflow,
+        pool_timeout=config.db_pool_timeout,
+        pool_recycle=config.db_pool_recycle,
+        pool_pre_ping=config.db_pool_pre_ping,
+        statement_cache_size=config.db_statement_cache_size,
+    )
+    pool_metrics = PoolMetrics()
+    pool_metrics.attach(engine)
 
     app = web.Application(middlewares=[error_middleware, metrics_middleware])
     app["config"] = config
@@ -60,14 +150,193 @@ async def create_app(config: AppConfig | None = None) -> web.Application:
     app["session_factory"] = session_factory
     app["debug"] = os.getenv("DEBUG", "0") in {"1", "true", "yes"}
     
-    app["exchange_service"] = ExchangeService()
+    ticker_cache = None
+    if config.ticker_cache_ttl_ms > 0:
+        ticker_cache = TickerCache(
+            ttl_seconds=config.ticker_cache_ttl_ms / 1000,
+            max_size=config.ticker_cache_max_size,
+        )
+    price_stream = None
+    if config.price_stream_symbols:
+        book = PriceBook(
+            (f"{s}/USDT" for s in config.price_stream_symbols),
+            stale_after_seconds=config.price_stream_stale_ms / 1000,
+        )
+        source = (
+            WebSocketTickerSource(config.price_stream_url)
+            if config.price_stream_url
+            else CcxtProTickerSource()
+        )
+        price_stream = PriceStreamService(source, book)
+    http_pool = ExchangeHttpPool(
+        limit=config.exchange_http_limit,
+        limit_per_host=config.exchange_http_limit_per_host,
+        keepalive_timeout_seconds=config.exchange_http_keepalive_ms / 1000,
+        dns_cache_ttl_seconds=config.exchange_http_dns_cache_ttl_ms / 1000,
+        request_timeout_seconds=config.exchange_http_timeout_ms / 1000,
+    )
+    app["http_pool"] = http_pool
+    exchange_service = ExchangeService(
+        config.exchanges,
+        ticker_cache=ticker_cache,
+        price_book=price_stream.book if price_stream is not None else None,
+        clients=exchange_clients,
+        symbol_map=config.exchange_symbol_map,
+        hedge_percentile=config.exchange_hedge_percentile,
+        hedge_initial_delay=config.exchange_hedge_delay_ms / 1000,
+        hedge_min_delay=config.exchange_hedge_min_delay_ms / 1000,
+        timeout_seconds=config.exchange_timeout_ms / 1000,
+        breaker_failures=config.exchange_breaker_failures,
+        breaker_reset_seconds=config.exchange_breaker_reset_ms / 1000,
+        concurrency_initial=config.exchange_concurrency_initial,
+        concurrency_max=config.exchange_concurrency_max,
+        queue_size=config.exchange_queue_size,
+        queue_timeout_seconds=config.exchange_queue_timeout_ms / 1000,
+        latency_target_seconds=config.exchange_latency_target_ms / 1000,
+        stale_max_age_seconds=config.exchange_serve_stale_ms / 1000,
+        negative_cache_size=config.symbol_negative_cache_size,
+        negative_cache_ttl_seconds=config.symbol_negative_cache_ttl_ms / 1000,
+        http_pool=http_pool,
+    )
+    app["exchange_service"] = exchange_service
     
-    metrics_service = MetricsService()
+    shared_metrics = None
+    if config.metrics_shm_path and config.metrics_shm_slot is not None:
+        shared_metrics = SharedMetricsSegment(config.metrics_shm_path)
+        slot = shared_metrics.slot(config.metrics_shm_slot)
+        slot.claim(os.getpid())
+        # /metrics then also reports totals summed across workers at read time
+        metrics_service = MetricsService(slot)
+    else:
+        metrics_service = MetricsService()
     app["metrics_service"] = metrics_service
+    metrics_service.register_collector("db_pool", pool_metrics.stats)
+    metrics_service.register_collector("exchanges", exchange_service.stats)
+    if ticker_cache is not None:
+        metrics_service.register_collector("ticker_cache", ticker_cache.stats)
+
+    history_cache = None
+    if config.history_cache_size > 0:
+        history_cache = HistoryCache(
+            max_entries=config.history_cache_size,
+            max_bytes=config.history_cache_max_bytes,
+            ttl_seconds=config.history_cache_ttl_ms / 1000,
+        )
+        metrics_service.register_collector("history_cache", history_cache.stats)
+
+    candle_rollup = CandleRollup(
+        session_factory, flush_interval_seconds=config.candle_rollup_interval_ms / 1000
+    )
+    app["candle_rollup"] = candle_rollup
+    metrics_service.register_collector("candle_rollup", candle_rollup.stats)
+
+    write_buffer = None
+    if config.write_behind_enabled:
+        write_buffer = PriceWriteBuffer(
+            session_factory,
+            flush_interval_seconds=config.write_behind_interval_ms / 1000,
+            max_batch=config.write_behind_max_batch,
+            max_queue=config.write_behind_queue_size,
+            ack=config.write_behind_ack,
+            on_flush=history_cache.invalidate if history_cache is not None else None,
+            candle_rollup=candle_rollup,
+        )
+        app["price_write_buffer"] = write_buffer
+        metrics_service.register_collector("write_buffer", write_buffer.stats)
+
+    partition_manager = None
+    if config.partition_granularity != "none":
+        partition_manager = PartitionManager(
+            engine,
+            granularity=config.partition_granularity,
+            premake=config.partition_premake,
+        )
+        app["partition_manager"] = partition_manager
+        metrics_service.register_collector("partitions", partition_manager.stats)
+
+    recent_prices = None
+    if config.recent_prices_capacity > 0:
+        recent_prices = RecentPrices(
+            capacity=config.recent_prices_capacity,
+            max_currencies=config.recent_prices_max_currencies,
+            # Other processes' writes never reach this store
+            single_writer=config.web_concurrency <= 1,
+        )
+        app["recent_prices"] = recent_prices
+        metrics_service.register_collector("recent_prices", recent_prices.stats)
 
     app.on_startup.append(_init_db)
+    if recent_prices is not None and config.recent_prices_warmup_ms > 0:
+        app.on_startup.append(_warm_recent_prices)
+    if partition_manager is not None:
+        app.on_startup.append(_start_partition_manager)
+        app.on_cleanup.append(_stop_partition_manager)
+    if write_buffer is not None:
+        app.on_startup.append(_start_write_buffer)
+        # Drain before the engine is disposed so shutdown loses no rows
+        app.on_cleanup.append(_stop_write_buffer)
+    app.on_startup.append(_start_candle_rollup)
+    # After the write buffer has drained into it, before the engine is disposed
+    app.on_cleanup.append(_stop_candle_rollup)
+    if config.markets_warmup_enabled:
+        markets_warmup = MarketsWarmup(
+            exchange_service.backends,
+            snapshot_dir=config.markets_snapshot_dir,
+            snapshot_max_age_seconds=config.markets_snapshot_max_age_ms / 1000,
+            refresh_interval_seconds=config.markets_refresh_interval_ms / 1000,
+            timeout_seconds=config.markets_warmup_timeout_ms / 1000,
+        )
+        app["markets_warmup"] = markets_warmup
+        metrics_service.register_collector("markets", markets_warmup.stats)
+        # on_startup completes before the worker accepts connections
+        app.on_startup.append(_start_markets_warmup)
+        app.on_cleanup.append(_stop_markets_warmup)
+    purge_jobs = PurgeJobManager(
+        session_factory,
+        batch_size=config.purge_batch_size,
+        pause_seconds=config.purge_pause_ms / 1000,
+        partitioned=lambda: partition_manager is not None and partition_manager.partitioned,
+        on_progress=history_cache.invalidate if history_cache is not None else None,
+    )
+    app["purge_jobs"] = purge_jobs
+    metrics_service.register_collector("purge_jobs", purge_jobs.stats)
+    # Before the engine is disposed, so a running purge stops between batches
+    app.on_cleanup.append(_stop_purge_jobs)
+    retention = RetentionPolicy(
+        raw_days=config.retention_raw_days, minute_days=config.retention_minute_days
+    )
+    if retention.enabled:
+        retention_compactor = RetentionCompactor(
+            session_factory,
+            retention,
+            batch_size=config.compaction_batch_size,
+            pause_seconds=config.compaction_pause_ms / 1000,
+            interval_seconds=config.compaction_interval_ms / 1000,
+            partitioned=lambda: partition_manager is not None and partition_manager.partitioned,
+            on_progress=history_cache.invalidate if history_cache is not None else None,
+        )
+        app["retention_compactor"] = retention_compactor
+        metrics_service.register_collector("retention", retention_compactor.stats)
+        if config.compaction_enabled:
+            app.on_startup.append(_start_retention_compactor)
+            app.on_cleanup.append(_stop_retention_compactor)
+    health_prober = HealthProber(
+        engine,
+        exchange_service,
+        interval_seconds=config.health_probe_interval_ms / 1000,
+        timeout_seconds=config.health_probe_timeout_ms / 1000,
+    )
+    app["health_prober"] = health_prober
+    metrics_service.register_collector("health", health_prober.stats)
+    app.on_startup.append(_start_health_prober)
+    app.on_cleanup.append(_stop_health_prober)
     app.on_cleanup.append(_dispose_db)
     app.on_cleanup.append(_dispose_exchange)
+    if price_stream is not None:
+        app["price_stream"] = price_stream
+        metrics_service.register_collector("price_stream", price_stream.stats)
+        app.on_startup.append(_start_price_stream)
+        app.on_cleanup.append(_stop_price_stream)
 
     @docs(
         tags=["price"],
@@ -83,62 +352,294 @@ async def create_app(config: AppConfig | None = None) -> web.Application:
         responses={
             200: {"description": "Price fetched and saved"},
             400: {"description": "Invalid currency or not found"},
+            503: {"description": "Exchange unavailable (circuit open, overloaded or timed out) and no stale bid to serve"},
         },
     )
     async def get_price(request: web.Request):
         async with request.app["session_factory"]() as session:
             controller = PriceController(
                 request.app["exchange_service"],
-                CurrencyService(session, config.page_size)
+                CurrencyService(
+                    session, config.page_size, write_buffer, history_cache=history_cache,
+                    recent_prices=recent_prices, candle_rollup=candle_rollup,
+                )
             )
             return await controller.get_price(request)
 
+    @docs(
+        tags=["price"],
+        summary="Get current prices for several currencies",
+        description="Fetch last bid prices for {currency}/USDT pairs with one exchange call and save them in one transaction",
+        parameters=[{
+            "in": "query",
+            "name": "currencies",
+            "schema": {"type": "string"},
+            "required": True,
+            "description": "Comma-separated currency symbols (BTC,ETH,SOL), at most 50",
+        }],
+        responses={
+            200: {"description": "Prices fetched and saved; failed symbols listed in errors"},
+            400: {"description": "No valid currencies or none found"},
+        },
+    )
+    async def get_prices(request: web.Request):
+        async with request.app["session_factory"]() as session:
+            controller = PriceController(
+                request.app["exchange_service"],
+                CurrencyService(
+                    session, config.page_size, history_cache=history_cache, recent_prices=recent_prices,
+                    candle_rollup=candle_rollup,
+                )
+            )
+            return await controller.get_prices(request)
+
+    @docs(
+        tags=["price"],
+        summary="Get OHLC candles",
+        description="Open/high/low/close/count buckets for {currency} served from incrementally maintained rollups",
+        parameters=[{
+            "in": "path",
+            "name": "currency",
+            "schema": {"type": "string"},
+            "required": True,
+            "description": "Currency symbol (BTC, ETH, SOL, etc.)",
+        }, {
+            "in": "query",
+            "name": "interval",
+            "schema": {"type": "string", "enum": ["1m", "5m", "1h", "1d"], "default": "1m"},
+            "required": False,
+            "description": "Candle interval",
+        }, {
+            "in": "query",
+            "name": "from",
+            "schema": {"type": "string", "format": "date-time"},
+            "required": False,
+            "description": "Only candles at or after this ISO 8601 time (UTC if no offset)",
+        }, {
+            "in": "query",
+            "name": "to",
+            "schema": {"type": "string", "format": "date-time"},
+            "required": False,
+            "description": "Only candles starting before this ISO 8601 time (UTC if no offset)",
+        }, {
+            "in": "query",
+            "name": "limit",
+            "schema": {"type": "integer", "default": 500},
+            "required": False,
+            "description": "Maximum number of (most recent) candles, at most 1000",
+        }],
+        responses={
+            200: {"description": "Candles retrieved, oldest first"},
+            400: {"description": "Invalid currency, interval or range"},
+        },
+    )
+    async def get_candles(request: web.Request):
+        async with request.app["session_factory"]() as session:
+            controller = CandleController(CandleService(session))
+            return await controller.get_candles(request)
+
+    @docs(
+        tags=["price"],
+        summary="Get recent prices",
+        description="Prices recorded for {currency} within the window, oldest first, served from memory without a database query",
+        parameters=[{
+            "in": "path",
+            "name": "currency",
+            "schema": {"type": "string"},
+            "required": True,
+            "description": "Currency symbol (BTC, ETH, SOL, etc.)",
+        }, {
+            "in": "query",
+            "name": "window",
+            "schema": {"type": "string", "default": "300"},
+            "required": False,
+            "description": "How far back to look: seconds, or a number with an s/m/h suffix (15m, 2h)",
+        }],
+        responses={
+            200: {"description": "Recent prices; `complete` is false when the window reaches past what is held in memory"},
+            400: {"description": "Invalid currency or window"},
+            404: {"description": "Recent prices are disabled"},
+        },
+    )
+    async def get_recent_prices(request: web.Request):
+        controller = PriceController(request.app["exchange_service"], None, recent_prices=recent_prices)
+        return await controller.get_recent_prices(request)
+
     @docs(
         tags=["price"],
         summary="Get price history",
-        description="Get paginated price history (page size: 10)",
+        description=(
+            "Get paginated price history (page size: 10). Pass `cursor` (empty for the "
+            "first page, then `next_cursor` from the previous response) for keyset "
+            "pagination whose cost does not grow with depth."
+        ),
         parameters=[{
             "in": "query",
             "name": "page",
             "schema": {"type": "integer", "default": 1},
             "required": False,
             "description": "Page number",
+        }, {
+            "in": "query",
+            "name": "cursor",
+            "schema": {"type": "string"},
+            "required": False,
+            "description": "Opaque keyset cursor; takes precedence over page",
+        }, {
+            "in": "query",
+            "name": "include_total",
+            "schema": {"type": "boolean", "default": True},
+            "required": False,
+            "description": "Set to false to skip computing total/total_pages",
+        }, {
+            "in": "query",
+            "name": "currency",
+            "schema": {"type": "string"},
+            "required": False,
+            "description": "Only records for this currency symbol",
+        }, {
+            "in": "query",
+            "name": "from",
+            "schema": {"type": "string", "format": "date-time"},
+            "required": False,
+            "description": "Only records at or after this ISO 8601 time (UTC if no offset)",
+        }, {
+            "in": "query",
+            "name": "to",
+            "schema": {"type": "string", "format": "date-time"},
+            "required": False,
+            "description": "Only records before this ISO 8601 time (UTC if no offset)",
         }],
         responses={
-            200: {"description": "History retrieved"},
+            200: {"description": "History retrieved (carries an ETag when the response cache is enabled)"},
+            304: {"description": "Not modified since the ETag sent in If-None-Match"},
         },
     )
     async def get_history(request: web.Request):
         async with request.app["session_factory"]() as session:
             controller = PriceController(
                 request.app["exchange_service"],
-                CurrencyService(session, config.page_size)
+                CurrencyService(
+                    session, config.page_size, total_mode=config.history_total_mode, retention=retention
+                ),
+                history_cache,
             )
             return await controller.get_history(request)
 
     @docs(
         tags=["price"],
-        summary="Delete all history",
-        description="Delete all price records",
+        summary="Export price history",
+        description="Stream the whole (optionally filtered) price history as NDJSON or CSV",
+        parameters=[{
+            "in": "query",
+            "name": "format",
+            "schema": {"type": "string", "enum": ["ndjson", "csv"], "default": "ndjson"},
+            "required": False,
+            "description": "Output format",
+        }, {
+            "in": "query",
+            "name": "currency",
+            "schema": {"type": "string"},
+            "required": False,
+            "description": "Only records for this currency symbol",
+        }, {
+            "in": "query",
+            "name": "from",
+            "schema": {"type": "string", "format": "date-time"},
+            "required": False,
+            "description": "Only records at or after this ISO 8601 time (UTC if no offset)",
+        }, {
+            "in": "query",
+            "name": "to",
+            "schema": {"type": "string", "format": "date-time"},
+            "required": False,
+            "description": "Only records before this ISO 8601 time (UTC if no offset)",
+        }],
         responses={
-            200: {"description": "All records deleted"},
+            200: {"description": "Streamed export"},
+            400: {"description": "Invalid format or filter"},
         },
     )
-    async def delete_history(request: web.Request):
+    async def export_history(request: web.Request):
         async with request.app["session_factory"]() as session:
             controller = PriceController(
                 request.app["exchange_service"],
                 CurrencyService(session, config.page_size)
             )
+            return await controller.export_history(request)
+
+    @docs(
+        tags=["price"],
+        summary="Delete history",
+        description=(
+            "Start a background purge of price records (all of them, or only those matching "
+            "the filters) and return its job id immediately. Unfiltered purges TRUNCATE on "
+            "Postgres; otherwise rows are deleted in bounded batches."
+        ),
+        parameters=[{
+            "in": "query",
+            "name": "currency",
+            "schema": {"type": "string"},
+            "required": False,
+            "description": "Only records for this currency symbol",
+        }, {
+            "in": "query",
+            "name": "before",
+            "schema": {"type": "string", "format": "date-time"},
+            "required": False,
+            "description": "Only records before this ISO 8601 time (UTC if no offset); candles are kept",
+        }],
+        responses={
+            202: {"description": "Purge job accepted; poll the Location header for progress"},
+            400: {"description": "Invalid filter"},
+        },
+    )
+    async def delete_history(request: web.Request):
+        async with request.app["session_factory"]() as session:
+            controller = PriceController(
+                request.app["exchange_service"],
+                CurrencyService(session, config.page_size),
+                purge_jobs=purge_jobs,
+                recent_prices=recent_prices,
+            )
             return await controller.delete_history(request)
 
-    health_controller = HealthController(session_factory)
+    @docs(
+        tags=["price"],
+        summary="Get purge job status",
+        description="Progress of a history purge: rows deleted, rate and ETA",
+        parameters=[{
+            "in": "path",
+            "name": "job_id",
+            "schema": {"type": "string"},
+            "required": True,
+            "description": "Job id returned by DELETE /price/history",
+        }],
+        responses={
+            200: {"description": "Job status"},
+            404: {"description": "Unknown job (jobs are kept per worker process)"},
+        },
+    )
+    async def get_purge_status(request: web.Request):
+        async with request.app["session_factory"]() as session:
+            controller = PriceController(
+                request.app["exchange_service"],
+                CurrencyService(session, config.page_size),
+                purge_jobs=purge_jobs,
+                recent_prices=recent_prices,
+            )
+            return await controller.get_purge_status(request)
+
+    health_controller = HealthController(session_factory, health_prober)
     metrics_controller = MetricsController(metrics_service)
     
     @docs(
         tags=["monitoring"],
         summary="Health check",
-        description="Check application health and database connectivity",
+        description=(
+            "Check application health and database connectivity, from the cached background "
+            "probe; also reports the probe's checked_at and age_seconds"
+        ),
         responses={
             200: {"description": "Application is healthy"},
             503: {"description": "Application is degraded"},
@@ -146,11 +647,41 @@ async def create_app(config: AppConfig | None = None) -> web.Application:
     )
     async def health(request: web.Request):
         return await health_controller.check(request)
+
+    @docs(
+        tags=["monitoring"],
+        summary="Liveness probe",
+        description="Answers as long as the worker's event loop is running; does no I/O",
+        responses={
+            200: {"description": "Worker is alive"},
+        },
+    )
+    async def health_live(request: web.Request):
+        return await health_controller.live(request)
+
+    @docs(
+        tags=["monitoring"],
+        summary="Readiness probe",
+        description=(
+            "Last result of the background database and exchange probe with its age; "
+            "never queries the database itself"
+        ),
+        responses={
+            200: {"description": "Ready to serve traffic"},
+            503: {"description": "Database unavailable, first probe pending or probe result stale"},
+        },
+    )
+    async def health_ready(request: web.Request):
+        return await health_controller.ready(request)
     
     @docs(
         tags=["monitoring"],
         summary="Application metrics",
-        description="Get application metrics (requests, errors, uptime)",
+        description=(
+            "Get application metrics (requests, errors, uptime, per-route latency). "
+            "JSON by default; Prometheus text format with `?format=prometheus` or "
+            "`Accept: text/plain`"
+        ),
         responses={
             200: {"description": "Metrics retrieved"},
         },
@@ -159,10 +690,17 @@ async def create_app(config: AppConfig | None = None) -> web.Application:
         return await metrics_controller.get_metrics(request)
 
     app.router.add_get("/health", health)
+    app.router.add_get("/health/live", health_live)
+    app.router.add_get("/health/ready", health_ready)
     app.router.add_get("/metrics", metrics)
+    app.router.add_get("/price", get_prices)
     app.router.add_get("/price/{currency}", get_price)
+    app.router.add_get("/price/{currency}/candles", get_candles)
+    app.router.add_get("/price/{currency}/recent", get_recent_prices)
     app.router.add_get("/price/history", get_history)
+    app.router.add_get("/price/history/export", export_history)
     app.router.add_delete("/price/history", delete_history)
+    app.router.add_get("/price/history/purge/{job_id}", get_purge_status)
 
     setup_aiohttp_apispec(
         app=app,
@@ -175,11 +713,25 @@ async def create_app(config: AppConfig | None = None) -> web.Application:
     return app
 
 
+def _install_uvloop() -> None:
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        logger.warning(
+            "uvloop requested but not installed, using default event loop"
+        )
+
+
 def main() -> None:
     logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
     config = AppConfig.load()
-    app = asyncio.run(create_app(config))
-    web.run_app(app, host=config.host, port=config.port)
+    if config.enable_uvloop:
+        # Before run_app creates its loop
+        _install_uvloop()
+    # run_app awaits the factory on its own loop, the one that then serves requests;
+    # resources bound to a loop (the exchange HTTP pool) must not come from a loop closed before that
+    web.run_app(create_app(config), host=config.host, port=config.port)
 
 
 if __name__ == "__main__":
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-import json
 import traceback
 from aiohttp import web
 
+from app.services.serialization import json_response
+
 
 @web.middleware
 async def error_middleware(request: web.Request, handler):
@@ -22,4 +23,4 @@ async def error_middleware(request: web.Request, handler):
         # For debugging purposes, include stack only if debug enabled
         if request.app.get("debug"):
             error_payload["trace"] = traceback.format_exc()
-        return web.json_response(error_payload, status=500)
+        return json_response(error_payload, status=500)
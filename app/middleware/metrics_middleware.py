@@ -1,29 +1,53 @@
 from __future__ import annotations
 
+import time
+
 from aiohttp import web
 from aiohttp.web import middleware
 
 
+def _route_name(request: web.Request) -> str:
+    # Use the route template, not the raw path, to keep label cardinality bounded
+    resource = request.match_info.route.resource
+    if resource is None:
+        return "unmatched"
+    return resource.canonical
+
+
 @middleware
 async def metrics_middleware(request: web.Request, handler):
     """
     Middleware to track request metrics.
     
-    Increments request counter and error counter based on response status.
+    Increments request counter and error counter based on response status,
+    and records latency per route, method and status class.
     """
     metrics_service = request.app.get("metrics_service")
     
     if metrics_service:
         metrics_service.increment_request_count()
     
+    started = time.perf_counter()
+    status = 500
     try:
         response = await handler(request)
+        status = response.status
         
         if metrics_service and response.status >= 400:
             metrics_service.increment_error_count()
         
         return response
+    except web.HTTPException as e:
+        status = e.status
+        if metrics_service and status >= 400:
+            metrics_service.increment_error_count()
+        raise
     except Exception as e:
         if metrics_service:
             metrics_service.increment_error_count()
         raise
+    finally:
+        if metrics_service:
+            metrics_service.observe_request(
+                _route_name(request), request.method, status, time.perf_counter() - started
+            )
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import String, Integer, DateTime, Numeric
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.engine import Base
+
+
+# Supported candle intervals and their length in seconds
+CANDLE_INTERVALS = {
+    "1m": 60,
+    "5m": 300,
+    "1h": 3600,
+    "1d": 86400,
+}
+
+
+class Candle(Base):
+    """OHLC rollup of raw currency ticks, folded in incrementally once their insert commits."""
+
+    __tablename__ = "candles"
+
+    currency: Mapped[str] = mapped_column(String(32), primary_key=True)
+    interval_: Mapped[str] = mapped_column(String(8), primary_key=True)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=False), primary_key=True)
+    open: Mapped[Decimal] = mapped_column(Numeric(precision=24, scale=10), nullable=False)
+    high: Mapped[Decimal] = mapped_column(Numeric(precision=24, scale=10), nullable=False)
+    low: Mapped[Decimal] = mapped_column(Numeric(precision=24, scale=10), nullable=False)
+    close: Mapped[Decimal] = mapped_column(Numeric(precision=24, scale=10), nullable=False)
+    count: Mapped[int] = mapped_column(Integer, nullable=False)
+    # ids of the raw rows that set open/close, so out-of-order updates stay correct
+    open_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    close_id: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    def to_dict(self) -> dict:
+        return {
+            "t": self.bucket_start.isoformat(timespec="seconds"),
+            "open": str(self.open),
+            "high": str(self.high),
+            "low": str(self.low),
+            "close": str(self.close),
+            "count": self.count,
+        }
@@ -4,7 +4,7 @@ from datetime import datetime
 from decimal import Decimal
 from typing import Optional
 
-from sqlalchemy import String, Integer, DateTime, Numeric
+from sqlalchemy import String, Integer, DateTime, Index, Numeric
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.engine import Base
@@ -14,10 +14,18 @@ class Currency(Base):
     __tablename__ = "currencies"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    currency: Mapped[str] = mapped_column(String(32), nullable=False, index=True)
+    currency: Mapped[str] = mapped_column(String(32), nullable=False)
     date_: Mapped[datetime] = mapped_column(DateTime(timezone=False), nullable=False, index=True)
     price: Mapped[Decimal] = mapped_column(Numeric(precision=24, scale=10), nullable=False)
 
+    __table_args__ = (
+        # Serves per-currency history in (date_ DESC, id DESC) order and
+        # plain currency lookups (leading column).
+        Index("ix_currencies_currency_date_id", "currency", date_.desc(), id.desc()),
+        # Cheap time-range index for this append-only table (Postgres only).
+        Index("ix_currencies_date_brin", "date_", postgresql_using="brin").ddl_if(dialect="postgresql"),
+    )
+
     def to_dict(self) -> dict:
         return {
             "id": self.id,
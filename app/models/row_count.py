@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from sqlalchemy import DDL, BigInteger, SmallInteger, String, event
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.engine import Base
+
+# Each counted table has this many counter rows; writers bump a random one and
+# readers sum them, so concurrent inserts rarely wait on the same row lock
+COUNTER_STRIPES = 16
+
+
+class RowCount(Base):
+    """Row counters kept transactionally in step with writes to the counted table."""
+
+    __tablename__ = "row_counts"
+
+    table_name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    stripe: Mapped[int] = mapped_column(SmallInteger, primary_key=True, server_default="0")
+    value: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
+
+
+# Seed the counter whenever the table is created via metadata.create_all
+# (currencies sorts before row_counts, so it already exists at this point).
+event.listen(
+    RowCount.__table__,
+    "after_create",
+    DDL(
+        "INSERT INTO row_counts (table_name, stripe, value) "
+        "SELECT 'currencies', 0, COUNT(*) FROM currencies"
+    ),
+)
+event.listen(
+    RowCount.__table__,
+    "after_create",
+    DDL(
+        "INSERT INTO row_counts (table_name, stripe, value) VALUES "
+        + ", ".join(f"('currencies', {stripe}, 0)" for stripe in range(1, COUNTER_STRIPES))
+    ),
+)
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from sqlalchemy import Row, Select, case, delete, func, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.candle import CANDLE_INTERVALS, Candle
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def bucket_start(date_: datetime, interval: str) -> datetime:
+    step = CANDLE_INTERVALS[interval]
+    seconds = int((date_ - _EPOCH).total_seconds())
+    return _EPOCH + timedelta(seconds=seconds - seconds % step)
+
+
+# Pending candle rows keyed by (currency, interval, bucket_start)
+Buckets = Dict[Tuple[str, str, datetime], dict]
+
+
+def merge_bucket(buckets: Buckets, row: dict) -> None:
+    """Merge one aggregated bucket row into ``buckets``, like the upsert does in the database."""
+    key = (row["currency"], row["interval_"], row["bucket_start"])
+    current = buckets.get(key)
+    if current is None:
+        buckets[key] = row
+        return
+    current["high"] = max(current["high"], row["high"])
+    current["low"] = min(current["low"], row["low"])
+    current["count"] += row["count"]
+    if row["open_id"] < current["open_id"]:
+        current["open"], current["open_id"] = row["open"], row["open_id"]
+    if row["close_id"] > current["close_id"]:
+        current["close"], current["close_id"] = row["close"], row["close_id"]
+
+
+def fold_ticks(buckets: Buckets, ticks: Iterable[Tuple[int, str, datetime, Decimal]]) -> None:
+    """Aggregate raw (id, currency, date_, price) ticks into ``buckets`` for every candle interval."""
+    for id_, currency, date_, price in ticks:
+        for interval in CANDLE_INTERVALS:
+            merge_bucket(buckets, {
+                "currency": currency,
+                "interval_": interval,
+                "bucket_start": bucket_start(date_, interval),
+                "open": price,
+                "high": price,
+                "low": price,
+                "close": price,
+                "count": 1,
+                "open_id": id_,
+                "close_id": id_,
+            })
+
+
+class CandleRepository:
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def apply_ticks(self, ticks: Iterable[Tuple[int, str, datetime, Decimal]]) -> None:
+        """
+        Fold raw (id, currency, date_, price) ticks into every candle interval.
+
+        Ticks are pre-aggregated per bucket in Python and written with one
+        multi-row upsert, so a batch of N ticks costs one statement.
+        """
+        buckets: Buckets = {}
+        fold_ticks(buckets, ticks)
+        await self.upsert(buckets.values())
+
+    async def upsert(self, rows: Iterable[dict]) -> None:
+        """
+        Merge pre-aggregated bucket rows (see ``fold_ticks``) into the candles.
+
+        Rows are written in primary key order, so concurrent upserts lock
+        candle rows in the same order and cannot deadlock each other.
+        """
+        rows = sorted(rows, key=lambda row: (row["currency"], row["interval_"], row["bucket_start"]))
+        if not rows:
+            return
+
+        dialect = self._session.bind.dialect.name
+        if dialect == "postgresql":
+            stmt = postgresql.insert(Candle)
+            greatest, least = func.greatest, func.least
+        else:
+            stmt = sqlite.insert(Candle)
+            greatest, least = func.max, func.min
+        excluded = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Candle.currency, Candle.interval_, Candle.bucket_start],
+            set_={
+                "high": greatest(Candle.high, excluded.high),
+                "low": least(Candle.low, excluded.low),
+                "count": Candle.count + excluded.count,
+                "open": case((excluded.open_id < Candle.open_id, excluded.open), else_=Candle.open),
+                "open_id": least(Candle.open_id, excluded.open_id),
+                "close": case((excluded.close_id > Candle.close_id, excluded.close), else_=Candle.close),
+                "close_id": greatest(Candle.close_id, excluded.close_id),
+            },
+        )
+        await self._session.execute(stmt, rows)
+
+    async def list_candles(
+        self,
+        currency: str,
+        interval: str,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        limit: int = 500,
+    ) -> Sequence[Candle]:
+        """Most recent ``limit`` candles in the range, returned oldest first."""
+        stmt = (
+            select(Candle)
+            .where(Candle.currency == currency, Candle.interval_ == interval)
+            .order_by(Candle.bucket_start.desc())
+            .limit(limit)
+        )
+        if date_from is not None:
+            stmt = stmt.where(Candle.bucket_start >= bucket_start(date_from, interval))
+        if date_to is not None:
+            stmt = stmt.where(Candle.bucket_start < date_to)
+        result = await self._session.execute(stmt)
+        return list(reversed(result.scalars().all()))
+
+    @staticmethod
+    def _history_filter(
+        stmt: Select,
+        interval: str,
+        currency: Optional[str],
+        date_from: Optional[datetime],
+        date_to: Optional[datetime],
+    ) -> Select:
+        stmt = stmt.where(Candle.interval_ == interval)
+        if currency is not None:
+            stmt = stmt.where(Candle.currency == currency)
+        if date_from is not None:
+            stmt = stmt.where(Candle.bucket_start >= date_from)
+        if date_to is not None:
+            stmt = stmt.where(Candle.bucket_start < date_to)
+        return stmt
+
+    async def list_history(
+        self,
+        interval: str,
+        currency: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        offset: int = 0,
+        limit: int = 10,
+        after: Optional[Tuple[datetime, str]] = None,
+    ) -> Sequence[Row]:
+        """(currency, bucket_start, close) rows in (bucket_start DESC, currency DESC) order, for history reads."""
+        stmt = self._history_filter(
+            select(Candle.currency, Candle.bucket_start, Candle.close),
+            interval, currency, date_from, date_to,
+        )
+        if after is not None:
+            stmt = stmt.where(tuple_(Candle.bucket_start, Candle.currency) < tuple_(*after))
+        stmt = stmt.order_by(Candle.bucket_start.desc(), Candle.currency.desc()).offset(offset).limit(limit)
+        result = await self._session.execute(stmt)
+        return result.all()
+
+    async def count_history(
+        self,
+        interval: str,
+        currency: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+    ) -> int:
+        stmt = self._history_filter(
+            select(func.count()).select_from(Candle), interval, currency, date_from, date_to
+        )
+        result = await self._session.execute(stmt)
+        return int(result.scalar_one())
+
+    async def estimate_history(
+        self,
+        interval: str,
+        currency: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+    ) -> int:
+        """
+        Upper-bound estimate of ``count_history`` read from the daily candles only.
+
+        A day with n ticks has at most min(n, buckets per day) non-empty buckets
+        of ``interval``; days cut by the range are weighted by the part covered.
+        """
+        per_day = CANDLE_INTERVALS["1d"] // CANDLE_INTERVALS[interval]
+        least = func.least if self._session.bind.dialect.name == "postgresql" else func.min
+        day_from = bucket_start(date_from, "1d") if date_from is not None else None
+        day_to = bucket_start(date_to, "1d") if date_to is not None else None
+
+        async def buckets(lower: Optional[datetime], upper: Optional[datetime]) -> int:
+            stmt = self._history_filter(
+                select(func.sum(least(Candle.count, per_day))), "1d", currency, lower, upper
+            )
+            return int(await self._session.scalar(stmt) or 0)
+
+        day = timedelta(days=1)
+        estimate = await buckets(day_from, day_to)
+        if day_from is not None and date_from > day_from:
+            estimate -= round(await buckets(day_from, day_from + day) * ((date_from - day_from) / day))
+        if day_to is not None and date_to > day_to:
+            estimate += round(await buckets(day_to, day_to + day) * ((date_to - day_to) / day))
+        return max(estimate, 0)
+
+    async def delete_batch(self, intervals: Sequence[str], before: datetime, limit: int) -> int:
+        """Delete at most ``limit`` candles of the given intervals starting before ``before``."""
+        keys = (
+            select(Candle.currency, Candle.interval_, Candle.bucket_start)
+            .where(Candle.interval_.in_(intervals), Candle.bucket_start < before)
+            .limit(limit)
+        )
+        result = await self._session.execute(
+            delete(Candle).where(tuple_(Candle.currency, Candle.interval_, Candle.bucket_start).in_(keys))
+        )
+        return result.rowcount or 0
+
+    async def delete_range(
+        self,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        currency: Optional[str] = None,
+    ) -> int:
+        stmt = delete(Candle)
+        if currency is not None:
+            stmt = stmt.where(Candle.currency == currency)
+        if date_from is not None:
+            stmt = stmt.where(Candle.bucket_start >= date_from)
+        if date_to is not None:
+            stmt = stmt.where(Candle.bucket_start < date_to)
+        result = await self._session.execute(stmt)
+        return result.rowcount or 0
@@ -1,34 +1,249 @@
 from __future__ import annotations
 
+import random
+from dataclasses import dataclass
+from datetime import datetime
 from decimal import Decimal
-from typing import Sequence
+from typing import Any, AsyncIterator, Iterable, Optional, Sequence
 
-from sqlalchemy import delete, select, func
+from sqlalchemy import Row, Select, delete, insert, select, func, text, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.db.partitions import list_partitions
+from app.models.candle import Candle
+from app.repositories.candle_repository import CandleRepository
 from app.models.currency import Currency
+from app.models.row_count import COUNTER_STRIPES, RowCount
+
+TOTAL_EXACT = "exact"
+TOTAL_COUNTER = "counter"
+TOTAL_ESTIMATED = "estimated"
+
+
+@dataclass(frozen=True)
+class HistoryFilter:
+    """Optional history filters: exact currency and a [date_from, date_to) range."""
+
+    currency: Optional[str] = None
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+
+    def is_empty(self) -> bool:
+        return self.currency is None and self.date_from is None and self.date_to is None
+
+    def apply(self, stmt: Select) -> Select:
+        if self.currency is not None:
+            stmt = stmt.where(Currency.currency == self.currency)
+        if self.date_from is not None:
+            stmt = stmt.where(Currency.date_ >= self.date_from)
+        if self.date_to is not None:
+            stmt = stmt.where(Currency.date_ < self.date_to)
+        return stmt
+
+
+def _history_columns() -> Select:
+    """History rows as plain column tuples in (date_ DESC, id DESC) order."""
+    return (
+        select(Currency.id, Currency.currency, Currency.date_, Currency.price)
+        .order_by(Currency.date_.desc(), Currency.id.desc())
+    )
 
 
 class CurrencyRepository:
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(self, session: AsyncSession, partitioned: bool = False) -> None:
         self._session = session
+        # Postgres range-partitioned table: bulk deletes drop/truncate partitions
+        self._partitioned = partitioned
+        self._candles = CandleRepository(session)
 
     async def add(self, currency: str, date_, price: Decimal) -> Currency:
         entity = Currency(currency=currency, date_=date_, price=price)
         self._session.add(entity)
         await self._session.flush()
+        # Candles are rolled up after the commit (see CandleRollup), not under this transaction
+        await self._bump_count(1)
         return entity
 
+    async def add_many(self, rows: Iterable[tuple[str, object, Decimal]]) -> Sequence[Currency]:
+        """Insert (currency, date_, price) rows with a single multi-row INSERT."""
+        values = [{"currency": c, "date_": d, "price": p} for c, d, p in rows]
+        if not values:
+            return []
+        result = await self._session.scalars(
+            insert(Currency).returning(Currency.id, sort_by_parameter_order=True), values
+        )
+        ids = result.all()
+        await self._bump_count(len(values))
+        return [Currency(id=id_, **row) for id_, row in zip(ids, values)]
+
     async def list_paginated(self, page: int, page_size: int) -> tuple[Sequence[Currency], int]:
-        stmt = select(Currency).order_by(Currency.date_.desc(), Currency.id.desc()).offset((page - 1) * page_size).limit(page_size)
-        count_stmt = select(func.count()).select_from(Currency)
+        items = await self.list_page(page=page, page_size=page_size)
+        total, _ = await self.count(TOTAL_COUNTER)
+        return items, total
+
+    async def list_page(
+        self,
+        page: int,
+        page_size: int,
+        flt: Optional[HistoryFilter] = None,
+        offset: Optional[int] = None,
+    ) -> Sequence[Row]:
+        """Offset page of (id, currency, date_, price) rows; no ORM objects are hydrated."""
+        if offset is None:
+            offset = (page - 1) * page_size
+        stmt = _history_columns().offset(offset).limit(page_size)
+        if flt is not None:
+            stmt = flt.apply(stmt)
+        result = await self._session.execute(stmt)
+        return result.all()
+
+    async def stream_rows(
+        self, flt: Optional[HistoryFilter] = None, batch_size: int = 1000
+    ) -> AsyncIterator[Sequence[Any]]:
+        """
+        Yield batches of (id, currency, date_, price) rows via a server-side cursor.
+
+        Plain column tuples are returned, so no ORM objects are hydrated.
+        """
+        stmt = _history_columns().execution_options(yield_per=batch_size)
+        if flt is not None:
+            stmt = flt.apply(stmt)
+        result = await self._session.stream(stmt)
+        try:
+            async for batch in result.partitions():
+                yield batch
+        finally:
+            await result.close()
+
+    async def count(
+        self, mode: str = TOTAL_COUNTER, flt: Optional[HistoryFilter] = None
+    ) -> tuple[int, bool]:
+        """
+        Return (total rows, is_estimate).
+
+        ``counter`` reads the maintained row counter, ``estimated`` uses Postgres
+        planner statistics (falling back to the counter elsewhere) and ``exact``
+        runs COUNT(*). Filtered counts are always exact.
+        """
+        if flt is not None and not flt.is_empty():
+            count_stmt = flt.apply(select(func.count()).select_from(Currency))
+            count_result = await self._session.execute(count_stmt)
+            return int(count_result.scalar_one()), False
+        if mode == TOTAL_ESTIMATED:
+            estimate = await self._count_estimated()
+            if estimate is not None:
+                return estimate, True
+            mode = TOTAL_COUNTER
+        if mode == TOTAL_COUNTER:
+            result = await self._session.execute(
+                select(func.sum(RowCount.value)).where(RowCount.table_name == Currency.__tablename__)
+            )
+            value = result.scalar_one_or_none()
+            if value is not None:
+                return int(value), False
+        count_result = await self._session.execute(select(func.count()).select_from(Currency))
+        return int(count_result.scalar_one()), False
+
+    async def _count_estimated(self) -> Optional[int]:
+        if self._session.bind.dialect.name != "postgresql":
+            return None
+        result = await self._session.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:name AS regclass)"),
+            {"name": Currency.__tablename__},
+        )
+        estimate = result.scalar_one_or_none()
+        # reltuples is -1 until the table has been vacuumed or analyzed
+        if estimate is None or estimate < 0:
+            return None
+        return int(estimate)
+
+    async def _bump_count(self, delta: int) -> None:
+        if delta:
+            await self._session.execute(
+                update(RowCount)
+                .where(
+                    RowCount.table_name == Currency.__tablename__,
+                    RowCount.stripe == random.randrange(COUNTER_STRIPES),
+                )
+                .values(value=RowCount.value + delta)
+            )
+
+    async def list_after(
+        self,
+        after: Optional[tuple[datetime, int]],
+        limit: int,
+        flt: Optional[HistoryFilter] = None,
+    ) -> Sequence[Row]:
+        """Keyset page in (date_ DESC, id DESC) order, starting after the given (date_, id)."""
+        stmt = _history_columns().limit(limit)
+        if flt is not None:
+            stmt = flt.apply(stmt)
+        if after is not None:
+            stmt = stmt.where(tuple_(Currency.date_, Currency.id) < tuple_(*after))
         result = await self._session.execute(stmt)
-        items = result.scalars().all()
-        count_result = await self._session.execute(count_stmt)
-        total = count_result.scalar_one()
-        return items, int(total)
+        return result.all()
 
     async def delete_all(self) -> int:
+        if self._partitioned:
+            return await self.truncate()
         stmt = delete(Currency)
         result = await self._session.execute(stmt)
-        return result.rowcount or 0
+        deleted = result.rowcount or 0
+        await self._bump_count(-deleted)
+        await self._candles.delete_range()
+        return deleted
+
+    async def truncate(self) -> Optional[int]:
+        """
+        TRUNCATE the history and candle rollups; returns the removed row count.
+
+        Returns None without doing anything on databases without TRUNCATE (SQLite).
+        """
+        if self._session.bind.dialect.name != "postgresql":
+            return None
+        await self._session.execute(
+            text(f"TRUNCATE TABLE {Currency.__tablename__}, {Candle.__tablename__}")
+        )
+        # TRUNCATE holds an exclusive lock, so the counter now reflects exactly the removed rows
+        deleted, _ = await self.count(TOTAL_COUNTER)
+        await self._session.execute(
+            update(RowCount).where(RowCount.table_name == Currency.__tablename__).values(value=0)
+        )
+        return deleted
+
+    async def delete_batch(self, flt: Optional[HistoryFilter], limit: int) -> int:
+        """Delete at most ``limit`` rows matching the filter; returns the number deleted."""
+        ids = select(Currency.id).limit(limit)
+        if flt is not None:
+            ids = flt.apply(ids)
+        result = await self._session.execute(delete(Currency).where(Currency.id.in_(ids)))
+        deleted = result.rowcount or 0
+        await self._bump_count(-deleted)
+        return deleted
+
+    async def drop_partitions_before(self, cutoff: datetime) -> int:
+        """Drop partitions entirely below the cutoff (partitioned tables only); returns their row count."""
+        deleted = 0
+        if self._partitioned:
+            conn = await self._session.connection()
+            for name, upper in await list_partitions(conn):
+                if upper is not None and upper <= cutoff:
+                    result = await self._session.execute(text(f"SELECT count(*) FROM {name}"))
+                    deleted += int(result.scalar_one())
+                    await self._session.execute(text(f"DROP TABLE {name}"))
+            await self._bump_count(-deleted)
+        return deleted
+
+    async def delete_before(self, cutoff: datetime) -> int:
+        """
+        Delete rows with date_ < cutoff.
+
+        On a partitioned table, partitions entirely below the cutoff are dropped
+        and only the boundary partition is deleted row by row. Candle rollups
+        are kept, so charts still cover the purged range.
+        """
+        deleted = await self.drop_partitions_before(cutoff)
+        result = await self._session.execute(delete(Currency).where(Currency.date_ < cutoff))
+        deleted += result.rowcount or 0
+        await self._bump_count(-(result.rowcount or 0))
+        return deleted
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from app.repositories.candle_repository import Buckets, CandleRepository, fold_ticks, merge_bucket
+
+
+logger = logging.getLogger(__name__)
+
+Tick = Tuple[int, str, datetime, Decimal]
+
+
+class CandleRollup:
+    """
+    Folds committed price ticks into the candle rollups off the insert path.
+
+    Writers hand over (id, currency, date_, price) ticks after their insert
+    has committed; they are pre-aggregated per bucket in memory and upserted
+    every ``flush_interval_seconds`` in a transaction of their own, so price
+    inserts never wait on candle row locks. A failed flush keeps its buckets
+    for the next one. Ticks still pending when the process dies are lost
+    from the candles (not from the raw history); rebuild them with
+    ``app.commands.backfill_candles``.
+    """
+
+    def __init__(self, session_factory, flush_interval_seconds: float = 1.0) -> None:
+        self._session_factory = session_factory
+        self._interval = flush_interval_seconds
+        self._pending: Buckets = {}
+        self._task: Optional[asyncio.Task] = None
+        self._ticks = 0
+        self._flushes = 0
+        self._flushed_buckets = 0
+        self._failed_flushes = 0
+
+    def add(self, ticks: Iterable[Tick]) -> None:
+        ticks = list(ticks)
+        fold_ticks(self._pending, ticks)
+        self._ticks += len(ticks)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the periodic flush and write whatever is still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Upsert the pending buckets; returns how many were written."""
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        try:
+            async with self._session_factory() as session:
+                await CandleRepository(session).upsert(pending.values())
+                await session.commit()
+        except Exception as e:  # noqa: BLE001
+            self._failed_flushes += 1
+            logger.error(f"Failed to roll up {len(pending)} candle buckets: {e}")
+            # Ticks added meanwhile went to the new dict; fold the failed rows back in
+            for row in pending.values():
+                merge_bucket(self._pending, row)
+            return 0
+        self._flushes += 1
+        self._flushed_buckets += len(pending)
+        return len(pending)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending_buckets": len(self._pending),
+            "ticks_added": self._ticks,
+            "flushes": self._flushes,
+            "flushed_buckets": self._flushed_buckets,
+            "failed_flushes": self._failed_flushes,
+        }
+
+
+async def roll_up(session, rollup: Optional[CandleRollup], ticks: Iterable[Tick]) -> None:
+    """
+    Fold ticks whose insert has just committed into the candles.
+
+    Hands them to ``rollup`` when there is one; otherwise applies them right
+    away in a short transaction of their own on ``session``.
+    """
+    if rollup is not None:
+        rollup.add(ticks)
+        return
+    await CandleRepository(session).apply_ticks(ticks)
+    await session.commit()
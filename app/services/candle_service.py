@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.candle import CANDLE_INTERVALS
+from app.repositories.candle_repository import CandleRepository, bucket_start
+from app.repositories.currency_repository import CurrencyRepository, HistoryFilter
+from app.services.retention import RetentionPolicy, utc_now
+
+
+logger = logging.getLogger(__name__)
+
+
+class CandleService:
+    MAX_CANDLES = 1000
+
+    def __init__(self, session: AsyncSession) -> None:
+        self._repo = CandleRepository(session)
+
+    async def get_candles(
+        self,
+        currency: str,
+        interval: str,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        limit: int = 500,
+    ) -> list[dict]:
+        if interval not in CANDLE_INTERVALS:
+            raise ValueError(f"interval must be one of: {', '.join(CANDLE_INTERVALS)}")
+        limit = max(1, min(limit, self.MAX_CANDLES))
+        candles = await self._repo.list_candles(
+            currency=currency.lower(),
+            interval=interval,
+            date_from=date_from,
+            date_to=date_to,
+            limit=limit,
+        )
+        return [c.to_dict() for c in candles]
+
+
+async def backfill_candles(
+    session_factory,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    batch_size: int = 5000,
+    retention: Optional[RetentionPolicy] = None,
+    now: Optional[datetime] = None,
+) -> int:
+    """
+    Rebuild candles from raw rows in [date_from, date_to).
+
+    The range is widened to whole days so every interval's buckets are rebuilt
+    completely. Run it while no prices are being recorded for the range,
+    otherwise concurrent ticks can be counted twice. With ``retention`` on,
+    the range starts no earlier than the first whole day after the raw
+    cutoff: older candles are the only copy of compacted history and are
+    never deleted.
+    """
+    if date_from is not None:
+        date_from = bucket_start(date_from, "1d")
+    if date_to is not None and bucket_start(date_to, "1d") != date_to:
+        date_to = bucket_start(date_to, "1d") + timedelta(days=1)
+    raw_cutoff = retention.raw_cutoff(now or utc_now()) if retention is not None else None
+    if raw_cutoff is not None:
+        # Whole days only, and a margin for the cutoff moving while this runs
+        first_day = bucket_start(raw_cutoff, "1d") + timedelta(days=1)
+        if date_from is None or date_from < first_day:
+            logger.info(f"Raw history before {first_day} may be compacted; its candles are kept as they are")
+            date_from = first_day
+        if date_to is not None and date_to <= date_from:
+            return 0
+
+    rows = 0
+    async with session_factory() as read_session, session_factory() as write_session:
+        candles = CandleRepository(write_session)
+        deleted = await candles.delete_range(date_from=date_from, date_to=date_to)
+        logger.info(f"Deleted {deleted} candles in backfill range")
+        stream = CurrencyRepository(read_session).stream_rows(
+            flt=HistoryFilter(date_from=date_from, date_to=date_to),
+            batch_size=batch_size,
+        )
+        async for batch in stream:
+            await candles.apply_ticks(batch)
+            rows += len(batch)
+            logger.info(f"Backfilled candles from {rows} rows")
+        await write_session.commit()
+    return rows
@@ -1,16 +1,24 @@
 from __future__ import annotations
 
+import base64
+import binascii
 import logging
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from decimal import Decimal
 from math import ceil
-from typing import Sequence
+from typing import Any, AsyncIterator, Mapping, Optional, Sequence
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.repositories.currency_repository import CurrencyRepository
+from app.repositories.currency_repository import CurrencyRepository, HistoryFilter, TOTAL_COUNTER
 from app.models.currency import Currency
+from app.services.candle_rollup import CandleRollup, roll_up
+from app.services.history_cache import HistoryCache
+from app.services.history_tiers import TieredHistory
+from app.services.price_writer import PriceWriteBuffer
+from app.services.recent_prices import RecentPrices
+from app.services.retention import RetentionPolicy, utc_now
 
 
 logger = logging.getLogger(__name__)
@@ -18,43 +26,164 @@ logger = logging.getLogger(__name__)
 
 @dataclass(frozen=True)
 class Page:
+    # Raw column values (datetime, Decimal); formatting is left to the JSON encoder
     items: Sequence[dict]
     page: int
     page_size: int
-    total: int
-    total_pages: int
+    total: Optional[int]
+    total_pages: Optional[int]
+    total_estimated: bool = False
+
+
+@dataclass(frozen=True)
+class CursorPage:
+    items: Sequence[dict]
+    page_size: int
+    next_cursor: Optional[str]
+
+
+def encode_cursor(date_: datetime, id_: int) -> str:
+    raw = f"{date_.isoformat()}|{id_}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        date_str, id_str = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(date_str), int(id_str)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError("invalid cursor") from e
 
 
 class CurrencyService:
-    def __init__(self, session: AsyncSession, page_size: int) -> None:
+    def __init__(
+        self,
+        session: AsyncSession,
+        page_size: int,
+        write_buffer: Optional[PriceWriteBuffer] = None,
+        total_mode: str = TOTAL_COUNTER,
+        partitioned: bool = False,
+        history_cache: Optional[HistoryCache] = None,
+        retention: Optional[RetentionPolicy] = None,
+        recent_prices: Optional[RecentPrices] = None,
+        candle_rollup: Optional[CandleRollup] = None,
+    ) -> None:
         self._session = session
-        self._repo = CurrencyRepository(session)
+        self._repo = CurrencyRepository(session, partitioned=partitioned)
         self._page_size = page_size
+        self._write_buffer = write_buffer
+        self._total_mode = total_mode
+        self._history_cache = history_cache
+        self._recent_prices = recent_prices
+        self._candle_rollup = candle_rollup
+        # History past the raw retention is read from the downsampled candle tiers
+        self._tiers = TieredHistory(session, retention) if retention is not None and retention.enabled else None
 
     async def record_current_price(self, currency: str, price: Decimal) -> dict:
         now = datetime.now(tz=timezone.utc).replace(tzinfo=None, microsecond=0)
         logger.info(f"Recording price for {currency}: {price} at {now}")
+        if self._write_buffer is not None:
+            data = await self._write_buffer.submit(currency=currency.lower(), date_=now, price=price)
+            self._remember(currency, now, price)
+            return data
         entity = await self._repo.add(currency=currency.lower(), date_=now, price=price)
         await self._session.commit()
+        await roll_up(self._session, self._candle_rollup, [(entity.id, entity.currency, now, price)])
+        self._invalidate_history()
+        self._remember(currency, now, price)
         return entity.to_dict()
 
-    async def get_history(self, page: int) -> Page:
+    async def record_current_prices(self, prices: Mapping[str, Decimal]) -> list[dict]:
+        now = datetime.now(tz=timezone.utc).replace(tzinfo=None, microsecond=0)
+        logger.info(f"Recording {len(prices)} prices at {now}")
+        entities = await self._repo.add_many(
+            (currency.lower(), now, price) for currency, price in prices.items()
+        )
+        await self._session.commit()
+        await roll_up(self._session, self._candle_rollup, ((e.id, e.currency, e.date_, e.price) for e in entities))
+        self._invalidate_history()
+        for currency, price in prices.items():
+            self._remember(currency, now, price)
+        return [e.to_dict() for e in entities]
+
+    async def get_history(
+        self,
+        page: int,
+        include_total: bool = True,
+        flt: Optional[HistoryFilter] = None,
+    ) -> Page:
         if page < 1:
             page = 1
-        items, total = await self._repo.list_paginated(page=page, page_size=self._page_size)
-        total_pages = ceil(total / self._page_size) if total else 1
+        if self._tiers is not None:
+            return await self._get_tiered_history(page, include_total, flt or HistoryFilter())
+        items = await self._repo.list_page(page=page, page_size=self._page_size, flt=flt)
+        total = total_pages = None
+        total_estimated = False
+        if include_total:
+            total, total_estimated = await self._repo.count(self._total_mode, flt=flt)
+            total_pages = ceil(total / self._page_size) if total else 1
         return Page(
-            items=[i.to_dict() for i in items],
+            items=[row._asdict() for row in items],
             page=page,
             page_size=self._page_size,
             total=total,
             total_pages=total_pages,
+            total_estimated=total_estimated,
         )
 
+    async def _get_tiered_history(self, page: int, include_total: bool, flt: HistoryFilter) -> Page:
+        items, total, total_estimated = await self._tiers.page(
+            flt, utc_now(), offset=(page - 1) * self._page_size, limit=self._page_size,
+            include_total=include_total, total_mode=self._total_mode,
+        )
+        return Page(
+            items=items,
+            page=page,
+            page_size=self._page_size,
+            total=total,
+            total_pages=(ceil(total / self._page_size) if total else 1) if include_total else None,
+            total_estimated=total_estimated,
+        )
+
+    async def get_history_after(
+        self, cursor: Optional[str], flt: Optional[HistoryFilter] = None
+    ) -> CursorPage:
+        if self._tiers is not None:
+            items, next_cursor = await self._tiers.after(
+                flt or HistoryFilter(), utc_now(), cursor, self._page_size
+            )
+            return CursorPage(items=items, page_size=self._page_size, next_cursor=next_cursor)
+        after = decode_cursor(cursor) if cursor else None
+        items = await self._repo.list_after(after=after, limit=self._page_size + 1, flt=flt)
+        next_cursor = None
+        if len(items) > self._page_size:
+            items = items[:self._page_size]
+            next_cursor = encode_cursor(items[-1].date_, items[-1].id)
+        return CursorPage(
+            items=[row._asdict() for row in items],
+            page_size=self._page_size,
+            next_cursor=next_cursor,
+        )
+
+    def _remember(self, currency: str, date_: datetime, price: Decimal) -> None:
+        if self._recent_prices is not None:
+            self._recent_prices.add(currency, date_, price)
+
+    def _invalidate_history(self) -> None:
+        # Buffered writes invalidate from the write buffer once they are committed
+        if self._history_cache is not None:
+            self._history_cache.invalidate()
+
+    def stream_history(
+        self, flt: Optional[HistoryFilter] = None, batch_size: int = 1000
+    ) -> AsyncIterator[Sequence[Any]]:
+        return self._repo.stream_rows(flt=flt, batch_size=batch_size)
+
     async def delete_all(self) -> int:
         logger.info("Deleting all price records")
         deleted = await self._repo.delete_all()
         await self._session.commit()
+        self._invalidate_history()
         logger.info(f"Deleted {deleted} price records")
         return deleted
-        return deleted
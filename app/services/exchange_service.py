@@ -1,42 +1,450 @@
 from __future__ import annotations
 
+import asyncio
 import logging
-from datetime import datetime
+import time
 from decimal import Decimal
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
 
 import ccxt.async_support as ccxt
 
+from app.services.http_pool import ExchangeHttpPool
+from app.services.metrics_service import Histogram
+from app.services.resilience import (
+    AdaptiveLimiter,
+    CircuitBreaker,
+    CircuitOpenError,
+    ExchangeTimeout,
+    ExchangeUnavailable,
+)
+from app.services.symbol_registry import SymbolRegistry
+from app.services.ticker_cache import TickerCache
+
+if TYPE_CHECKING:
+    from app.services.price_stream import PriceBook
+
 
 logger = logging.getLogger(__name__)
 
+# Hedge delays are derived from observed latency only after this many samples
+MIN_HEDGE_SAMPLES = 20
+# A price request at least this fast counts as "warm" for time-to-first-fast-request
+FAST_REQUEST_SECONDS = 0.5
 
-class ExchangeService:
-    """Service to interact with exchanges via ccxt async API."""
 
-    def __init__(self, exchange_id: str = "kucoin") -> None:
-        if exchange_id != "kucoin":
-            raise ValueError("Only 'kucoin' exchange is supported for this task")
-        self._exchange = ccxt.kucoin({'enableRateLimit': True})
-        logger.info(f"Initialized {exchange_id} exchange service")
+def extract_bid(ticker: dict) -> Optional[Decimal]:
+    """Return the best bid from a ccxt ticker, falling back to raw exchange fields."""
+    bid = ticker.get("bid")
+    if bid is None:
+        info = ticker.get("info") or {}
+        bid = info.get("bestBid") or info.get("bid")
+    if bid is None:
+        return None
+    return Decimal(str(bid))
 
-    async def get_bid_price_usdt_pair(self, currency: str) -> Decimal:
-        symbol = f"{currency.upper()}/USDT"
-        logger.debug(f"Fetching bid price for {symbol}")
+
+class ExchangeBackend:
+    """
+    One ccxt exchange plus its symbol mapping, latency/win statistics and guards.
+
+    Every call goes through the exchange's circuit breaker and adaptive
+    concurrency limiter and is bounded by ``timeout_seconds``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        client: Any,
+        symbol_map: Optional[Mapping[str, str]] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        limiter: Optional[AdaptiveLimiter] = None,
+        timeout_seconds: float = 5.0,
+    ) -> None:
+        self.name = name
+        self.client = client
+        # Upper-case currency -> exchange symbol, for listings that differ from {CUR}/USDT
+        self._symbol_map = {k.upper(): v for k, v in (symbol_map or {}).items()}
+        self.breaker = breaker or CircuitBreaker()
+        self.limiter = limiter or AdaptiveLimiter()
+        self._timeout = timeout_seconds
+        self.latency = Histogram()
+        self.requests = 0
+        self.wins = 0
+        self.errors = 0
+        self.cancelled = 0
+
+    def symbol(self, currency: str) -> str:
+        currency = currency.upper()
+        return self._symbol_map.get(currency, f"{currency}/USDT")
+
+    def lists(self, currency: str) -> Optional[bool]:
+        """Whether the loaded market list has the currency's symbol; None before markets are loaded."""
+        markets = getattr(self.client, "markets", None)
+        if not markets:
+            return None
+        return self.symbol(currency) in markets
+
+    async def call(self, method: str, *args: Any, counted: bool = True) -> Any:
+        """
+        Call ``client.<method>(*args)`` through the breaker, limiter and deadline.
+
+        Calls made with ``counted=False`` are left out of ``requests``, so
+        helper calls do not dilute the win rate of the price requests.
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        try:
+            await self.limiter.acquire()
+        except BaseException:
+            self.breaker.record_abandoned()
+            raise
+        self.requests += counted
+        ok: Optional[bool] = None
+        started = time.perf_counter()
         try:
-            ticker = await self._exchange.fetch_ticker(symbol)
+            result = await asyncio.wait_for(getattr(self.client, method)(*args), self._timeout)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            self.breaker.record_abandoned()
+            raise
+        except asyncio.TimeoutError:
+            ok = False
+            raise ExchangeTimeout(f"{self.name} did not answer within {self._timeout}s") from None
+        except ccxt.BadSymbol:
+            # The exchange answered; an unknown symbol says nothing about its health
+            ok = True
+            raise
+        except ccxt.NetworkError as e:
+            ok = False
+            raise ExchangeUnavailable(f"{self.name}: {e}") from e
+        except Exception:
+            ok = False
+            raise
+        else:
+            ok = True
+            return result
+        finally:
+            elapsed = time.perf_counter() - started
+            self.limiter.release(elapsed, ok)
+            if ok is not None:
+                self.latency.observe(elapsed)
+                if ok:
+                    self.breaker.record_success()
+                else:
+                    self.errors += 1
+                    self.breaker.record_failure()
+
+    async def fetch_bid(self, currency: str) -> Decimal:
+        symbol = self.symbol(currency)
+        if self.lists(currency) is False:
+            # Another exchange may list it; no need to spend a request finding out here
+            raise ValueError(f"Currency not found: {currency}")
+        try:
+            ticker = await self.call("fetch_ticker", symbol)
         except ccxt.BadSymbol as e:
-            logger.warning(f"Currency not found: {currency}")
+            logger.warning(f"Currency not found on {self.name}: {currency}")
             raise ValueError(f"Currency not found: {currency}") from e
-        bid = ticker.get("bid")
-        if bid is None:
-            info = ticker.get("info") or {}
-            bid = info.get("bestBid") or info.get("bid")
+        bid = extract_bid(ticker)
         if bid is None:
-            logger.error(f"Bid price unavailable for {symbol}")
+            self.errors += 1
+            logger.error(f"Bid price unavailable for {symbol} on {self.name}")
             raise RuntimeError("Bid price unavailable from exchange")
-        logger.info(f"Fetched {symbol} bid price: {bid}")
-        return Decimal(str(bid))
+        logger.info(f"Fetched {symbol} bid price from {self.name}: {bid}")
+        return bid
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self.latency.snapshot()
+        return {
+            "requests": self.requests,
+            "wins": self.wins,
+            "errors": self.errors,
+            "cancelled": self.cancelled,
+            "win_rate": self.wins / self.requests if self.requests > 0 else 0.0,
+            "latency_p50": snapshot["p50"],
+            "latency_p95": snapshot["p95"],
+            "latency_p99": snapshot["p99"],
+            "breaker": self.breaker.stats(),
+            "limiter": self.limiter.stats(),
+        }
+
+
+class ExchangeService:
+    """
+    Service to interact with exchanges via ccxt async API.
+
+    Exchanges are tried in the configured order. A single-symbol request goes
+    to the primary first; if it has not answered within its observed
+    ``hedge_percentile`` latency, one hedged request is sent to the next
+    exchange and the first valid bid wins (the other request is cancelled).
+    Errors fail over to the next exchange in the list. Clients created here
+    share the connections of ``http_pool`` when one is given.
+    """
+
+    def __init__(
+        self,
+        exchange_ids: Union[str, Sequence[str]] = ("kucoin",),
+        ticker_cache: Optional[TickerCache] = None,
+        price_book: Optional["PriceBook"] = None,
+        clients: Optional[Mapping[str, Any]] = None,
+        symbol_map: Optional[Mapping[str, Mapping[str, str]]] = None,
+        hedge_percentile: float = 0.95,
+        hedge_initial_delay: float = 0.2,
+        hedge_min_delay: float = 0.02,
+        timeout_seconds: float = 5.0,
+        breaker_failures: int = 5,
+        breaker_reset_seconds: float = 10.0,
+        concurrency_initial: int = 10,
+        concurrency_max: int = 100,
+        queue_size: int = 100,
+        queue_timeout_seconds: float = 1.0,
+        latency_target_seconds: float = 1.0,
+        stale_max_age_seconds: float = 0.0,
+        negative_cache_size: int = 10000,
+        negative_cache_ttl_seconds: float = 600.0,
+        http_pool: Optional[ExchangeHttpPool] = None,
+    ) -> None:
+        if isinstance(exchange_ids, str):
+            exchange_ids = (exchange_ids,)
+        if not exchange_ids:
+            raise ValueError("At least one exchange is required")
+        clients = clients or {}
+        symbol_map = symbol_map or {}
+        self._backends: List[ExchangeBackend] = []
+        for exchange_id in exchange_ids:
+            # ``clients`` lets tests and benchmarks plug in ccxt-compatible stubs
+            client = clients.get(exchange_id)
+            if client is None:
+                if exchange_id not in ccxt.exchanges:
+                    raise ValueError(f"Unsupported exchange: {exchange_id}")
+                options: Dict[str, Any] = {'enableRateLimit': True}
+                if http_pool is not None:
+                    options.update(http_pool.client_config())
+                client = getattr(ccxt, exchange_id)(options)
+            self._backends.append(ExchangeBackend(
+                exchange_id,
+                client,
+                symbol_map.get(exchange_id),
+                breaker=CircuitBreaker(breaker_failures, breaker_reset_seconds),
+                limiter=AdaptiveLimiter(
+                    initial_limit=concurrency_initial,
+                    max_limit=concurrency_max,
+                    max_queue=queue_size,
+                    queue_timeout_seconds=queue_timeout_seconds,
+                    latency_target_seconds=latency_target_seconds,
+                ),
+                timeout_seconds=timeout_seconds,
+            ))
+        self._http_pool = http_pool
+        self._symbols = SymbolRegistry(self._backends, negative_cache_size, negative_cache_ttl_seconds)
+        self._ticker_cache = ticker_cache
+        self._price_book = price_book
+        self._hedge_percentile = hedge_percentile
+        self._hedge_initial_delay = hedge_initial_delay
+        self._hedge_min_delay = hedge_min_delay
+        self._stale_max_age = stale_max_age_seconds
+        self._hedges = 0
+        self._failovers = 0
+        self._stale_served = 0
+        self._created = time.monotonic()
+        self._first_request_seconds: Optional[float] = None
+        self._first_fast_request_after: Optional[float] = None
+        logger.info(f"Initialized exchange service: {', '.join(exchange_ids)}")
+
+    @property
+    def ticker_cache(self) -> Optional[TickerCache]:
+        return self._ticker_cache
+
+    @property
+    def backends(self) -> Sequence[ExchangeBackend]:
+        return tuple(self._backends)
+
+    async def get_bid_price_usdt_pair(self, currency: str) -> Decimal:
+        if self._first_fast_request_after is not None:
+            return await self._get_bid_price_usdt_pair(currency)
+        started = time.monotonic()
+        bid = await self._get_bid_price_usdt_pair(currency)
+        finished = time.monotonic()
+        if self._first_request_seconds is None:
+            self._first_request_seconds = finished - started
+        if finished - started <= FAST_REQUEST_SECONDS:
+            self._first_fast_request_after = finished - self._created
+        return bid
+
+    async def _get_bid_price_usdt_pair(self, currency: str) -> Decimal:
+        self._symbols.check(currency)
+        symbol = f"{currency.upper()}/USDT"
+        if self._price_book is not None:
+            bid = self._price_book.get_bid(symbol)
+            if bid is not None:
+                return bid
+        if self._ticker_cache is None:
+            return await self._fetch_bid(currency)
+        return await self._ticker_cache.get_or_fetch(symbol, lambda: self._fetch_bid(currency))
+
+    def get_stale_bid(self, currency: str) -> Optional[Tuple[Decimal, float]]:
+        """
+        Last cached bid and its age in seconds, for use when the exchanges are unavailable.
+
+        Returns None unless stale serving is enabled and the cached bid is
+        younger than ``stale_max_age_seconds``.
+        """
+        if self._stale_max_age <= 0 or self._ticker_cache is None:
+            return None
+        stale = self._ticker_cache.get_stale(f"{currency.upper()}/USDT", self._stale_max_age)
+        if stale is not None:
+            self._stale_served += 1
+        return stale
+
+    def _hedge_delay(self) -> Optional[float]:
+        """Seconds to wait on the primary before hedging, None when hedging is off."""
+        if self._hedge_percentile <= 0 or len(self._backends) < 2:
+            return None
+        latency = self._backends[0].latency
+        if latency.count < MIN_HEDGE_SAMPLES:
+            return self._hedge_initial_delay
+        delay = latency.percentile(self._hedge_percentile)
+        if delay is None:
+            delay = latency.buckets[-1]
+        return max(delay, self._hedge_min_delay)
+
+    async def _fetch_bid(self, currency: str) -> Decimal:
+        logger.debug(f"Fetching bid price for {currency}/USDT")
+        backends = self._backends
+        tasks: Dict[asyncio.Task, ExchangeBackend] = {}
+        errors: List[Exception] = []
+        next_index = 0
+        hedge_delay = self._hedge_delay()
+        hedge_at = time.monotonic() + hedge_delay if hedge_delay is not None else None
+
+        def launch() -> None:
+            nonlocal next_index
+            backend = backends[next_index]
+            next_index += 1
+            tasks[asyncio.ensure_future(backend.fetch_bid(currency))] = backend
+
+        launch()
+        try:
+            while tasks:
+                timeout = None
+                if hedge_at is not None and next_index < len(backends):
+                    timeout = max(hedge_at - time.monotonic(), 0)
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedge_at = None
+                    self._hedges += 1
+                    launch()
+                    continue
+                for task in done:
+                    backend = tasks.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        backend.wins += 1
+                        return task.result()
+                    errors.append(error)
+                if not tasks and next_index < len(backends):
+                    self._failovers += 1
+                    logger.warning(f"Failing over to {backends[next_index].name} for {currency}: {errors[-1]}")
+                    launch()
+        finally:
+            # Cancel the loser (or everything, if we were cancelled ourselves)
+            for task in tasks:
+                task.cancel()
+
+        # Not found everywhere -> 400; any other failure wins over "not found"
+        for error in errors:
+            if not isinstance(error, ValueError):
+                raise error
+        self._symbols.remember_missing(currency)
+        raise errors[-1]
+
+    async def get_bid_prices_usdt_pairs(
+        self, currencies: Sequence[str]
+    ) -> Tuple[Dict[str, Decimal], Dict[str, str]]:
+        """
+        Fetch bid prices for several {currency}/USDT pairs with one fetch_tickers call per exchange.
+
+        Returns a tuple of (prices, errors), both keyed by upper-case currency.
+        Currencies an exchange does not list or fails on are retried on the
+        next one; whatever is still missing is reported in errors instead of
+        failing the whole batch.
+        """
+        prices: Dict[str, Decimal] = {}
+        errors: Dict[str, str] = {}
+        remaining = []
+        for currency in currencies:
+            currency = currency.upper()
+            try:
+                self._symbols.check(currency)
+            except ValueError as e:
+                errors[currency] = str(e)
+                continue
+            remaining.append(currency)
+        for backend in self._backends:
+            if not remaining:
+                break
+            try:
+                fetched, failed = await self._fetch_batch(backend, remaining)
+            except Exception as e:  # noqa: BLE001
+                logger.warning(f"Batch fetch failed on {backend.name}: {e}")
+                errors.update({c: f"Exchange error: {e}" for c in remaining})
+                continue
+            prices.update(fetched)
+            for currency in fetched:
+                errors.pop(currency, None)
+            errors.update(failed)
+            remaining = list(failed)
+        logger.info(f"Fetched {len(prices)} bid prices, {len(errors)} failed")
+        return prices, errors
+
+    async def _fetch_batch(
+        self, backend: ExchangeBackend, currencies: Sequence[str]
+    ) -> Tuple[Dict[str, Decimal], Dict[str, str]]:
+        prices: Dict[str, Decimal] = {}
+        errors: Dict[str, str] = {}
+        # Served from ccxt's cache once loaded; the batch counts as one request, like a single fetch
+        markets = await backend.call("load_markets", counted=False)
+        symbols: Dict[str, str] = {}
+        for currency in currencies:
+            symbol = backend.symbol(currency)
+            if symbol in markets:
+                symbols[symbol] = currency
+            else:
+                errors[currency] = f"Currency not found: {currency}"
+
+        if symbols:
+            logger.debug(f"Fetching bid prices for {len(symbols)} symbols from {backend.name}")
+            tickers = await backend.call("fetch_tickers", list(symbols))
+            backend.wins += 1
+            for symbol, currency in symbols.items():
+                bid = extract_bid(tickers.get(symbol) or {})
+                if bid is None:
+                    errors[currency] = "Bid price unavailable from exchange"
+                    continue
+                prices[currency] = bid
+                if self._ticker_cache is not None:
+                    self._ticker_cache.put(f"{currency}/USDT", bid)
+        return prices, errors
+
+    def stats(self) -> Dict[str, Any]:
+        delay = self._hedge_delay()
+        return {
+            "hedges": self._hedges,
+            "failovers": self._failovers,
+            "stale_served": self._stale_served,
+            "symbols": self._symbols.stats(),
+            "hedge_delay": delay,
+            # Latency of the first price request, and seconds from worker start until
+            # one finished within FAST_REQUEST_SECONDS (None until it happens)
+            "first_request_seconds": self._first_request_seconds,
+            "time_to_first_fast_request_seconds": self._first_fast_request_after,
+            "backends": {b.name: b.stats() for b in self._backends},
+            "http_pool": self._http_pool.stats() if self._http_pool is not None else None,
+        }
 
     async def close(self) -> None:
-        logger.info("Closing exchange connection")
-        await self._exchange.close()
+        logger.info("Closing exchange connections")
+        for backend in self._backends:
+            await backend.client.close()
+        # ccxt leaves a session it was given open
+        if self._http_pool is not None:
+            await self._http_pool.close()
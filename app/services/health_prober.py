@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.services.exchange_service import ExchangeService
+from app.services.resilience import CircuitBreaker
+
+
+logger = logging.getLogger(__name__)
+
+
+class HealthProber:
+    """
+    Probes dependencies in the background and caches the result for health endpoints.
+
+    The database gets one ``SELECT 1`` per ``interval_seconds`` no matter how
+    often orchestrators poll. Exchange health is read from the circuit
+    breakers, which track real traffic, so probing costs no exchange rate
+    limit. A result older than ``stale_after_seconds`` means the prober
+    itself is stuck and counts as not ready.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        exchange_service: Optional[ExchangeService] = None,
+        interval_seconds: float = 5.0,
+        timeout_seconds: float = 2.0,
+        stale_after_seconds: Optional[float] = None,
+    ) -> None:
+        self._engine = engine
+        self._exchange = exchange_service
+        self._interval = interval_seconds
+        self._timeout = timeout_seconds
+        self._stale_after = stale_after_seconds if stale_after_seconds is not None else 3 * interval_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._result: Optional[Dict[str, Any]] = None
+        self._checked_at = 0.0
+        self._probes = 0
+        self._failures = 0
+
+    async def start(self) -> None:
+        await self.probe()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def probe(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        database = "connected"
+        try:
+            await asyncio.wait_for(self._probe_database(), self._timeout)
+        except asyncio.TimeoutError:
+            database = f"error: no answer within {self._timeout}s"
+        except Exception as e:  # noqa: BLE001
+            database = f"error: {e}"
+        exchanges = self._exchange_health()
+
+        ready = database == "connected"
+        if not ready:
+            status = "unavailable"
+        elif exchanges and all(state == CircuitBreaker.OPEN for state in exchanges.values()):
+            # History endpoints still work; price requests fail fast or serve stale
+            status = "degraded"
+        else:
+            status = "ok"
+        self._probes += 1
+        self._failures += not ready
+        self._result = {
+            "status": status,
+            "ready": ready,
+            "database": database,
+            "exchanges": exchanges,
+            "checked_at": datetime.now(tz=timezone.utc).isoformat(),
+            "probe_seconds": round(time.perf_counter() - started, 6),
+        }
+        self._checked_at = time.monotonic()
+        return self._result
+
+    async def _probe_database(self) -> None:
+        async with self._engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    def _exchange_health(self) -> Dict[str, str]:
+        if self._exchange is None:
+            return {}
+        return {backend.name: backend.breaker.state for backend in self._exchange.backends}
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                await self.probe()
+            except Exception as e:  # noqa: BLE001
+                logger.error(f"Health probe failed: {e}")
+
+    def result(self) -> Optional[Dict[str, Any]]:
+        """Last probe result with its age, or None before the first probe finished."""
+        if self._result is None:
+            return None
+        age = time.monotonic() - self._checked_at
+        result = dict(self._result, age_seconds=round(age, 3))
+        if age > self._stale_after:
+            result.update(status="stale", ready=False)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        result = self.result() or {}
+        return {
+            "probes": self._probes,
+            "failures": self._failures,
+            "interval_seconds": self._interval,
+            "ready": result.get("ready", False),
+            "age_seconds": result.get("age_seconds"),
+        }
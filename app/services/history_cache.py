@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+
+class HistoryCache:
+    """
+    Bounded LRU cache of serialized ``/price/history`` responses.
+
+    Entries are tagged with the write generation current when their query
+    started; any write bumps the generation, so older entries are never served
+    again. ``ttl_seconds`` bounds staleness from writes this process does not
+    see (other workers, other app instances). Each entry carries a strong ETag
+    derived from its body.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 8 * 1024 * 1024, ttl_seconds: float = 5.0) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be positive")
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._ttl = ttl_seconds
+        # key -> (generation, expires_at, etag, body)
+        self._entries: "OrderedDict[str, Tuple[int, float, str, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+        self._not_modified = 0
+        self._evictions = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    @staticmethod
+    def key(query: Mapping[str, str]) -> str:
+        """Order-independent cache key for the request's query parameters."""
+        return "&".join(f"{k}={v}" for k, v in sorted(query.items()))
+
+    @staticmethod
+    def etag_for(body: bytes) -> str:
+        return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+    def invalidate(self) -> None:
+        """Called on every write; cached pages from earlier generations become unreachable."""
+        self._generation += 1
+        self._entries.clear()
+        self._bytes = 0
+
+    def get(self, key: str) -> Optional[Tuple[str, bytes]]:
+        """(etag, body) for a live entry, else None."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            generation, expires_at, etag, body = entry
+            if generation == self._generation and time.monotonic() < expires_at:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return etag, body
+            self._drop(key)
+        self._misses += 1
+        return None
+
+    def put(self, key: str, body: bytes, generation: int) -> str:
+        """
+        Store a body computed while ``generation`` was current and return its ETag.
+
+        Bodies from a generation that has since been invalidated are not stored.
+        """
+        etag = self.etag_for(body)
+        if generation != self._generation or len(body) > self._max_bytes:
+            return etag
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (generation, time.monotonic() + self._ttl, etag, body)
+        self._bytes += len(key) + len(body)
+        while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+            self._drop(next(iter(self._entries)))
+            self._evictions += 1
+        return etag
+
+    def record_not_modified(self) -> None:
+        self._not_modified += 1
+
+    def _drop(self, key: str) -> None:
+        _, _, _, body = self._entries.pop(key)
+        self._bytes -= len(key) + len(body)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self._max_entries,
+            "bytes": self._bytes,
+            "max_bytes": self._max_bytes,
+            "generation": self._generation,
+            "hits": self._hits,
+            "misses": self._misses,
+            "not_modified": self._not_modified,
+            "evictions": self._evictions,
+            "hit_ratio": self._hits / lookups if lookups > 0 else 0.0,
+        }
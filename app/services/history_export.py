@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from typing import Any, Callable, Dict, Sequence
+
+
+CSV_HEADER = "id,currency,date_,price\r\n"
+
+
+def format_ndjson(rows: Sequence[Any]) -> str:
+    """Render (id, currency, date_, price) rows as newline-delimited JSON."""
+    return "".join(
+        f'{{"id":{id_},"currency":{json.dumps(currency)},'
+        f'"date_":"{date_.isoformat(timespec="seconds")}","price":"{price}"}}\n'
+        for id_, currency, date_, price in rows
+    )
+
+
+def format_csv(rows: Sequence[Any]) -> str:
+    """Render (id, currency, date_, price) rows as CSV lines (header not included)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(
+        (id_, currency, date_.isoformat(timespec="seconds"), price)
+        for id_, currency, date_, price in rows
+    )
+    return buffer.getvalue()
+
+
+EXPORT_FORMATS: Dict[str, tuple[str, str, Callable[[Sequence[Any]], str]]] = {
+    # format: (content type, header, row formatter)
+    "ndjson": ("application/x-ndjson", "", format_ndjson),
+    "csv": ("text/csv", CSV_HEADER, format_csv),
+}
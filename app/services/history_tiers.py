@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import base64
+import binascii
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Row
+
+from app.repositories.candle_repository import CandleRepository
+from app.repositories.currency_repository import (
+    TOTAL_COUNTER,
+    TOTAL_EXACT,
+    CurrencyRepository,
+    HistoryFilter,
+)
+from app.services.retention import RetentionPolicy
+
+
+# Cursor payload: tier interval ("" for raw ticks), date, then the raw id or candle currency
+Position = Tuple[str, datetime, str]
+
+
+def encode_tier_cursor(position: Position) -> str:
+    interval, date_, key = position
+    raw = f"{interval}|{date_.isoformat()}|{key}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_tier_cursor(cursor: str) -> Position:
+    """Accepts both tier cursors and the plain ``date|id`` cursors of untiered history."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        parts = base64.urlsafe_b64decode(padded).decode().split("|")
+        if len(parts) == 2:
+            parts = [""] + parts
+        interval, date_str, key = parts
+        if not interval:
+            int(key)
+        return interval, datetime.fromisoformat(date_str), key
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError("invalid cursor") from e
+
+
+@dataclass(frozen=True)
+class Tier:
+    interval: str  # "" for raw ticks, otherwise the candle interval
+    date_from: Optional[datetime]
+    date_to: Optional[datetime]
+
+
+def _later(a: Optional[datetime], b: Optional[datetime]) -> Optional[datetime]:
+    return b if a is None or (b is not None and b > a) else a
+
+
+def _earlier(a: Optional[datetime], b: Optional[datetime]) -> Optional[datetime]:
+    return b if a is None or (b is not None and b < a) else a
+
+
+def history_tiers(policy: RetentionPolicy, flt: HistoryFilter, now: datetime) -> List[Tier]:
+    """Newest-first tiers covering the filter's range, each clipped to its retention window."""
+    raw_cutoff = policy.raw_cutoff(now)
+    if raw_cutoff is None:
+        return [Tier("", flt.date_from, flt.date_to)]
+    minute_cutoff = policy.minute_cutoff(now)
+    windows = [("", raw_cutoff, None), ("1m", minute_cutoff, raw_cutoff)]
+    if minute_cutoff is not None:
+        windows.append(("1h", None, minute_cutoff))
+    tiers = []
+    for interval, lower, upper in windows:
+        date_from = _later(flt.date_from, lower)
+        date_to = _earlier(flt.date_to, upper)
+        if date_from is not None and date_to is not None and date_from >= date_to:
+            continue
+        tiers.append(Tier(interval, date_from, date_to))
+    return tiers
+
+
+class TieredHistory:
+    """
+    Price history read across retention tiers, newest first.
+
+    Recent rows come from raw ticks; older ones from 1m candles and, past
+    the minute retention, from hourly candles, reported with their closing
+    price and ``interval``. Offset pages only count a tier exactly when the
+    page starts beyond it; totals follow ``total_mode`` like untiered
+    history, with candle tiers estimated from the daily candles unless the
+    mode is ``exact``.
+    """
+
+    def __init__(self, session, policy: RetentionPolicy) -> None:
+        self._raw = CurrencyRepository(session)
+        self._candles = CandleRepository(session)
+        self._policy = policy
+
+    async def page(
+        self,
+        flt: HistoryFilter,
+        now: datetime,
+        offset: int,
+        limit: int,
+        include_total: bool,
+        total_mode: str = TOTAL_COUNTER,
+    ) -> Tuple[List[Dict[str, Any]], Optional[int], bool]:
+        """Returns (items, total, whether the total is an estimate)."""
+        items: List[Dict[str, Any]] = []
+        counts: Dict[str, int] = {}
+        estimated = False
+        for tier in history_tiers(self._policy, flt, now):
+            need = limit - len(items)
+            if need > 0:
+                rows = await self._list(tier, flt.currency, offset=offset, limit=need)
+                items.extend(self._item(tier, row) for row in rows)
+                if rows:
+                    if len(rows) < need:
+                        counts[tier.interval] = offset + len(rows)
+                    offset = 0
+                else:
+                    # The page starts past this tier: carrying the offset needs its exact size
+                    counts[tier.interval] = await self._count(tier, flt.currency)
+                    offset = max(offset - counts[tier.interval], 0)
+            if include_total and tier.interval not in counts:
+                counts[tier.interval], tier_estimated = await self._total(tier, flt, total_mode)
+                estimated = estimated or tier_estimated
+        total = sum(counts.values()) if include_total else None
+        return items, total, estimated
+
+    async def after(
+        self, flt: HistoryFilter, now: datetime, cursor: Optional[str], limit: int
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        position = decode_tier_cursor(cursor) if cursor else None
+        rows: List[Tuple[Tier, Row]] = []
+        for tier in history_tiers(self._policy, flt, now):
+            after = None
+            if position is not None:
+                interval, date_, key = position
+                if tier.interval != interval:
+                    continue
+                after = (date_, int(key) if not interval else key)
+                position = None
+            batch = await self._list(tier, flt.currency, after=after, limit=limit + 1 - len(rows))
+            rows.extend((tier, row) for row in batch)
+            if len(rows) > limit:
+                break
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            tier, row = rows[-1]
+            if tier.interval:
+                next_cursor = encode_tier_cursor((tier.interval, row.bucket_start, row.currency))
+            else:
+                next_cursor = encode_tier_cursor(("", row.date_, str(row.id)))
+        return [self._item(tier, row) for tier, row in rows], next_cursor
+
+    async def _list(
+        self, tier: Tier, currency: Optional[str], limit: int, offset: int = 0, after=None
+    ) -> Sequence[Row]:
+        if not tier.interval:
+            flt = HistoryFilter(currency=currency, date_from=tier.date_from, date_to=tier.date_to)
+            if after is not None:
+                return await self._raw.list_after(after=after, limit=limit, flt=flt)
+            return await self._raw.list_page(page=1, page_size=limit, flt=flt, offset=offset)
+        return await self._candles.list_history(
+            tier.interval, currency, tier.date_from, tier.date_to, offset=offset, limit=limit, after=after
+        )
+
+    async def _count(self, tier: Tier, currency: Optional[str]) -> int:
+        if not tier.interval:
+            flt = HistoryFilter(currency=currency, date_from=tier.date_from, date_to=tier.date_to)
+            total, _ = await self._raw.count(flt=flt)
+            return total
+        return await self._candles.count_history(tier.interval, currency, tier.date_from, tier.date_to)
+
+    async def _total(self, tier: Tier, flt: HistoryFilter, total_mode: str) -> Tuple[int, bool]:
+        if total_mode == TOTAL_EXACT:
+            return await self._count(tier, flt.currency), False
+        if tier.interval:
+            estimate = await self._candles.estimate_history(
+                tier.interval, flt.currency, tier.date_from, tier.date_to
+            )
+            return estimate, True
+        if flt.currency is None and flt.date_from is None and flt.date_to is None:
+            # Compaction keeps the raw table close to the raw tier, so the table
+            # counter stands in for it; rows awaiting compaction make it an estimate
+            total, _ = await self._raw.count(total_mode)
+            return total, True
+        return await self._count(tier, flt.currency), False
+
+    @staticmethod
+    def _item(tier: Tier, row: Row) -> Dict[str, Any]:
+        if not tier.interval:
+            return row._asdict()
+        return {
+            "id": None,
+            "currency": row.currency,
+            "date_": row.bucket_start,
+            "price": row.close,
+            "interval": tier.interval,
+        }
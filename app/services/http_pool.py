@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import ssl
+from types import SimpleNamespace
+from typing import Any, Dict
+
+import aiohttp
+import certifi
+
+
+class ExchangeHttpPool:
+    """
+    One tuned aiohttp connector and session shared by all ccxt clients.
+
+    Keeps connections to the exchanges alive between requests (so a request
+    normally skips the TCP and TLS handshakes), caches DNS answers and counts
+    new versus reused connections via aiohttp tracing. Must be created on
+    the running loop that will serve requests.
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 20,
+        keepalive_timeout_seconds: float = 30.0,
+        dns_cache_ttl_seconds: int = 300,
+        request_timeout_seconds: float = 10.0,
+    ) -> None:
+        self._request_timeout = request_timeout_seconds
+        self._requests = 0
+        self._new_connections = 0
+        self._reused_connections = 0
+        self._tls_handshakes = 0
+        self._dns_cache_hits = 0
+        self._dns_cache_misses = 0
+
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(self._on_request_start)
+        trace.on_connection_create_end.append(self._on_connection_create_end)
+        trace.on_connection_reuseconn.append(self._on_connection_reuseconn)
+        trace.on_dns_cache_hit.append(self._on_dns_cache_hit)
+        trace.on_dns_cache_miss.append(self._on_dns_cache_miss)
+
+        self.connector = aiohttp.TCPConnector(
+            limit=limit,
+            limit_per_host=limit_per_host,
+            keepalive_timeout=keepalive_timeout_seconds,
+            use_dns_cache=dns_cache_ttl_seconds > 0,
+            ttl_dns_cache=dns_cache_ttl_seconds if dns_cache_ttl_seconds > 0 else None,
+            # Same trust store ccxt uses for the sessions it creates itself
+            ssl=ssl.create_default_context(cafile=certifi.where()),
+            enable_cleanup_closed=True,
+        )
+        self.session = aiohttp.ClientSession(
+            connector=self.connector,
+            timeout=aiohttp.ClientTimeout(total=request_timeout_seconds),
+            trace_configs=[trace],
+        )
+
+    def client_config(self) -> Dict[str, Any]:
+        """ccxt constructor options that route the client through this pool."""
+        # ccxt sets a per-request ClientTimeout from its own ``timeout`` (ms),
+        # which overrides the session default, so it has to be passed here too
+        return {"session": self.session, "timeout": int(self._request_timeout * 1000)}
+
+    async def _on_request_start(self, session, ctx: SimpleNamespace, params) -> None:
+        self._requests += 1
+        ctx.https = params.url.scheme == "https"
+
+    async def _on_connection_create_end(self, session, ctx: SimpleNamespace, params) -> None:
+        self._new_connections += 1
+        if getattr(ctx, "https", False):
+            self._tls_handshakes += 1
+
+    async def _on_connection_reuseconn(self, session, ctx: SimpleNamespace, params) -> None:
+        self._reused_connections += 1
+
+    async def _on_dns_cache_hit(self, session, ctx: SimpleNamespace, params) -> None:
+        self._dns_cache_hits += 1
+
+    async def _on_dns_cache_miss(self, session, ctx: SimpleNamespace, params) -> None:
+        self._dns_cache_misses += 1
+
+    async def close(self) -> None:
+        await self.session.close()
+
+    def stats(self) -> Dict[str, Any]:
+        # aiohttp has no public accessors for pool occupancy
+        in_use = len(getattr(self.connector, "_acquired", ()))
+        idle = sum(len(conns) for conns in getattr(self.connector, "_conns", {}).values())
+        connections = self._new_connections + self._reused_connections
+        return {
+            "open": in_use + idle,
+            "in_use": in_use,
+            "idle": idle,
+            "limit": self.connector.limit,
+            "limit_per_host": self.connector.limit_per_host,
+            "requests": self._requests,
+            "new_connections": self._new_connections,
+            "reused_connections": self._reused_connections,
+            "reuse_ratio": self._reused_connections / connections if connections > 0 else 0.0,
+            "tls_handshakes": self._tls_handshakes,
+            "dns_cache_hits": self._dns_cache_hits,
+            "dns_cache_misses": self._dns_cache_misses,
+        }
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Optional, Sequence
+
+from app.services.exchange_service import ExchangeBackend
+
+
+logger = logging.getLogger(__name__)
+
+
+def snapshot_path(directory: str, exchange: str) -> str:
+    return os.path.join(directory, f"{exchange}-markets.json")
+
+
+def read_snapshot(path: str, max_age_seconds: float) -> Optional[Dict[str, Any]]:
+    """Snapshot saved at ``path``, or None if it is missing, unreadable or older than ``max_age_seconds``."""
+    try:
+        with open(path) as f:
+            snapshot = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable markets snapshot {path}: {e}")
+        return None
+    if not isinstance(snapshot, dict) or not snapshot.get("markets"):
+        return None
+    if time.time() - snapshot.get("saved_at", 0) > max_age_seconds:
+        return None
+    return snapshot
+
+
+def write_snapshot(path: str, markets: Dict[str, Any], currencies: Optional[Dict[str, Any]]) -> None:
+    """Write atomically so concurrently starting workers never read a partial file."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"saved_at": time.time(), "markets": markets, "currencies": currencies}, f)
+    os.replace(tmp, path)
+
+
+class MarketsWarmup:
+    """
+    Loads ccxt markets before the worker serves traffic and keeps them fresh.
+
+    On startup each exchange's markets come from the on-disk snapshot when it
+    is younger than ``snapshot_max_age_seconds`` (no download), otherwise from
+    the exchange, after which the snapshot is rewritten for the next worker.
+    Markets are then reloaded every ``refresh_interval_seconds`` in the
+    background. Warm-up failures are logged and leave ccxt to load markets
+    lazily on the first request, as before.
+    """
+
+    def __init__(
+        self,
+        backends: Sequence[ExchangeBackend],
+        snapshot_dir: Optional[str] = None,
+        snapshot_max_age_seconds: float = 3600.0,
+        refresh_interval_seconds: float = 3600.0,
+        timeout_seconds: float = 10.0,
+    ) -> None:
+        self._backends = list(backends)
+        self._snapshot_dir = snapshot_dir
+        self._snapshot_max_age = snapshot_max_age_seconds
+        self._refresh_interval = refresh_interval_seconds
+        self._timeout = timeout_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._sources: Dict[str, str] = {}
+        self._warmup_seconds: Optional[float] = None
+        self._refreshes = 0
+        self._refresh_errors = 0
+        self._last_refresh: Optional[float] = None
+
+    async def start(self) -> None:
+        started = time.perf_counter()
+        await asyncio.gather(*(self._warm(backend) for backend in self._backends))
+        self._warmup_seconds = time.perf_counter() - started
+        logger.info(f"Markets warm-up finished in {self._warmup_seconds:.3f}s: {self._sources}")
+        if self._refresh_interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _warm(self, backend: ExchangeBackend) -> None:
+        if self._snapshot_dir and hasattr(backend.client, "set_markets"):
+            path = snapshot_path(self._snapshot_dir, backend.name)
+            snapshot = await asyncio.to_thread(read_snapshot, path, self._snapshot_max_age)
+            if snapshot is not None:
+                backend.client.set_markets(snapshot["markets"], snapshot.get("currencies"))
+                self._sources[backend.name] = "snapshot"
+                return
+        try:
+            await self.refresh(backend, reload=False)
+        except Exception as e:  # noqa: BLE001
+            logger.warning(f"Markets warm-up failed for {backend.name}, loading lazily: {e}")
+            self._sources[backend.name] = "failed"
+            return
+        self._sources[backend.name] = "exchange"
+
+    async def refresh(self, backend: ExchangeBackend, reload: bool = True) -> None:
+        """Download markets from the exchange and rewrite the snapshot."""
+        markets = await asyncio.wait_for(backend.client.load_markets(reload), self._timeout)
+        if self._snapshot_dir and markets:
+            path = snapshot_path(self._snapshot_dir, backend.name)
+            currencies = getattr(backend.client, "currencies", None)
+            try:
+                await asyncio.to_thread(write_snapshot, path, markets, currencies)
+            except (OSError, TypeError, ValueError) as e:
+                logger.warning(f"Could not write markets snapshot {path}: {e}")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._refresh_interval)
+            for backend in self._backends:
+                try:
+                    await self.refresh(backend)
+                    self._refreshes += 1
+                except Exception as e:  # noqa: BLE001
+                    self._refresh_errors += 1
+                    logger.error(f"Markets refresh failed for {backend.name}: {e}")
+            self._last_refresh = time.time()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sources": dict(self._sources),
+            "warmup_seconds": self._warmup_seconds,
+            "refreshes": self._refreshes,
+            "refresh_errors": self._refresh_errors,
+            "last_refresh_age_seconds": (
+                time.time() - self._last_refresh if self._last_refresh is not None else None
+            ),
+        }
@@ -1,7 +1,65 @@
 from __future__ import annotations
 
+import re
 import time
-from typing import Dict, Any
+from array import array
+from bisect import bisect_left
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence
+
+if TYPE_CHECKING:
+    from app.services.shared_metrics import WorkerSlot
+
+
+# Default latency bucket upper bounds in seconds
+DEFAULT_LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram with preallocated counters.
+
+    ``observe`` does a bisect and two integer increments, so it is cheap enough
+    for the request hot path. Percentiles are estimated from bucket bounds.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        # Last slot is the +Inf bucket
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Upper bound of the bucket holding the q-th quantile (0 < q <= 1).
+
+        Returns None when the quantile falls above the largest bucket.
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts[:-1]):
+            seen += bucket_count
+            if seen >= rank:
+                return self.buckets[i]
+        return None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+        }
 
 
 class MetricsService:
@@ -13,20 +71,65 @@ class MetricsService:
     - Total errors
     - Uptime
     - Success rate
+    - Request latency per route, method and status class
+    - Stats from registered collectors (caches, pools, etc.)
+
+    With a shared ``slot`` (multi-worker gunicorn) counters and histograms are
+    written straight into this worker's region of the shared segment instead
+    of process memory; the hot path is the same increment either way.
     """
     
-    def __init__(self) -> None:
+    STATUS_CLASSES = ("1xx", "2xx", "3xx", "4xx", "5xx")
+
+    def __init__(self, slot: Optional["WorkerSlot"] = None) -> None:
         self._start_time = time.time()
-        self._request_count = 0
-        self._error_count = 0
+        self._slot = slot
+        # [requests, errors]
+        self._counters = slot.counters if slot is not None else array("q", [0, 0])
+        self._collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        # route -> method -> histogram per status class (index = status // 100 - 1)
+        self._latency: Dict[str, Dict[str, List[Optional[Histogram]]]] = {}
+
+    def register_collector(self, name: str, collector: Callable[[], Dict[str, Any]]) -> None:
+        """Register a callable whose stats are reported under ``name``."""
+        self._collectors[name] = collector
 
     def increment_request_count(self) -> None:
         """Increment total request counter."""
-        self._request_count += 1
+        self._counters[0] += 1
 
     def increment_error_count(self) -> None:
         """Increment error counter."""
-        self._error_count += 1
+        self._counters[1] += 1
+
+    def observe_request(self, route: str, method: str, status: int, seconds: float) -> None:
+        """Record request latency; allocates only the first time a series is seen."""
+        by_method = self._latency.get(route)
+        if by_method is None:
+            by_method = self._latency[route] = {}
+        by_status = by_method.get(method)
+        if by_status is None:
+            by_status = by_method[method] = [None] * len(self.STATUS_CLASSES)
+        index = min(max(status // 100, 1), 5) - 1
+        histogram = by_status[index]
+        if histogram is None:
+            histogram = by_status[index] = self._new_histogram(route, method, self.STATUS_CLASSES[index])
+        histogram.observe(seconds)
+
+    def _new_histogram(self, route: str, method: str, status_class: str) -> Histogram:
+        if self._slot is not None:
+            shared = self._slot.histogram(route, method, status_class)
+            if shared is not None:
+                return shared
+        # No slot, or the slot's series table is full: keep it worker-local
+        return Histogram()
+
+    def _latency_series(self):
+        for route, by_method in self._latency.items():
+            for method, by_status in by_method.items():
+                for index, histogram in enumerate(by_status):
+                    if histogram is not None:
+                        yield route, method, self.STATUS_CLASSES[index], histogram
 
     def get_metrics(self) -> Dict[str, Any]:
         """
@@ -36,14 +139,122 @@ class MetricsService:
             Dictionary containing current metrics
         """
         uptime = int(time.time() - self._start_time)
+        requests, errors = self._counters[0], self._counters[1]
         
-        return {
+        metrics: Dict[str, Any] = {
             "uptime_seconds": uptime,
-            "requests_total": self._request_count,
-            "errors_total": self._error_count,
+            "requests_total": requests,
+            "errors_total": errors,
             "success_rate": (
-                (self._request_count - self._error_count) / self._request_count * 100
-                if self._request_count > 0
+                (requests - errors) / requests * 100
+                if requests > 0
                 else 100.0
             ),
         }
+        latency: Dict[str, Any] = {}
+        for route, method, status_class, histogram in self._latency_series():
+            latency.setdefault(route, {}).setdefault(method, {})[status_class] = histogram.snapshot()
+        metrics["latency_seconds"] = latency
+        if self._slot is not None:
+            metrics["cluster"] = self._slot.segment.aggregate()
+        for name, collector in self._collectors.items():
+            metrics[name] = collector()
+        return metrics
+
+    def render_prometheus(self) -> str:
+        """Render metrics in the Prometheus text exposition format (version 0.0.4)."""
+        lines = [
+            "# HELP app_uptime_seconds Seconds since the worker started.",
+            "# TYPE app_uptime_seconds gauge",
+            f"app_uptime_seconds {int(time.time() - self._start_time)}",
+            "# HELP app_requests_total Total HTTP requests.",
+            "# TYPE app_requests_total counter",
+            f"app_requests_total {self._counters[0]}",
+            "# HELP app_errors_total HTTP requests that failed or returned status >= 400.",
+            "# TYPE app_errors_total counter",
+            f"app_errors_total {self._counters[1]}",
+            "# HELP http_request_duration_seconds Request latency by route, method and status class.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for route, method, status_class, histogram in self._latency_series():
+            _render_histogram("http_request_duration_seconds", route, method, status_class, histogram, lines)
+        if self._slot is not None:
+            self._render_cluster(lines)
+        for name, collector in self._collectors.items():
+            _flatten_prometheus(f"app_{_sanitize(name)}", collector(), "", lines)
+        return "\n".join(lines) + "\n"
+
+    def _render_cluster(self, lines: List[str]) -> None:
+        segment = self._slot.segment
+        workers = segment.workers()
+        lines.extend([
+            "# HELP app_cluster_requests_total Total HTTP requests across all workers.",
+            "# TYPE app_cluster_requests_total counter",
+            f"app_cluster_requests_total {sum(w['requests_total'] for w in workers.values())}",
+            "# HELP app_cluster_errors_total Failed HTTP requests across all workers.",
+            "# TYPE app_cluster_errors_total counter",
+            f"app_cluster_errors_total {sum(w['errors_total'] for w in workers.values())}",
+            "# HELP app_worker_requests_total HTTP requests per worker.",
+            "# TYPE app_worker_requests_total counter",
+        ])
+        for pid, worker in workers.items():
+            lines.append(f'app_worker_requests_total{{pid="{pid}",slot="{worker["slot"]}"}} {worker["requests_total"]}')
+        lines.extend([
+            "# HELP app_worker_errors_total Failed HTTP requests per worker.",
+            "# TYPE app_worker_errors_total counter",
+        ])
+        for pid, worker in workers.items():
+            lines.append(f'app_worker_errors_total{{pid="{pid}",slot="{worker["slot"]}"}} {worker["errors_total"]}')
+        lines.extend([
+            "# HELP app_cluster_request_duration_seconds Request latency across all workers.",
+            "# TYPE app_cluster_request_duration_seconds histogram",
+        ])
+        for (route, method, status_class), histogram in segment.histograms().items():
+            _render_histogram("app_cluster_request_duration_seconds", route, method, status_class, histogram, lines)
+
+
+_NAME_RE = re.compile(r"^[a-zA-Z_][a-zA-Z0-9_]*$")
+
+
+def _sanitize(name: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _render_histogram(
+    name: str, route: str, method: str, status_class: str, histogram: Histogram, lines: List[str]
+) -> None:
+    labels = f'route="{_escape(route)}",method="{method}",status="{status_class}"'
+    cumulative = 0
+    for bound, bucket_count in zip(histogram.buckets, histogram.counts):
+        cumulative += bucket_count
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+    lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+
+def _flatten_prometheus(prefix: str, value: Any, labels: str, lines: List[str]) -> None:
+    """
+    Emit collector stats as untyped samples.
+
+    Nested keys extend the metric name; keys that are not valid identifiers
+    (e.g. symbols like ``BTC/USDT``) become a ``key`` label instead.
+    """
+    if isinstance(value, bool):
+        value = int(value)
+    if isinstance(value, (int, float)):
+        lines.append(f"{prefix}{{{labels}}} {value}" if labels else f"{prefix} {value}")
+        return
+    if not isinstance(value, dict):
+        return
+    for key, item in value.items():
+        key = str(key)
+        if _NAME_RE.match(key):
+            _flatten_prometheus(f"{prefix}_{key}", item, labels, lines)
+        else:
+            label = f'key="{_escape(key)}"'
+            _flatten_prometheus(prefix, item, f"{labels},{label}" if labels else label, lines)
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from decimal import Decimal
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, Protocol, Sequence, Tuple
+
+import aiohttp
+
+from app.services.exchange_service import extract_bid
+
+
+logger = logging.getLogger(__name__)
+
+
+class TickerSource(Protocol):
+    """A push feed of (symbol, bid) updates for a set of symbols."""
+
+    def stream(self, symbols: Sequence[str]) -> AsyncIterator[Tuple[str, Decimal]]:
+        ...
+
+    async def close(self) -> None:
+        ...
+
+
+class CcxtProTickerSource:
+    """Streams tickers from the exchange WebSocket API via ccxt.pro."""
+
+    def __init__(self, exchange_id: str = "kucoin") -> None:
+        import ccxt.pro as ccxtpro
+
+        self._exchange = getattr(ccxtpro, exchange_id)({'enableRateLimit': True})
+
+    async def stream(self, symbols: Sequence[str]) -> AsyncIterator[Tuple[str, Decimal]]:
+        while True:
+            tickers = await self._exchange.watch_tickers(list(symbols))
+            for symbol, ticker in tickers.items():
+                bid = extract_bid(ticker)
+                if bid is not None:
+                    yield symbol, bid
+
+    async def close(self) -> None:
+        await self._exchange.close()
+
+
+class WebSocketTickerSource:
+    """
+    Streams tickers from a plain JSON WebSocket feed.
+
+    On connect sends ``{"op": "subscribe", "symbols": [...]}`` and expects
+    messages like ``{"symbol": "BTC/USDT", "bid": "50000.1"}``. Used for
+    relays and for a local fake server in tests.
+    """
+
+    def __init__(self, url: str) -> None:
+        self._url = url
+
+    async def stream(self, symbols: Sequence[str]) -> AsyncIterator[Tuple[str, Decimal]]:
+        async with aiohttp.ClientSession() as session:
+            async with session.ws_connect(self._url, heartbeat=15) as ws:
+                await ws.send_json({"op": "subscribe", "symbols": list(symbols)})
+                async for msg in ws:
+                    if msg.type == aiohttp.WSMsgType.TEXT:
+                        data = json.loads(msg.data)
+                        if "symbol" in data and data.get("bid") is not None:
+                            yield data["symbol"], Decimal(str(data["bid"]))
+                    elif msg.type == aiohttp.WSMsgType.ERROR:
+                        raise ConnectionError(f"price stream error: {ws.exception()}")
+
+    async def close(self) -> None:
+        pass
+
+
+class PriceBook:
+    """In-memory best-bid book for a fixed set of subscribed symbols."""
+
+    def __init__(self, symbols: Iterable[str], stale_after_seconds: float = 5.0) -> None:
+        self._symbols = frozenset(symbols)
+        self._stale_after = stale_after_seconds
+        self._bids: Dict[str, Tuple[Decimal, float]] = {}
+        self._hits = 0
+        self._stale = 0
+
+    @property
+    def symbols(self) -> frozenset:
+        return self._symbols
+
+    def is_subscribed(self, symbol: str) -> bool:
+        return symbol in self._symbols
+
+    def update(self, symbol: str, bid: Decimal) -> None:
+        if symbol in self._symbols:
+            self._bids[symbol] = (bid, time.monotonic())
+
+    def get_bid(self, symbol: str) -> Optional[Decimal]:
+        """Return the latest bid, or None if the symbol is unknown or stale."""
+        entry = self._bids.get(symbol)
+        if entry is None:
+            return None
+        bid, updated_at = entry
+        if time.monotonic() - updated_at > self._stale_after:
+            self._stale += 1
+            return None
+        self._hits += 1
+        return bid
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "stale_after_seconds": self._stale_after,
+            "hits": self._hits,
+            "stale": self._stale,
+            "symbols": {
+                symbol: (
+                    round(now - self._bids[symbol][1], 3)
+                    if symbol in self._bids
+                    else None
+                )
+                for symbol in sorted(self._symbols)
+            },
+        }
+
+
+class PriceStreamService:
+    """
+    Keeps a PriceBook up to date from a TickerSource in a background task.
+
+    Reconnects with exponential backoff whenever the feed fails or ends.
+    """
+
+    def __init__(
+        self,
+        source: TickerSource,
+        book: PriceBook,
+        min_backoff_seconds: float = 0.5,
+        max_backoff_seconds: float = 30.0,
+    ) -> None:
+        self._source = source
+        self._book = book
+        self._min_backoff = min_backoff_seconds
+        self._max_backoff = max_backoff_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._connected = False
+        self._reconnects = 0
+        self._updates = 0
+
+    @property
+    def book(self) -> PriceBook:
+        return self._book
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._source.close()
+
+    async def _run(self) -> None:
+        symbols = sorted(self._book.symbols)
+        attempt = 0
+        while True:
+            try:
+                async for symbol, bid in self._source.stream(symbols):
+                    if not self._connected:
+                        logger.info(f"Price stream connected for {len(symbols)} symbols")
+                        self._connected = True
+                        attempt = 0
+                    self._book.update(symbol, bid)
+                    self._updates += 1
+                raise ConnectionError("price stream closed")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:  # noqa: BLE001
+                self._connected = False
+                self._reconnects += 1
+                delay = min(self._max_backoff, self._min_backoff * (2 ** attempt))
+                attempt += 1
+                logger.warning(f"Price stream failed ({e}), reconnecting in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "connected": self._connected,
+            "reconnects": self._reconnects,
+            "updates": self._updates,
+            **self._book.stats(),
+        }
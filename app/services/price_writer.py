@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.repositories.currency_repository import CurrencyRepository
+from app.services.candle_rollup import CandleRollup, roll_up
+
+
+logger = logging.getLogger(__name__)
+
+ACK_AFTER_FLUSH = "flush"
+ACK_AFTER_ENQUEUE = "enqueue"
+
+_Item = Tuple[str, datetime, Decimal, Optional[asyncio.Future]]
+
+
+class WriteBufferFull(RuntimeError):
+    """Raised when the write-behind queue stays full past the enqueue timeout."""
+
+
+class PriceWriteBuffer:
+    """
+    Write-behind buffer that batches price inserts into few large transactions.
+
+    Records are queued in memory and a background flusher writes them with one
+    multi-row INSERT every ``flush_interval_seconds`` or ``max_batch`` rows,
+    whichever comes first. With ``ack="flush"`` callers wait until their row is
+    committed and get its id; with ``ack="enqueue"`` they return as soon as the
+    row is queued (id is None) and a crash can lose queued rows.
+    """
+
+    def __init__(
+        self,
+        session_factory,
+        flush_interval_seconds: float = 0.05,
+        max_batch: int = 500,
+        max_queue: int = 10000,
+        ack: str = ACK_AFTER_FLUSH,
+        enqueue_timeout_seconds: float = 1.0,
+        on_flush: Optional[Callable[[], None]] = None,
+        candle_rollup: Optional[CandleRollup] = None,
+    ) -> None:
+        if ack not in (ACK_AFTER_FLUSH, ACK_AFTER_ENQUEUE):
+            raise ValueError(f"ack must be '{ACK_AFTER_FLUSH}' or '{ACK_AFTER_ENQUEUE}'")
+        self._session_factory = session_factory
+        self._interval = flush_interval_seconds
+        self._max_batch = max_batch
+        self._ack = ack
+        self._enqueue_timeout = enqueue_timeout_seconds
+        # Called after each committed batch, e.g. to invalidate cached history pages
+        self._on_flush = on_flush
+        self._candle_rollup = candle_rollup
+        self._queue: "asyncio.Queue[Optional[_Item]]" = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self._flushes = 0
+        self._flushed_rows = 0
+        self._failed_rows = 0
+        self._rejected = 0
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop accepting records and flush everything still queued."""
+        if self._task is None:
+            return
+        self._closing = True
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def submit(self, currency: str, date_: datetime, price: Decimal) -> dict:
+        if self._closing or self._task is None:
+            raise RuntimeError("price write buffer is not running")
+        future = asyncio.get_running_loop().create_future() if self._ack == ACK_AFTER_FLUSH else None
+        try:
+            await asyncio.wait_for(
+                self._queue.put((currency, date_, price, future)),
+                self._enqueue_timeout,
+            )
+        except asyncio.TimeoutError:
+            self._rejected += 1
+            raise WriteBufferFull("price write buffer is full")
+        if future is not None:
+            return await future
+        return {
+            "id": None,
+            "currency": currency,
+            "date_": date_.isoformat(timespec="seconds"),
+            "price": str(price),
+        }
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            first = await self._queue.get()
+            if first is None:
+                await self._drain([])
+                return
+            batch: List[_Item] = [first]
+            deadline = loop.time() + self._interval
+            while len(batch) < self._max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    await self._drain(batch)
+                    return
+                batch.append(item)
+            await self._flush(batch)
+
+    async def _drain(self, batch: List[_Item]) -> None:
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not None:
+                batch.append(item)
+        for start in range(0, len(batch), self._max_batch):
+            await self._flush(batch[start:start + self._max_batch])
+        logger.info(f"Price write buffer drained {len(batch)} rows on shutdown")
+
+    async def _flush(self, batch: List[_Item]) -> None:
+        if not batch:
+            return
+        try:
+            async with self._session_factory() as session:
+                entities = await CurrencyRepository(session).add_many(
+                    (currency, date_, price) for currency, date_, price, _ in batch
+                )
+                await session.commit()
+        except Exception as e:  # noqa: BLE001
+            self._failed_rows += len(batch)
+            logger.error(f"Failed to flush {len(batch)} buffered prices: {e}")
+            for *_, future in batch:
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            return
+        self._flushes += 1
+        self._flushed_rows += len(batch)
+        try:
+            async with self._session_factory() as session:
+                await roll_up(
+                    session, self._candle_rollup, ((e.id, e.currency, e.date_, e.price) for e in entities)
+                )
+        except Exception as e:  # noqa: BLE001
+            # The prices are committed; only their candles need a backfill
+            logger.error(f"Failed to roll up candles for {len(batch)} buffered prices: {e}")
+        if self._on_flush is not None:
+            self._on_flush()
+        for (*_, future), entity in zip(batch, entities):
+            if future is not None and not future.done():
+                future.set_result(entity.to_dict())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ack": self._ack,
+            "queued": self._queue.qsize(),
+            "max_queue": self._queue.maxsize,
+            "flushes": self._flushes,
+            "flushed_rows": self._flushed_rows,
+            "failed_rows": self._failed_rows,
+            "rejected": self._rejected,
+            "avg_batch_size": (
+                self._flushed_rows / self._flushes
+                if self._flushes > 0
+                else 0.0
+            ),
+        }
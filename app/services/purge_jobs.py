@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+from app.repositories.candle_repository import CandleRepository
+from app.repositories.currency_repository import TOTAL_COUNTER, CurrencyRepository, HistoryFilter
+
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+@dataclass
+class PurgeJob:
+    id: str
+    filter: HistoryFilter
+    status: str = PENDING
+    method: Optional[str] = None
+    deleted: int = 0
+    total: Optional[int] = None
+    batches: int = 0
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        end = self.finished_at if self.finished_at is not None else time.time()
+        elapsed = end - self.started_at if self.started_at is not None else 0.0
+        rate = self.deleted / elapsed if elapsed > 0 else None
+        eta = None
+        if self.status == RUNNING and rate and self.total is not None:
+            eta = max(self.total - self.deleted, 0) / rate
+        return {
+            "id": self.id,
+            "status": self.status,
+            "method": self.method,
+            "filter": {
+                "currency": self.filter.currency,
+                "before": self.filter.date_to.isoformat() if self.filter.date_to else None,
+            },
+            "deleted": self.deleted,
+            "total": self.total,
+            "batches": self.batches,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(rate, 1) if rate is not None else None,
+            "eta_seconds": round(eta, 1) if eta is not None else None,
+            "error": self.error,
+        }
+
+
+class PurgeJobManager:
+    """
+    Runs history deletions as background jobs, one at a time.
+
+    An unfiltered purge is a single TRUNCATE where the database supports it.
+    Otherwise rows are deleted in transactions of at most ``batch_size`` rows
+    with a ``pause_seconds`` yield between them, so locks stay short and
+    other requests keep getting pool connections. A ``before`` purge of a
+    partitioned table drops whole partitions first. Job state lives in this
+    process and the last ``max_jobs`` jobs are kept for status requests.
+    """
+
+    def __init__(
+        self,
+        session_factory,
+        batch_size: int = 5000,
+        pause_seconds: float = 0.05,
+        partitioned: Callable[[], bool] = lambda: False,
+        on_progress: Optional[Callable[[], None]] = None,
+        max_jobs: int = 100,
+    ) -> None:
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        self._session_factory = session_factory
+        self._batch_size = batch_size
+        self._pause = pause_seconds
+        # Callable because partitioning is only detected once the app has started
+        self._partitioned = partitioned
+        self._on_progress = on_progress
+        self._max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, PurgeJob]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._lock = asyncio.Lock()
+        self._completed = 0
+        self._failed = 0
+        self._rows_deleted = 0
+
+    def submit(self, flt: Optional[HistoryFilter] = None) -> PurgeJob:
+        job = PurgeJob(id=uuid.uuid4().hex, filter=flt or HistoryFilter())
+        self._jobs[job.id] = job
+        while len(self._jobs) > self._max_jobs:
+            oldest = next(iter(self._jobs))
+            if self._jobs[oldest].status in (PENDING, RUNNING):
+                break
+            del self._jobs[oldest]
+        task = asyncio.create_task(self._run(job))
+        self._tasks[job.id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.id, None))
+        return job
+
+    def get(self, job_id: str) -> Optional[PurgeJob]:
+        return self._jobs.get(job_id)
+
+    async def wait(self, job_id: str) -> None:
+        task = self._tasks.get(job_id)
+        if task is not None:
+            await asyncio.shield(task)
+
+    async def stop(self) -> None:
+        for task in list(self._tasks.values()):
+            task.cancel()
+        for task in list(self._tasks.values()):
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self, job: PurgeJob) -> None:
+        async with self._lock:
+            job.status = RUNNING
+            job.started_at = time.time()
+            logger.info(f"Purge job {job.id} started: {job.filter}")
+            try:
+                await self._purge(job)
+                job.status = DONE
+                self._completed += 1
+                logger.info(f"Purge job {job.id} deleted {job.deleted} rows")
+            except asyncio.CancelledError:
+                job.status = FAILED
+                job.error = "cancelled"
+                raise
+            except Exception as e:  # noqa: BLE001
+                job.status = FAILED
+                job.error = str(e)
+                self._failed += 1
+                logger.error(f"Purge job {job.id} failed after {job.deleted} rows: {e}")
+            finally:
+                job.finished_at = time.time()
+                self._notify()
+
+    async def _purge(self, job: PurgeJob) -> None:
+        flt = job.filter
+        partitioned = self._partitioned()
+        async with self._session_factory() as session:
+            repo = CurrencyRepository(session, partitioned=partitioned)
+            job.total, _ = await repo.count(TOTAL_COUNTER, flt)
+            if flt.is_empty():
+                truncated = await repo.truncate()
+                if truncated is not None:
+                    await session.commit()
+                    job.method = "truncate"
+                    self._add_deleted(job, truncated)
+                    return
+            if flt.currency is None and flt.date_to is not None and partitioned:
+                dropped = await repo.drop_partitions_before(flt.date_to)
+                await session.commit()
+                self._add_deleted(job, dropped)
+
+        job.method = "batches"
+        while True:
+            async with self._session_factory() as session:
+                deleted = await CurrencyRepository(session, partitioned=partitioned).delete_batch(
+                    flt, self._batch_size
+                )
+                await session.commit()
+            job.batches += 1
+            self._add_deleted(job, deleted)
+            if deleted < self._batch_size:
+                break
+            await asyncio.sleep(self._pause)
+
+        # Rollups of the purged range are kept for a ``before`` purge, like delete_before
+        if flt.date_to is None:
+            async with self._session_factory() as session:
+                await CandleRepository(session).delete_range(currency=flt.currency)
+                await session.commit()
+
+    def _add_deleted(self, job: PurgeJob, deleted: int) -> None:
+        job.deleted += deleted
+        self._rows_deleted += deleted
+        if deleted:
+            self._notify()
+
+    def _notify(self) -> None:
+        if self._on_progress is not None:
+            self._on_progress()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": sum(1 for job in self._jobs.values() if job.status == RUNNING),
+            "pending": sum(1 for job in self._jobs.values() if job.status == PENDING),
+            "completed": self._completed,
+            "failed": self._failed,
+            "rows_deleted": self._rows_deleted,
+        }
@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import logging
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from app.repositories.currency_repository import CurrencyRepository, HistoryFilter
+
+
+logger = logging.getLogger(__name__)
+
+_EPOCH = datetime(1970, 1, 1)
+_MS = timedelta(milliseconds=1)
+
+
+def utc_now() -> datetime:
+    return datetime.now(tz=timezone.utc).replace(tzinfo=None)
+
+
+def to_epoch_ms(value: datetime) -> int:
+    return (value - _EPOCH) // _MS
+
+
+def from_epoch_ms(value: int) -> datetime:
+    return _EPOCH + value * _MS
+
+
+class _Ring:
+    """Fixed-capacity ring of (epoch ms, price) pairs in two typed arrays, 16 bytes per tick."""
+
+    __slots__ = ("times", "prices", "head", "covered_since")
+
+    def __init__(self, covered_since: int) -> None:
+        self.times = array("q")
+        self.prices = array("d")
+        # Index of the oldest tick once the arrays are full
+        self.head = 0
+        # Ticks at or after this time are all present
+        self.covered_since = covered_since
+
+    def append(self, ts: int, price: float, capacity: int) -> None:
+        n = len(self.times)
+        if n and ts < self.times[(self.head - 1) % n]:
+            self._insert(ts, price, capacity)
+            return
+        if n < capacity:
+            self.times.append(ts)
+            self.prices.append(price)
+            return
+        head = self.head
+        self.times[head] = ts
+        self.prices[head] = price
+        self.head = (head + 1) % capacity
+        # The overwritten tick is gone, so coverage now starts at the oldest one kept
+        self.covered_since = self.times[self.head]
+
+    def _insert(self, ts: int, price: float, capacity: int) -> None:
+        """
+        Place a tick older than the newest one in time order.
+
+        Happens when concurrent requests commit in a different order than their
+        timestamps; rare, so the ring is simply unrolled (head back to 0) first.
+        """
+        self._unroll()
+        full = len(self.times) >= capacity
+        if full:
+            if ts < self.times[0]:
+                # Older than anything kept; coverage already starts after it
+                return
+            del self.times[0]
+            del self.prices[0]
+        i = bisect_right(self.times, ts)
+        self.times.insert(i, ts)
+        self.prices.insert(i, price)
+        if full:
+            self.covered_since = self.times[0]
+
+    def drop_before(self, ts: int) -> int:
+        """Remove ticks older than ``ts``; returns how many were removed."""
+        self._unroll()
+        n = bisect_left(self.times, ts)
+        del self.times[:n]
+        del self.prices[:n]
+        return n
+
+    def _unroll(self) -> None:
+        if self.head:
+            self.times = self.times[self.head:] + self.times[:self.head]
+            self.prices = self.prices[self.head:] + self.prices[:self.head]
+            self.head = 0
+
+    def since(self, start: int) -> Tuple[array, array]:
+        """Ticks at or after ``start``, oldest first, as fresh arrays."""
+        n, head = len(self.times), self.head
+        # Binary search over the logical (oldest first) order, which append keeps sorted
+        lo, hi = 0, n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.times[(head + mid) % n] < start:
+                lo = mid + 1
+            else:
+                hi = mid
+        first = (head + lo) % n if n else 0
+        if first + (n - lo) <= n:
+            return self.times[first:first + n - lo], self.prices[first:first + n - lo]
+        return self.times[first:] + self.times[:head], self.prices[first:] + self.prices[:head]
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.times) * self.times.itemsize + len(self.prices) * self.prices.itemsize
+
+
+class RecentPrices:
+    """
+    In-memory store of the most recent prices per currency.
+
+    Each currency keeps at most ``capacity`` ticks in a ring backed by
+    ``array('q')`` timestamps and ``array('d')`` prices, so a tick costs 16
+    bytes and no Python objects. Currencies beyond ``max_currencies`` evict
+    the one written least recently. Prices are float64; the database stays
+    the exact record. Every worker keeps its own store, filled by its own
+    writes after a warm-up from the database, so unless ``single_writer``
+    says this process records every price, windows are never reported
+    complete.
+    """
+
+    def __init__(self, capacity: int = 4096, max_currencies: int = 1024, single_writer: bool = True) -> None:
+        if capacity < 1 or max_currencies < 1:
+            raise ValueError("capacity and max_currencies must be positive")
+        self._capacity = capacity
+        self._max_currencies = max_currencies
+        self._single_writer = single_writer
+        self._rings: "OrderedDict[str, _Ring]" = OrderedDict()
+        # Ticks after this time were seen by this store (warm-up start or creation)
+        self._covered_since = to_epoch_ms(utc_now())
+        self._ticks = 0
+        self._evictions = 0
+        self._hits = 0
+        self._misses = 0
+        self._warmup_rows = 0
+        self._warmup_seconds: Optional[float] = None
+
+    def add(self, currency: str, date_: datetime, price: Union[Decimal, float]) -> None:
+        key = currency.lower()
+        ring = self._rings.get(key)
+        if ring is None:
+            ring = self._rings[key] = _Ring(self._covered_since)
+            self._evict()
+        else:
+            self._rings.move_to_end(key)
+        ring.append(to_epoch_ms(date_), float(price), self._capacity)
+        self._ticks += 1
+
+    def _evict(self) -> None:
+        while len(self._rings) > self._max_currencies:
+            _, ring = self._rings.popitem(last=False)
+            self._evictions += 1
+            # A currency without a ring may have been evicted with ticks up to this one
+            if ring.times:
+                newest = ring.times[(ring.head - 1) % len(ring.times)]
+                self._covered_since = max(self._covered_since, newest + 1)
+
+    def window(self, currency: str, start: datetime) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Prices at or after ``start``, oldest first, and whether the window is complete.
+
+        The window is incomplete when it reaches back past what the store holds:
+        before the warm-up range, before the oldest tick still in the ring, or
+        over ticks of a currency evicted since. It is also never complete when
+        other workers may be recording prices this store does not see.
+        """
+        start_ms = to_epoch_ms(start)
+        ring = self._rings.get(currency.lower())
+        if ring is None:
+            self._misses += 1
+            return [], self._single_writer and start_ms >= self._covered_since
+        self._hits += 1
+        times, prices = ring.since(start_ms)
+        items = [{"date_": from_epoch_ms(ts), "price": repr(p)} for ts, p in zip(times, prices)]
+        return items, self._single_writer and start_ms >= ring.covered_since
+
+    def clear(self, currency: Optional[str] = None) -> None:
+        if currency is None:
+            self._rings.clear()
+        else:
+            self._rings.pop(currency.lower(), None)
+
+    def drop_before(self, ts: datetime, currency: Optional[str] = None) -> int:
+        """
+        Remove ticks older than ``ts`` (of one currency or all); returns how many were removed.
+
+        Mirrors a ``before`` purge of the history, so windows stay complete.
+        """
+        if currency is None:
+            rings = list(self._rings.values())
+        else:
+            ring = self._rings.get(currency.lower())
+            rings = [ring] if ring is not None else []
+        cutoff = to_epoch_ms(ts)
+        return sum(ring.drop_before(cutoff) for ring in rings)
+
+    async def warm(self, session_factory, window_seconds: float) -> int:
+        """Load the last ``window_seconds`` of history from the database; returns the rows loaded."""
+        started = time.perf_counter()
+        since = utc_now() - timedelta(seconds=window_seconds)
+        self._covered_since = to_epoch_ms(since)
+        loaded: Dict[str, Tuple[array, array]] = {}
+        async with session_factory() as session:
+            # Newest first: once a currency has ``capacity`` ticks, older rows are skipped
+            async for batch in CurrencyRepository(session).stream_rows(flt=HistoryFilter(date_from=since)):
+                for _, currency, date_, price in batch:
+                    times, prices = loaded.setdefault(currency, (array("q"), array("d")))
+                    if len(times) < self._capacity:
+                        times.append(to_epoch_ms(date_))
+                        prices.append(float(price))
+        self._rings.clear()
+        # Least recently written first, so eviction order matches add()
+        for currency, (times, prices) in sorted(loaded.items(), key=lambda item: item[1][0][0]):
+            times.reverse()
+            prices.reverse()
+            ring = _Ring(self._covered_since if len(times) < self._capacity else times[0])
+            ring.times, ring.prices = times, prices
+            self._rings[currency] = ring
+            self._evict()
+        self._warmup_rows = sum(len(times) for times, _ in loaded.values())
+        self._warmup_seconds = time.perf_counter() - started
+        logger.info(
+            f"Recent prices warmed with {self._warmup_rows} rows for {len(loaded)} currencies "
+            f"in {self._warmup_seconds:.2f}s"
+        )
+        return self._warmup_rows
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "currencies": len(self._rings),
+            "capacity": self._capacity,
+            "single_writer": self._single_writer,
+            "ticks_stored": sum(len(ring.times) for ring in self._rings.values()),
+            "bytes": sum(ring.nbytes for ring in self._rings.values()),
+            "ticks_added": self._ticks,
+            "evictions": self._evictions,
+            "hits": self._hits,
+            "misses": self._misses,
+            "warmup_rows": self._warmup_rows,
+            "warmup_seconds": self._warmup_seconds,
+        }
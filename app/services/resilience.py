@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+
+class ExchangeUnavailable(RuntimeError):
+    """The exchange cannot serve the request right now; callers may retry later or serve stale data."""
+
+
+class CircuitOpenError(ExchangeUnavailable):
+    """Raised without calling the exchange while its circuit breaker is open."""
+
+
+class ConcurrencyLimitExceeded(ExchangeUnavailable):
+    """Raised when the limiter's wait queue is full or the wait timed out."""
+
+
+class ExchangeTimeout(ExchangeUnavailable):
+    """Raised when an exchange call exceeds its deadline."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    Opens after ``failure_threshold`` failures in a row, rejects calls for
+    ``reset_timeout_seconds``, then lets a single probe through (half-open):
+    success closes the circuit, failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout_seconds: float = 10.0) -> None:
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be positive")
+        self._threshold = failure_threshold
+        self._reset_timeout = reset_timeout_seconds
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_inflight = False
+        self._opens = 0
+        self._rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() >= self._opened_at + self._reset_timeout:
+            return self.HALF_OPEN
+        return self._state
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probe_inflight:
+            self._state = self.HALF_OPEN
+            self._probe_inflight = True
+            return True
+        self._rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        self._state = self.CLOSED
+        self._failures = 0
+        self._probe_inflight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._probe_inflight = False
+        if self._state == self.HALF_OPEN or self._failures >= self._threshold:
+            if self._state != self.OPEN:
+                self._opens += 1
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+
+    def record_abandoned(self) -> None:
+        """The call was cancelled or never made; release a half-open probe without judging."""
+        self._probe_inflight = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "opens": self._opens,
+            "rejected": self._rejected,
+        }
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limiter with a bounded wait queue.
+
+    The limit grows by ``1/limit`` per call that finishes within
+    ``latency_target_seconds`` (about +1 per window of calls) and is multiplied
+    by ``backoff`` on a failure or slow call. Callers over the limit wait in
+    FIFO order for up to ``queue_timeout_seconds``; when ``max_queue`` callers
+    are already waiting, new ones are rejected immediately.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 10,
+        min_limit: int = 1,
+        max_limit: int = 100,
+        max_queue: int = 100,
+        queue_timeout_seconds: float = 1.0,
+        latency_target_seconds: float = 1.0,
+        backoff: float = 0.5,
+    ) -> None:
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("limits must satisfy 1 <= min_limit <= initial_limit <= max_limit")
+        self._limit = float(initial_limit)
+        self._min = min_limit
+        self._max = max_limit
+        self._max_queue = max_queue
+        self._queue_timeout = queue_timeout_seconds
+        self._target = latency_target_seconds
+        self._backoff = backoff
+        self._inflight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._rejected = 0
+        self._timeouts = 0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    async def acquire(self) -> None:
+        if self._inflight < self.limit and not self._waiters:
+            self._inflight += 1
+            return
+        if len(self._waiters) >= self._max_queue:
+            self._rejected += 1
+            raise ConcurrencyLimitExceeded("exchange concurrency limit reached")
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self._queue_timeout)
+        except asyncio.TimeoutError:
+            self._timeouts += 1
+            raise ConcurrencyLimitExceeded("timed out waiting for an exchange slot") from None
+        except asyncio.CancelledError:
+            # The slot may have been handed over just before we were cancelled
+            if waiter.done() and not waiter.cancelled():
+                self._inflight -= 1
+                self._wake()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def release(self, latency_seconds: float, ok: Optional[bool]) -> None:
+        """Return a slot; ``ok=None`` (e.g. a cancelled call) leaves the limit unchanged."""
+        self._inflight -= 1
+        if ok is True and latency_seconds <= self._target:
+            self._limit = min(self._limit + 1 / self._limit, self._max)
+        elif ok is not None:
+            self._limit = max(self._limit * self._backoff, self._min)
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self._inflight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._inflight += 1
+                waiter.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "inflight": self._inflight,
+            "queued": len(self._waiters),
+            "max_queue": self._max_queue,
+            "rejected": self._rejected,
+            "queue_timeouts": self._timeouts,
+        }
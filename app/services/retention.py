@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+
+from app.repositories.candle_repository import CandleRepository
+from app.repositories.currency_repository import CurrencyRepository, HistoryFilter
+
+
+logger = logging.getLogger(__name__)
+
+# Candle intervals that expire with the minute tier; coarser ones are kept forever
+MINUTE_INTERVALS = ("1m", "5m")
+
+
+def floor_hour(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def utc_now() -> datetime:
+    return datetime.now(tz=timezone.utc).replace(tzinfo=None)
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """
+    How long each history tier is kept, in days (0 keeps it forever).
+
+    Raw ticks are kept ``raw_days``, 1m/5m candles ``minute_days``, hourly and
+    daily candles forever. Cutoffs are aligned to whole hours so every tier
+    boundary falls on a bucket boundary.
+    """
+
+    raw_days: int = 0
+    minute_days: int = 0
+
+    def __post_init__(self) -> None:
+        if self.raw_days < 0 or self.minute_days < 0:
+            raise ValueError("retention days must not be negative")
+        if self.minute_days and (not self.raw_days or self.minute_days < self.raw_days):
+            raise ValueError("minute candles must be kept at least as long as raw ticks")
+
+    @property
+    def enabled(self) -> bool:
+        return self.raw_days > 0
+
+    def raw_cutoff(self, now: datetime) -> Optional[datetime]:
+        return floor_hour(now - timedelta(days=self.raw_days)) if self.raw_days else None
+
+    def minute_cutoff(self, now: datetime) -> Optional[datetime]:
+        return floor_hour(now - timedelta(days=self.minute_days)) if self.minute_days else None
+
+
+class RetentionCompactor:
+    """
+    Applies a RetentionPolicy: deletes expired raw ticks and minute candles.
+
+    Candles are rolled up seconds after each insert, so the downsampled
+    tiers hold the aggregates of every raw row being removed. For rows older
+    than the candles table, run ``app.commands.backfill_candles`` before
+    retention is first turned on: once RETENTION_RAW_DAYS is set it only
+    rebuilds days after the raw cutoff, never the compacted tiers. Deletes run in transactions of at most ``batch_size`` rows with a
+    ``pause_seconds`` yield between them; partitions entirely past the raw
+    cutoff are dropped instead. Runs every ``interval_seconds`` when started,
+    or once via ``app.commands.compact_history``.
+    """
+
+    def __init__(
+        self,
+        session_factory,
+        policy: RetentionPolicy,
+        batch_size: int = 5000,
+        pause_seconds: float = 0.05,
+        interval_seconds: float = 3600.0,
+        partitioned: Callable[[], bool] = lambda: False,
+        on_progress: Optional[Callable[[], None]] = None,
+    ) -> None:
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        self._session_factory = session_factory
+        self._policy = policy
+        self._batch_size = batch_size
+        self._pause = pause_seconds
+        self._interval = interval_seconds
+        self._partitioned = partitioned
+        self._on_progress = on_progress
+        self._task: Optional[asyncio.Task] = None
+        self._runs = 0
+        self._raw_deleted = 0
+        self._candles_deleted = 0
+        self._last_run: Optional[datetime] = None
+        self._last_duration: Optional[float] = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.compact()
+            except Exception as e:  # noqa: BLE001
+                logger.error(f"History compaction failed: {e}")
+            await asyncio.sleep(self._interval)
+
+    async def compact(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Run one compaction pass; returns the rows deleted per tier."""
+        now = now or utc_now()
+        started = time.perf_counter()
+        raw = minute = 0
+        raw_cutoff = self._policy.raw_cutoff(now)
+        if raw_cutoff is not None:
+            raw = await self._compact_raw(raw_cutoff)
+        minute_cutoff = self._policy.minute_cutoff(now)
+        if minute_cutoff is not None:
+            minute = await self._compact_candles(minute_cutoff)
+        self._runs += 1
+        self._last_run = now
+        self._last_duration = time.perf_counter() - started
+        if raw or minute:
+            logger.info(f"Compacted history: {raw} raw rows before {raw_cutoff}, {minute} minute candles")
+        return {"raw": raw, "minute_candles": minute}
+
+    async def _compact_raw(self, cutoff: datetime) -> int:
+        partitioned = self._partitioned()
+        deleted = 0
+        if partitioned:
+            async with self._session_factory() as session:
+                deleted += await CurrencyRepository(session, partitioned=True).drop_partitions_before(cutoff)
+                await session.commit()
+            self._raw_deleted += deleted
+        flt = HistoryFilter(date_to=cutoff)
+        while True:
+            async with self._session_factory() as session:
+                batch = await CurrencyRepository(session, partitioned=partitioned).delete_batch(
+                    flt, self._batch_size
+                )
+                await session.commit()
+            deleted += batch
+            self._raw_deleted += batch
+            if batch:
+                self._notify()
+            if batch < self._batch_size:
+                return deleted
+            await asyncio.sleep(self._pause)
+
+    async def _compact_candles(self, cutoff: datetime) -> int:
+        deleted = 0
+        while True:
+            async with self._session_factory() as session:
+                batch = await CandleRepository(session).delete_batch(MINUTE_INTERVALS, cutoff, self._batch_size)
+                await session.commit()
+            deleted += batch
+            self._candles_deleted += batch
+            if batch:
+                self._notify()
+            if batch < self._batch_size:
+                return deleted
+            await asyncio.sleep(self._pause)
+
+    def _notify(self) -> None:
+        if self._on_progress is not None:
+            self._on_progress()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "raw_days": self._policy.raw_days,
+            "minute_days": self._policy.minute_days,
+            "runs": self._runs,
+            "raw_deleted": self._raw_deleted,
+            "candles_deleted": self._candles_deleted,
+            "last_run": self._last_run.isoformat(timespec="seconds") if self._last_run else None,
+            "last_duration_seconds": self._last_duration,
+        }
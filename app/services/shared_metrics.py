@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import mmap
+import os
+import time
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+from app.services.metrics_service import DEFAULT_LATENCY_BUCKETS, Histogram
+
+
+# Layout is expressed in 8-byte words so every counter is naturally aligned
+# and single-word updates are never torn.
+_MAGIC = 0x51524D4554524943  # "QRMETRIC"
+_VERSION = 1
+_HEADER_WORDS = 8
+_SLOT_HEADER_WORDS = 5  # pid, start_time, requests, errors, series_used
+_NAME_WORDS = 15
+_NAME_BYTES = _NAME_WORDS * 8
+_SEP = "\x1f"
+
+_PID, _START, _REQUESTS, _ERRORS, _SERIES_USED = range(_SLOT_HEADER_WORDS)
+
+
+class SharedHistogram(Histogram):
+    """Histogram whose counters live in a shared memory slot."""
+
+    def __init__(self, buckets: Sequence[float], words: memoryview, floats: memoryview, offset: int) -> None:
+        # Histogram.__init__ is not called: storage is the shared segment
+        self.buckets = tuple(buckets)
+        n = len(self.buckets) + 1
+        self.counts = words[offset:offset + n]
+        self._words = words
+        self._floats = floats
+        self._count_index = offset + n
+        self._sum_index = offset + n + 1
+
+    @property
+    def count(self) -> int:
+        return self._words[self._count_index]
+
+    @count.setter
+    def count(self, value: int) -> None:
+        self._words[self._count_index] = value
+
+    @property
+    def sum(self) -> float:
+        return self._floats[self._sum_index]
+
+    @sum.setter
+    def sum(self, value: float) -> None:
+        self._floats[self._sum_index] = value
+
+
+class WorkerSlot:
+    """One worker's region of the segment; only that worker ever writes to it."""
+
+    def __init__(self, segment: "SharedMetricsSegment", index: int) -> None:
+        self.segment = segment
+        self._segment = segment
+        self.index = index
+        self._base = segment._slot_offset(index)
+        # (requests, errors) as a 2-word view so `counters[i] += 1` works like a list
+        self.counters = segment._words[self._base + _REQUESTS:self._base + _ERRORS + 1]
+        self._series: Dict[str, SharedHistogram] = {}
+        for name, offset in segment._iter_series(index):
+            self._series[name] = SharedHistogram(segment.buckets, segment._words, segment._floats, offset + _NAME_WORDS)
+
+    def claim(self, pid: int) -> None:
+        """
+        Take over the slot for a (re)started worker.
+
+        Counters are kept, so aggregated totals stay monotonic across restarts.
+        """
+        words = self._segment._words
+        words[self._base + _PID] = pid
+        self._segment._floats[self._base + _START] = time.time()
+
+    def histogram(self, route: str, method: str, status_class: str) -> Optional[Histogram]:
+        """Shared histogram for the series, or None if the slot's series table is full."""
+        name = _SEP.join((route, method, status_class))
+        existing = self._series.get(name)
+        if existing is not None:
+            return existing
+        segment = self._segment
+        words = segment._words
+        used = words[self._base + _SERIES_USED]
+        if used >= segment.max_series:
+            return None
+        offset = segment._series_offset(self.index, used)
+        encoded = name.encode()[:_NAME_BYTES].ljust(_NAME_BYTES, b"\0")
+        segment._bytes[offset * 8:offset * 8 + _NAME_BYTES] = encoded
+        # Publish only after the name is written so readers never see a partial entry
+        words[self._base + _SERIES_USED] = used + 1
+        histogram = SharedHistogram(segment.buckets, words, segment._floats, offset + _NAME_WORDS)
+        self._series[name] = histogram
+        return histogram
+
+
+class SharedMetricsSegment:
+    """
+    mmap'd metrics segment shared by all gunicorn workers.
+
+    The master creates it before forking; each worker claims a slot and
+    updates its own counters and histograms lock-free. Readers sum every slot
+    at request time.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        fd = os.open(path, os.O_RDWR)
+        try:
+            size = os.fstat(fd).st_size
+            self._mmap = mmap.mmap(fd, size, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+        finally:
+            os.close(fd)
+        self._bytes = memoryview(self._mmap)
+        self._words = self._bytes.cast("q")
+        self._floats = self._bytes.cast("d")
+        if self._words[0] != _MAGIC or self._words[1] != _VERSION:
+            raise ValueError(f"{path} is not a metrics segment")
+        self.num_slots = self._words[2]
+        self.max_series = self._words[3]
+        self._slot_words = self._words[5]
+        n_buckets = self._words[4]
+        self.buckets = tuple(self._floats[_HEADER_WORDS:_HEADER_WORDS + n_buckets])
+        self._buckets_words = n_buckets
+
+    @classmethod
+    def create(
+        cls,
+        path: str,
+        num_slots: int = 32,
+        max_series: int = 64,
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> "SharedMetricsSegment":
+        series_words = _NAME_WORDS + len(buckets) + 1 + 2
+        slot_words = _SLOT_HEADER_WORDS + max_series * series_words
+        total_words = _HEADER_WORDS + len(buckets) + num_slots * slot_words
+        header = bytearray((_HEADER_WORDS + len(buckets)) * 8)
+        words = memoryview(header).cast("q")
+        words[0] = _MAGIC
+        words[1] = _VERSION
+        words[2] = num_slots
+        words[3] = max_series
+        words[4] = len(buckets)
+        words[5] = slot_words
+        floats = memoryview(header).cast("d")
+        for i, bound in enumerate(buckets):
+            floats[_HEADER_WORDS + i] = bound
+        words.release()
+        floats.release()
+        with open(path, "wb") as f:
+            f.write(header)
+            f.truncate(total_words * 8)
+        return cls(path)
+
+    def _slot_offset(self, index: int) -> int:
+        if not 0 <= index < self.num_slots:
+            raise ValueError(f"metrics slot {index} out of range")
+        return _HEADER_WORDS + self._buckets_words + index * self._slot_words
+
+    def _series_offset(self, index: int, series: int) -> int:
+        series_words = _NAME_WORDS + self._buckets_words + 1 + 2
+        return self._slot_offset(index) + _SLOT_HEADER_WORDS + series * series_words
+
+    def _iter_series(self, index: int) -> Iterator[Tuple[str, int]]:
+        used = min(self._words[self._slot_offset(index) + _SERIES_USED], self.max_series)
+        for series in range(used):
+            offset = self._series_offset(index, series)
+            raw = bytes(self._bytes[offset * 8:offset * 8 + _NAME_BYTES]).rstrip(b"\0")
+            yield raw.decode(errors="replace"), offset
+
+    def slot(self, index: int) -> WorkerSlot:
+        return WorkerSlot(self, index)
+
+    def workers(self) -> Dict[str, Dict[str, Any]]:
+        """Per-worker counters for every claimed slot, keyed by pid."""
+        now = time.time()
+        workers: Dict[str, Dict[str, Any]] = {}
+        for index in range(self.num_slots):
+            base = self._slot_offset(index)
+            pid = self._words[base + _PID]
+            if pid == 0:
+                continue
+            workers[str(pid)] = {
+                "slot": index,
+                "uptime_seconds": int(now - self._floats[base + _START]),
+                "requests_total": self._words[base + _REQUESTS],
+                "errors_total": self._words[base + _ERRORS],
+            }
+        return workers
+
+    def histograms(self) -> Dict[Tuple[str, str, str], Histogram]:
+        """Latency histograms summed across slots, keyed by (route, method, status class)."""
+        n = self._buckets_words + 1
+        merged: Dict[Tuple[str, str, str], Histogram] = {}
+        for index in range(self.num_slots):
+            for name, offset in self._iter_series(index):
+                key = tuple(name.split(_SEP))
+                histogram = merged.get(key)
+                if histogram is None:
+                    histogram = merged[key] = Histogram(self.buckets)
+                start = offset + _NAME_WORDS
+                for i in range(n):
+                    histogram.counts[i] += self._words[start + i]
+                histogram.count += self._words[start + n]
+                histogram.sum += self._floats[start + n + 1]
+        return merged
+
+    def aggregate(self) -> Dict[str, Any]:
+        """Totals summed across workers plus the per-worker breakdown."""
+        workers = self.workers()
+        latency: Dict[str, Any] = {}
+        for (route, method, status_class), histogram in self.histograms().items():
+            latency.setdefault(route, {}).setdefault(method, {})[status_class] = histogram.snapshot()
+        return {
+            "requests_total": sum(w["requests_total"] for w in workers.values()),
+            "errors_total": sum(w["errors_total"] for w in workers.values()),
+            "latency_seconds": latency,
+            "workers": workers,
+        }
+
+    def close(self) -> None:
+        self._floats.release()
+        self._words.release()
+        self._bytes.release()
+        self._mmap.close()
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Sequence
+
+if TYPE_CHECKING:
+    from app.services.exchange_service import ExchangeBackend
+
+
+class SymbolRegistry:
+    """
+    Rejects unknown currencies without calling an exchange.
+
+    A currency is unknown when every exchange's loaded market list lacks its
+    USDT symbol (ccxt keeps the lists in memory once markets are loaded, see
+    MarketsWarmup). While some lists are not loaded yet, currencies the
+    exchanges recently reported as not found are rejected from a bounded LRU
+    negative cache for ``negative_ttl_seconds``.
+    """
+
+    def __init__(
+        self,
+        backends: Sequence["ExchangeBackend"],
+        negative_cache_size: int = 10000,
+        negative_ttl_seconds: float = 600.0,
+    ) -> None:
+        self._backends = backends
+        self._negative_size = negative_cache_size
+        self._negative_ttl = negative_ttl_seconds
+        # currency -> expires at (monotonic)
+        self._negative: "OrderedDict[str, float]" = OrderedDict()
+        self._rejected_unknown = 0
+        self._rejected_negative = 0
+
+    def check(self, currency: str) -> None:
+        """Raise ValueError if ``currency`` is known not to be listed anywhere."""
+        currency = currency.upper()
+        listed = [backend.lists(currency) for backend in self._backends]
+        if True in listed:
+            return
+        if listed and None not in listed:
+            self._rejected_unknown += 1
+            raise ValueError(f"Currency not found: {currency}")
+        expires_at = self._negative.get(currency)
+        if expires_at is not None:
+            if time.monotonic() < expires_at:
+                self._rejected_negative += 1
+                raise ValueError(f"Currency not found: {currency}")
+            del self._negative[currency]
+
+    def remember_missing(self, currency: str) -> None:
+        if self._negative_size <= 0:
+            return
+        currency = currency.upper()
+        self._negative[currency] = time.monotonic() + self._negative_ttl
+        self._negative.move_to_end(currency)
+        while len(self._negative) > self._negative_size:
+            self._negative.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rejected_unknown": self._rejected_unknown,
+            "rejected_negative_cache": self._rejected_negative,
+            "negative_cache_size": len(self._negative),
+            "negative_cache_max_size": self._negative_size,
+        }
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+class TickerCache:
+    """
+    Per-symbol short-TTL cache with single-flight fetch coalescing.
+
+    Concurrent callers asking for the same symbol while a fetch is in flight
+    share that fetch instead of issuing their own. Entries are evicted in LRU
+    order once ``max_size`` is reached. Failed fetches are never cached.
+    """
+
+    def __init__(self, ttl_seconds: float = 1.0, max_size: int = 1024) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be positive")
+        self._ttl = ttl_seconds
+        self._max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, Decimal]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._evictions = 0
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Decimal]]) -> Decimal:
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if time.monotonic() < expires_at:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return value
+            # Expired entries stay until replaced or evicted, see get_stale
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self._coalesced += 1
+            # Shield so a cancelled waiter does not cancel the shared fetch
+            return await asyncio.shield(pending)
+
+        self._misses += 1
+        task = asyncio.ensure_future(self._fetch_and_store(key, fetch))
+        self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _fetch_and_store(self, key: str, fetch: Callable[[], Awaitable[Decimal]]) -> Decimal:
+        try:
+            value = await fetch()
+            self._store(key, value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def get_stale(self, key: str, max_age_seconds: float) -> Optional[Tuple[Decimal, float]]:
+        """(value, age in seconds) for an entry stored within ``max_age_seconds``, expired or not."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        age = time.monotonic() - (expires_at - self._ttl)
+        if age > max_age_seconds:
+            return None
+        return value, age
+
+    def put(self, key: str, value: Decimal) -> None:
+        """Store a value fetched outside of ``get_or_fetch`` (e.g. a batch call)."""
+        self._store(key, value)
+
+    def _store(self, key: str, value: Decimal) -> None:
+        if self._ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self._ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses + self._coalesced
+        return {
+            "size": len(self._entries),
+            "max_size": self._max_size,
+            "ttl_seconds": self._ttl,
+            "hits": self._hits,
+            "misses": self._misses,
+            "coalesced": self._coalesced,
+            "evictions": self._evictions,
+            "inflight": len(self._inflight),
+            "hit_ratio": (
+                (self._hits + self._coalesced) / lookups
+                if lookups > 0
+                else 0.0
+            ),
+        }
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import re
+from datetime import datetime, timezone
 
 
 class CurrencyValidator:
@@ -12,3 +13,32 @@ class CurrencyValidator:
         if not cls._pattern.match(candidate):
             raise ValueError("invalid currency")
         return candidate
+
+
+class DateTimeValidator:
+    @staticmethod
+    def parse_utc_naive(raw: str) -> datetime:
+        """Parse an ISO 8601 timestamp into the naive UTC form stored in the database."""
+        candidate = (raw or "").strip()
+        if candidate.endswith("Z"):
+            candidate = candidate[:-1] + "+00:00"
+        try:
+            value = datetime.fromisoformat(candidate)
+        except ValueError as e:
+            raise ValueError(f"invalid datetime: {raw}") from e
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+
+class DurationValidator:
+    _pattern = re.compile(r"^(\d+)([smh]?)$")
+    _units = {"": 1, "s": 1, "m": 60, "h": 3600}
+
+    @classmethod
+    def parse_seconds(cls, raw: str) -> int:
+        """Parse a positive duration such as ``300``, ``90s``, ``15m`` or ``2h`` into seconds."""
+        match = cls._pattern.match((raw or "").strip().lower())
+        if not match or int(match.group(1)) == 0:
+            raise ValueError(f"invalid duration: {raw}")
+        return int(match.group(1)) * cls._units[match.group(2)]
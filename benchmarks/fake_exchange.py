@@ -0,0 +1,61 @@
+"""
+Offline stand-in for the ccxt kucoin client used by ``ExchangeService``.
+
+Each call sleeps for ``latency_ms`` +/- ``jitter_ms`` and fails with a
+``ccxt.NetworkError`` at ``error_rate``, so the app sees realistic timings
+and failure modes without touching the network.
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+from typing import Dict, Iterable, List, Optional
+
+import ccxt.async_support as ccxt
+
+DEFAULT_CURRENCIES = ("BTC", "ETH", "SOL", "XRP", "ADA", "DOGE", "DOT", "LTC", "LINK", "AVAX")
+
+
+class FakeExchange:
+    def __init__(
+        self,
+        latency_ms: float = 50.0,
+        jitter_ms: float = 10.0,
+        error_rate: float = 0.0,
+        currencies: Iterable[str] = DEFAULT_CURRENCIES,
+        seed: Optional[int] = None,
+    ) -> None:
+        self._latency = latency_ms / 1000
+        self._jitter = jitter_ms / 1000
+        self._error_rate = error_rate
+        self._random = random.Random(seed)
+        self.markets = {f"{c}/USDT": {"symbol": f"{c}/USDT", "quote": "USDT"} for c in currencies}
+        self.calls = 0
+
+    async def _delay(self) -> None:
+        self.calls += 1
+        delay = self._latency + self._random.uniform(-self._jitter, self._jitter)
+        await asyncio.sleep(max(delay, 0.0))
+        if self._random.random() < self._error_rate:
+            raise ccxt.NetworkError("fake exchange: injected failure")
+
+    def _ticker(self, symbol: str) -> dict:
+        bid = round(1000 + self._random.random() * 100, 4)
+        return {"symbol": symbol, "bid": bid, "ask": bid + 0.01}
+
+    async def load_markets(self, reload: bool = False) -> Dict[str, dict]:
+        return self.markets
+
+    async def fetch_ticker(self, symbol: str) -> dict:
+        await self._delay()
+        if symbol not in self.markets:
+            raise ccxt.BadSymbol(f"fake exchange does not have market symbol {symbol}")
+        return self._ticker(symbol)
+
+    async def fetch_tickers(self, symbols: Optional[List[str]] = None) -> Dict[str, dict]:
+        await self._delay()
+        wanted = symbols if symbols is not None else list(self.markets)
+        return {s: self._ticker(s) for s in wanted if s in self.markets}
+
+    async def close(self) -> None:
+        return None
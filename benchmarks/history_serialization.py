@@ -0,0 +1,79 @@
+"""
+Micro-benchmark for the /price/history read + serialize path.
+
+Compares the previous path (ORM entities -> ``to_dict`` -> stdlib json) with
+the current one (column rows -> fast encoder) for several page sizes.
+
+Usage:
+    python -m benchmarks.history_serialization [--iterations 200]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.engine import Base
+from app.models.currency import Currency
+from app.repositories.currency_repository import CurrencyRepository
+from app.services import serialization
+
+PAGE_SIZES = (10, 100, 1000)
+
+
+async def _legacy(session: AsyncSession, page_size: int) -> bytes:
+    stmt = select(Currency).order_by(Currency.date_.desc(), Currency.id.desc()).limit(page_size)
+    items = (await session.execute(stmt)).scalars().all()
+    body = json.dumps({"status": "ok", "data": {"items": [i.to_dict() for i in items]}}).encode()
+    # The ORM path also pays for identity-map bookkeeping between requests
+    session.expunge_all()
+    return body
+
+
+async def _fast(session: AsyncSession, page_size: int) -> bytes:
+    rows = await CurrencyRepository(session).list_page(page=1, page_size=page_size)
+    return serialization.dumps({"status": "ok", "data": {"items": [r._asdict() for r in rows]}})
+
+
+async def _measure(session: AsyncSession, fn, page_size: int, iterations: int) -> float:
+    await fn(session, page_size)  # warm up statement caches
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await fn(session, page_size)
+    return page_size * iterations / (time.perf_counter() - started)
+
+
+async def main(iterations: int) -> None:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
+
+    async with session_factory() as session:
+        start = datetime(2025, 1, 1)
+        await CurrencyRepository(session).add_many(
+            ("btc", start + timedelta(seconds=i), Decimal("50000.1234") + i) for i in range(max(PAGE_SIZES))
+        )
+        await session.commit()
+
+        print(f"encoder: {serialization.ENCODER}")
+        print(f"{'rows':>6} {'legacy rows/s':>15} {'fast rows/s':>15} {'speedup':>8}")
+        for page_size in PAGE_SIZES:
+            n = max(iterations * 10 // page_size, 5)
+            legacy = await _measure(session, _legacy, page_size, n)
+            fast = await _measure(session, _fast, page_size, n)
+            print(f"{page_size:>6} {legacy:>15,.0f} {fast:>15,.0f} {fast / legacy:>7.2f}x")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations))
@@ -0,0 +1,81 @@
+"""
+Memory and read-time benchmark for the in-memory recent prices store.
+
+Fills ``RecentPrices`` with ticks for several currencies and reports the
+bytes allocated per tick (tracemalloc) next to a plain list of
+(datetime, Decimal) tuples, then times ``window`` reads of various sizes.
+
+Usage:
+    python -m benchmarks.recent_prices [--ticks 100000] [--currencies 10]
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from app.services.recent_prices import RecentPrices
+
+WINDOWS = (60, 3600, 6 * 3600)
+
+
+def _allocated(build) -> tuple[int, object]:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    store = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, store
+
+
+def main(ticks: int, currencies: int) -> None:
+    start = datetime(2025, 1, 1)
+    per_currency = ticks // currencies
+    names = [f"c{i}" for i in range(currencies)]
+
+    def ring():
+        store = RecentPrices(capacity=per_currency, max_currencies=currencies)
+        for n in range(per_currency):
+            date_ = start + timedelta(seconds=n)
+            for name in names:
+                store.add(name, date_, Decimal("50000.1234") + n)
+        return store
+
+    def tuples():
+        store = {name: [] for name in names}
+        for n in range(per_currency):
+            date_ = start + timedelta(seconds=n)
+            for name in names:
+                store[name].append((date_, Decimal("50000.1234") + n))
+        return store
+
+    ring_bytes, store = _allocated(ring)
+    tuple_bytes, _ = _allocated(tuples)
+    total = per_currency * currencies
+    print(f"{total:,} ticks across {currencies} currencies")
+    print(f"{'store':>18} {'bytes/tick':>12}")
+    print(f"{'RecentPrices':>18} {ring_bytes / total:>12.1f}")
+    print(f"{'list of tuples':>18} {tuple_bytes / total:>12.1f}")
+
+    end = start + timedelta(seconds=per_currency)
+    print(f"{'window s':>10} {'ticks':>8} {'reads/s':>10}")
+    for window in WINDOWS:
+        since = end - timedelta(seconds=window)
+        items, _ = store.window(names[0], since)
+        n = max(10000 // max(len(items), 1), 5)
+        started = time.perf_counter()
+        for _ in range(n):
+            store.window(names[0], since)
+        print(f"{window:>10} {len(items):>8} {n / (time.perf_counter() - started):>10,.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ticks", type=int, default=100000)
+    parser.add_argument("--currencies", type=int, default=10)
+    args = parser.parse_args()
+    main(args.ticks, args.currencies)
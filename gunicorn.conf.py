@@ -5,6 +5,9 @@ For more configuration options see:
 https://docs.gunicorn.org/en/stable/settings.html
 """
 
+import os
+import tempfile
+
 # Server socket
 bind = "0.0.0.0:8000"
 
@@ -28,15 +31,40 @@ user = None
 group = None
 tmp_upload_dir = None
 
-# Worker timeouts
+# Worker timeouts; `timeout` also bounds app startup, so MARKETS_WARMUP_TIMEOUT_MS must stay below it
 timeout = 30
 graceful_timeout = 30
 keepalive = 2
 
+# Shared metrics segment: one slot per live worker, summed by /metrics
+metrics_shm_slots = 32
+
+
+def _metrics_shm_path():
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.getenv("METRICS_SHM_PATH") or os.path.join(base, f"{proc_name}-metrics-{os.getpid()}")
+
+
 # Server hooks for debugging
 def on_starting(server):
     """Called just before the master process is initialized."""
     server.log.info("Gunicorn is starting")
+    from app.services.shared_metrics import SharedMetricsSegment
+
+    path = _metrics_shm_path()
+    slots = max(metrics_shm_slots, server.cfg.workers * 2)
+    SharedMetricsSegment.create(path, num_slots=slots).close()
+    # Inherited by every forked worker
+    os.environ["METRICS_SHM_PATH"] = path
+    # Lets each worker know whether it sees every write (recent prices coverage)
+    os.environ["WEB_CONCURRENCY"] = str(server.cfg.workers)
+    warmup_ms = int(os.getenv("MARKETS_WARMUP_TIMEOUT_MS", "10000"))
+    if warmup_ms >= server.cfg.timeout * 1000:
+        server.log.warning(
+            f"MARKETS_WARMUP_TIMEOUT_MS={warmup_ms} is not below the worker timeout of "
+            f"{server.cfg.timeout}s; a slow markets load can get workers killed before they serve"
+        )
+    server.metrics_shm_slots = slots
 
 def on_reload(server):
     """Called to recycle workers during a reload via SIGHUP."""
@@ -48,11 +76,20 @@ def when_ready(server):
 
 def pre_fork(server, worker):
     """Called just before a worker is forked."""
-    pass
+    # Reuse the lowest slot not held by a live worker, so restarts keep counting
+    used = {getattr(w, "metrics_slot", None) for w in server.WORKERS.values()}
+    worker.metrics_slot = next(
+        (i for i in range(server.metrics_shm_slots) if i not in used), None
+    )
 
 def post_fork(server, worker):
     """Called just after a worker has been forked."""
     server.log.info(f"Worker spawned (pid: {worker.pid})")
+    if worker.metrics_slot is not None:
+        os.environ["METRICS_SHM_SLOT"] = str(worker.metrics_slot)
+    else:
+        server.log.warning("No free metrics slot, worker metrics stay process-local")
+        os.environ.pop("METRICS_SHM_SLOT", None)
 
 def post_worker_init(worker):
     """Called just after a worker has initialized the application."""
@@ -69,3 +106,7 @@ def worker_abort(worker):
 def on_exit(server):
     """Called just before exiting Gunicorn."""
     server.log.info("Gunicorn is shutting down")
+    try:
+        os.unlink(os.environ["METRICS_SHM_PATH"])
+    except (KeyError, OSError):
+        pass
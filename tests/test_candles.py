@@ -0,0 +1,108 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+
+from app.db.engine import Base
+from app.repositories.candle_repository import CandleRepository, bucket_start
+from app.repositories.currency_repository import CurrencyRepository
+from app.services.candle_rollup import CandleRollup
+from app.services.candle_service import CandleService, backfill_candles
+
+
+@pytest_asyncio.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", echo=False, future=True)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
+    await engine.dispose()
+
+
+def test_bucket_start():
+    ts = datetime(2025, 10, 16, 12, 34, 56)
+    assert bucket_start(ts, "1m") == datetime(2025, 10, 16, 12, 34)
+    assert bucket_start(ts, "5m") == datetime(2025, 10, 16, 12, 30)
+    assert bucket_start(ts, "1h") == datetime(2025, 10, 16, 12, 0)
+    assert bucket_start(ts, "1d") == datetime(2025, 10, 16)
+
+
+@pytest.mark.asyncio
+async def test_candles_rolled_up_after_insert_commits(session_factory):
+    rollup = CandleRollup(session_factory)
+    async with session_factory() as session:
+        repo = CurrencyRepository(session)
+        first = await repo.add("btc", datetime(2025, 10, 16, 12, 0, 5), Decimal("10"))
+        batch = await repo.add_many([
+            ("btc", datetime(2025, 10, 16, 12, 0, 30), Decimal("15")),
+            ("btc", datetime(2025, 10, 16, 12, 0, 40), Decimal("8")),
+        ])
+        last = await repo.add("btc", datetime(2025, 10, 16, 12, 1, 0), Decimal("12"))
+        await session.commit()
+        # Inserts no longer touch the candles; committed ticks reach them through the rollup,
+        # here in a different order than their ids
+        rollup.add([(e.id, e.currency, e.date_, e.price) for e in [last] + list(batch)])
+        rollup.add([(first.id, first.currency, first.date_, first.price)])
+        assert await CandleService(session).get_candles("btc", "1m") == []
+
+    assert await rollup.flush() == 2 + 1 + 1 + 1
+    assert rollup.stats()["ticks_added"] == 4
+    async with session_factory() as session:
+        candles = await CandleService(session).get_candles("BTC", "1m")
+        assert candles == [
+            {"t": "2025-10-16T12:00:00", "open": "10.0000000000", "high": "15.0000000000",
+             "low": "8.0000000000", "close": "8.0000000000", "count": 3},
+            {"t": "2025-10-16T12:01:00", "open": "12.0000000000", "high": "12.0000000000",
+             "low": "12.0000000000", "close": "12.0000000000", "count": 1},
+        ]
+
+        hourly = await CandleService(session).get_candles("btc", "1h")
+        assert len(hourly) == 1
+        assert hourly[0]["count"] == 4
+        assert hourly[0]["close"] == "12.0000000000"
+
+        with pytest.raises(ValueError):
+            await CandleService(session).get_candles("btc", "2m")
+
+
+@pytest.mark.asyncio
+async def test_candle_upserts_lock_rows_in_key_order(session_factory, monkeypatch):
+    async with session_factory() as session:
+        repo = CandleRepository(session)
+        written = []
+        execute = session.execute
+
+        async def spy(stmt, params=None, **kwargs):
+            written.append([(p["currency"], p["interval_"], p["bucket_start"]) for p in params])
+            return await execute(stmt, params, **kwargs)
+
+        monkeypatch.setattr(session, "execute", spy)
+        ts = datetime(2025, 10, 16, 12, 0, 5)
+        # As from /price?currencies=ETH,BTC: neither currency nor interval order is sorted
+        await repo.apply_ticks([(1, "eth", ts, Decimal("1")), (2, "btc", ts, Decimal("2"))])
+
+    assert len(written) == 1
+    assert written[0] == sorted(written[0])
+    assert [key[0] for key in written[0]] == ["btc"] * 4 + ["eth"] * 4
+
+
+@pytest.mark.asyncio
+async def test_candles_backfill_rebuilds_from_raw(session_factory):
+    async with session_factory() as session:
+        repo = CurrencyRepository(session)
+        await repo.add_many([
+            ("eth", datetime(2025, 10, 16, 9, 0, 0), Decimal("1")),
+            ("eth", datetime(2025, 10, 16, 9, 30, 0), Decimal("3")),
+        ])
+        await session.commit()
+
+    rows = await backfill_candles(session_factory, batch_size=1)
+    assert rows == 2
+
+    async with session_factory() as session:
+        candles = await CandleService(session).get_candles("eth", "1d")
+        assert candles[0]["open"] == "1.0000000000"
+        assert candles[0]["close"] == "3.0000000000"
+        assert candles[0]["count"] == 2
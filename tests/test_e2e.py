@@ -2,11 +2,17 @@
 E2E smoke test demonstrating the complete flow.
 Run with actual PostgreSQL if DATABASE_URL is set.
 """
+import json
+
 import pytest
 import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import make_mocked_request
+from datetime import datetime
 from decimal import Decimal
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 
+from app.controllers.price_controller import PriceController
 from app.db.engine import Base
 from app.services.currency_service import CurrencyService
 from app.services.validation import CurrencyValidator
@@ -50,6 +56,11 @@ async def test_e2e_flow(sqlite_session):
     assert page.page == 1
     assert page.total_pages == 1
     
+    page_no_total = await service.get_history(page=1, include_total=False)
+    assert page_no_total.total is None
+    assert page_no_total.total_pages is None
+    assert len(page_no_total.items) == 2
+    
     # 4. Delete all
     deleted = await service.delete_all()
     assert deleted == 2
@@ -60,6 +71,82 @@ async def test_e2e_flow(sqlite_session):
     assert len(page_empty.items) == 0
 
 
+@pytest.mark.asyncio
+async def test_e2e_cursor_pagination(sqlite_session):
+    """Walk the whole history with next_cursor until it runs out."""
+    service = CurrencyService(session=sqlite_session, page_size=2)
+    for i in range(5):
+        await service.record_current_price(currency="BTC", price=Decimal(i))
+
+    seen = []
+    cursor = None
+    while True:
+        page = await service.get_history_after(cursor=cursor)
+        seen.extend(item["id"] for item in page.items)
+        if page.next_cursor is None:
+            break
+        cursor = page.next_cursor
+
+    assert seen == [5, 4, 3, 2, 1]
+
+    with pytest.raises(ValueError):
+        await service.get_history_after(cursor="not-a-cursor")
+
+
+@pytest.mark.asyncio
+async def test_e2e_history_export(sqlite_session, aiohttp_client):
+    """Export streams every row in NDJSON and CSV without pagination."""
+    service = CurrencyService(session=sqlite_session, page_size=2)
+    for i in range(5):
+        await service.record_current_price(currency="BTC" if i % 2 else "ETH", price=Decimal(i))
+
+    async def handler(request):
+        return await PriceController(None, service).export_history(request)
+
+    app = web.Application()
+    app.router.add_get('/price/history/export', handler)
+    client = await aiohttp_client(app)
+
+    resp = await client.get('/price/history/export')
+    assert resp.status == 200
+    assert resp.headers['Content-Type'].startswith('application/x-ndjson')
+    rows = [json.loads(line) for line in (await resp.text()).splitlines()]
+    assert [r['id'] for r in rows] == [5, 4, 3, 2, 1]
+    assert rows[0]['price'] == '4.0000000000'
+
+    resp = await client.get('/price/history/export?format=csv&currency=btc')
+    assert resp.status == 200
+    lines = (await resp.text()).splitlines()
+    assert lines[0] == 'id,currency,date_,price'
+    assert len(lines) == 3
+    assert lines[1].startswith('4,btc,')
+
+    resp = await client.get('/price/history/export?format=xml')
+    assert resp.status == 400
+
+
+@pytest.mark.asyncio
+async def test_e2e_history_json_formatting(sqlite_session, aiohttp_client):
+    """History rows come from column selects and are formatted by the JSON encoder."""
+    service = CurrencyService(session=sqlite_session, page_size=10)
+    recorded = await service.record_current_price(currency="BTC", price=Decimal("50000.12"))
+
+    async def handler(request):
+        return await PriceController(None, service).get_history(request)
+
+    app = web.Application()
+    app.router.add_get('/price/history', handler)
+    client = await aiohttp_client(app)
+
+    resp = await client.get('/price/history')
+    assert resp.status == 200
+    item = (await resp.json())['data']['items'][0]
+    assert item['id'] == recorded['id']
+    assert item['currency'] == 'btc'
+    assert item['date_'] == recorded['date_']
+    assert item['price'] == '50000.1200000000'
+
+
 @pytest.mark.asyncio
 async def test_validation_edge_cases():
     """Test validation edge cases."""
@@ -81,3 +168,38 @@ async def test_validation_edge_cases():
     
     with pytest.raises(ValueError):
         CurrencyValidator.normalize_and_validate("рус")  # non-ASCII
+
+
+@pytest.mark.asyncio
+async def test_history_export_closes_cursor_on_disconnect(monkeypatch):
+    """A client disconnect releases the server-side cursor right away, not at GC time."""
+
+    class StreamingService:
+        closed = False
+
+        def stream_history(self, flt=None):
+            # Kept referenced, so only an explicit aclose() runs the finally block
+            self.stream = self._stream()
+            return self.stream
+
+        async def _stream(self):
+            try:
+                while True:
+                    yield [(1, "btc", datetime(2025, 10, 1), Decimal("1"))]
+            finally:
+                StreamingService.closed = True
+
+    writes = []
+
+    async def write(self, data):
+        writes.append(data)
+        if len(writes) > 1:
+            raise ConnectionResetError
+
+    monkeypatch.setattr(web.StreamResponse, "write", write)
+    service = StreamingService()
+    request = make_mocked_request("GET", "/price/history/export")
+    await PriceController(None, service).export_history(request)
+
+    assert len(writes) == 2
+    assert StreamingService.closed
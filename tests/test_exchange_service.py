@@ -0,0 +1,149 @@
+import asyncio
+from decimal import Decimal
+
+import ccxt.async_support as ccxt
+import pytest
+
+from app.services.exchange_service import ExchangeService
+from app.services.resilience import ExchangeUnavailable
+
+
+class FakeExchange:
+    def __init__(self, bid=1.0, delay=0.0, error=None, markets=("BTC/USDT", "ETH/USDT")):
+        self.bid = bid
+        self.delay = delay
+        self.error = error
+        self.markets = {m: {} for m in markets}
+        self.requested = []
+        self.cancelled = 0
+
+    async def fetch_ticker(self, symbol):
+        self.requested.append(symbol)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error is not None:
+            raise self.error
+        if symbol not in self.markets:
+            raise ccxt.BadSymbol(symbol)
+        return {"symbol": symbol, "bid": self.bid}
+
+    async def load_markets(self):
+        return self.markets
+
+    async def fetch_tickers(self, symbols):
+        if self.error is not None:
+            raise self.error
+        return {s: {"bid": self.bid} for s in symbols if s in self.markets}
+
+    async def close(self):
+        pass
+
+
+def make_service(primary, backup, **kwargs):
+    return ExchangeService(("primary", "backup"), clients={"primary": primary, "backup": backup}, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_hedged_request_takes_first_bid_and_cancels_loser():
+    primary = FakeExchange(bid=1.0, delay=1.0)
+    backup = FakeExchange(bid=2.0)
+    service = make_service(primary, backup, hedge_initial_delay=0.01)
+
+    assert await service.get_bid_price_usdt_pair("btc") == Decimal("2.0")
+    await asyncio.sleep(0.01)
+    assert primary.cancelled == 1
+
+    stats = service.stats()
+    assert stats["hedges"] == 1
+    assert stats["backends"]["backup"]["wins"] == 1
+    assert stats["backends"]["primary"]["cancelled"] == 1
+    assert stats["backends"]["primary"]["win_rate"] == 0.0
+
+
+@pytest.mark.asyncio
+async def test_fast_primary_is_not_hedged():
+    primary = FakeExchange(bid=1.0)
+    backup = FakeExchange(bid=2.0)
+    service = make_service(primary, backup, hedge_initial_delay=0.5)
+
+    assert await service.get_bid_price_usdt_pair("btc") == Decimal("1.0")
+    assert backup.requested == []
+    assert service.stats()["backends"]["primary"]["win_rate"] == 1.0
+
+
+@pytest.mark.asyncio
+async def test_failover_on_error_and_symbol_mapping():
+    primary = FakeExchange(error=ccxt.NetworkError("down"))
+    backup = FakeExchange(bid=3.0, markets=("XBT/USDT",))
+    service = make_service(primary, backup, hedge_percentile=0, symbol_map={"backup": {"BTC": "XBT/USDT"}})
+
+    assert await service.get_bid_price_usdt_pair("btc") == Decimal("3.0")
+    assert backup.requested == ["XBT/USDT"]
+    assert service.stats()["failovers"] == 1
+
+
+@pytest.mark.asyncio
+async def test_not_found_everywhere_raises_value_error():
+    service = make_service(FakeExchange(), FakeExchange())
+    with pytest.raises(ValueError):
+        await service.get_bid_price_usdt_pair("doge")
+
+
+@pytest.mark.asyncio
+async def test_network_error_wins_over_not_found():
+    backup = FakeExchange(error=ccxt.NetworkError("down"), markets=("DOGE/USDT",))
+    service = make_service(FakeExchange(), backup)
+    with pytest.raises(ExchangeUnavailable):
+        await service.get_bid_price_usdt_pair("doge")
+
+
+@pytest.mark.asyncio
+async def test_batch_falls_back_per_currency():
+    primary = FakeExchange(bid=1.0, markets=("BTC/USDT",))
+    backup = FakeExchange(bid=2.0, markets=("ETH/USDT",))
+    service = make_service(primary, backup)
+
+    prices, errors = await service.get_bid_prices_usdt_pairs(["btc", "eth", "doge"])
+    assert prices == {"BTC": Decimal("1.0"), "ETH": Decimal("2.0")}
+    assert list(errors) == ["DOGE"]
+    # One request per batch, comparable with single-symbol fetches
+    stats = service.stats()["backends"]
+    assert (stats["primary"]["requests"], stats["primary"]["wins"]) == (1, 1)
+    assert stats["backup"]["win_rate"] == 1.0
+
+
+def test_unknown_exchange_rejected():
+    with pytest.raises(ValueError):
+        ExchangeService(("not-an-exchange",))
+
+
+@pytest.mark.asyncio
+async def test_unknown_symbol_rejected_from_market_lists():
+    primary = FakeExchange()
+    backup = FakeExchange()
+    service = make_service(primary, backup)
+
+    with pytest.raises(ValueError):
+        await service.get_bid_price_usdt_pair("xxxxx")
+    prices, errors = await service.get_bid_prices_usdt_pairs(["btc", "xxxxx"])
+    assert list(prices) == ["BTC"]
+    assert list(errors) == ["XXXXX"]
+    assert primary.requested == backup.requested == []
+    assert service.stats()["symbols"]["rejected_unknown"] == 2
+
+
+@pytest.mark.asyncio
+async def test_not_found_is_negatively_cached_until_markets_load():
+    primary = FakeExchange(markets=())
+    service = ExchangeService("primary", clients={"primary": primary}, negative_cache_ttl_seconds=60)
+
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            await service.get_bid_price_usdt_pair("xxxxx")
+    assert primary.requested == ["XXXXX/USDT"]
+    symbols = service.stats()["symbols"]
+    assert symbols["rejected_negative_cache"] == 2
+    assert symbols["negative_cache_size"] == 1
@@ -1,10 +1,15 @@
+import asyncio
+import json
+
 import pytest
 from unittest.mock import AsyncMock, Mock
 from aiohttp import web
+from sqlalchemy.ext.asyncio import create_async_engine
 
 from app.controllers.health_controller import HealthController
 from app.controllers.metrics_controller import MetricsController
-from app.services.metrics_service import MetricsService
+from app.services.health_prober import HealthProber
+from app.services.metrics_service import Histogram, MetricsService
 
 
 @pytest.mark.asyncio
@@ -56,7 +61,7 @@ async def test_metrics_initial_state():
     """Test metrics endpoint returns initial state."""
     metrics_service = MetricsService()
     controller = MetricsController(metrics_service)
-    request = Mock(spec=web.Request)
+    request = Mock(spec=web.Request, query={}, headers={})
     
     response = await controller.get_metrics(request)
     
@@ -125,3 +130,122 @@ async def test_metrics_service_uptime():
     
     assert metrics["uptime_seconds"] >= 0
     assert isinstance(metrics["uptime_seconds"], int)
+
+
+def test_histogram_percentiles():
+    """Test histogram buckets observations and estimates percentiles."""
+    histogram = Histogram(buckets=(0.01, 0.1, 1.0))
+
+    for _ in range(90):
+        histogram.observe(0.005)
+    for _ in range(9):
+        histogram.observe(0.05)
+    histogram.observe(5.0)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 100
+    assert snapshot["p50"] == 0.01
+    assert snapshot["p95"] == 0.1
+    assert snapshot["p99"] == 0.1
+    assert histogram.percentile(1.0) is None
+    assert histogram.counts == [90, 9, 0, 1]
+
+
+@pytest.mark.asyncio
+async def test_metrics_latency_and_prometheus(aiohttp_client):
+    """Test middleware records per-route latency and /metrics negotiates Prometheus text."""
+    from app.middleware.metrics_middleware import metrics_middleware
+
+    metrics_service = MetricsService()
+    metrics_service.register_collector("ticker_cache", lambda: {"hits": 3, "symbols": {"BTC/USDT": 0.5}})
+    controller = MetricsController(metrics_service)
+
+    async def price(request):
+        return web.json_response({"status": "ok"})
+
+    async def metrics(request):
+        return await controller.get_metrics(request)
+
+    app = web.Application(middlewares=[metrics_middleware])
+    app["metrics_service"] = metrics_service
+    app.router.add_get("/price/{currency}", price)
+    app.router.add_get("/metrics", metrics)
+    client = await aiohttp_client(app)
+
+    await client.get("/price/BTC")
+    await client.get("/price/ETH")
+    await client.get("/missing")
+
+    resp = await client.get("/metrics")
+    data = await resp.json()
+    assert data["latency_seconds"]["/price/{currency}"]["GET"]["2xx"]["count"] == 2
+    assert data["latency_seconds"]["unmatched"]["GET"]["4xx"]["count"] == 1
+
+    resp = await client.get("/metrics", headers={"Accept": "text/plain;version=0.0.4"})
+    assert resp.status == 200
+    assert resp.content_type == "text/plain"
+    text = await resp.text()
+    assert "# TYPE http_request_duration_seconds histogram" in text
+    assert 'http_request_duration_seconds_count{route="/price/{currency}",method="GET",status="2xx"} 2' in text
+    assert 'le="+Inf"' in text
+    assert "app_ticker_cache_hits 3" in text
+    assert 'app_ticker_cache_symbols{key="BTC/USDT"} 0.5' in text
+
+
+@pytest.mark.asyncio
+async def test_live_and_cached_ready_endpoints(aiohttp_client):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    prober = HealthProber(engine, interval_seconds=60)
+    controller = HealthController(Mock(side_effect=AssertionError("no per-request session")), prober)
+
+    app = web.Application()
+    app.router.add_get("/health", controller.check)
+    app.router.add_get("/health/live", controller.live)
+    app.router.add_get("/health/ready", controller.ready)
+    client = await aiohttp_client(app)
+
+    resp = await client.get("/health/ready")
+    assert resp.status == 503
+    assert (await resp.json())["status"] == "starting"
+    resp = await client.get("/health")
+    assert resp.status == 503
+    assert (await resp.json())["status"] == "degraded"
+    assert (await client.get("/health/live")).status == 200
+
+    await prober.start()
+    try:
+        for path in ("/health/ready", "/health/ready", "/health"):
+            resp = await client.get(path)
+            assert resp.status == 200
+            data = await resp.json()
+            assert data["database"] == "connected"
+            assert data["age_seconds"] >= 0
+        # /health keeps its original contract, with the probe details alongside
+        assert data["status"] == "ok"
+        assert "timestamp" in data and "checked_at" in data
+        assert prober.stats()["probes"] == 1
+    finally:
+        await prober.stop()
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_prober_reports_database_failure_and_staleness():
+    engine = create_async_engine("sqlite+aiosqlite:////nonexistent/dir/health.db")
+    prober = HealthProber(engine, interval_seconds=60, stale_after_seconds=0.01)
+    result = await prober.probe()
+    assert result["ready"] is False
+    assert result["database"].startswith("error")
+    assert prober.stats()["failures"] == 1
+    await engine.dispose()
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    prober = HealthProber(engine, interval_seconds=60, stale_after_seconds=0.01)
+    assert (await prober.probe())["ready"] is True
+    await asyncio.sleep(0.02)
+    assert prober.result()["status"] == "stale"
+    assert prober.result()["ready"] is False
+    resp = await HealthController(None, prober).check(None)
+    assert resp.status == 503
+    assert json.loads(resp.body)["status"] == "degraded"
+    await engine.dispose()
@@ -0,0 +1,97 @@
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+
+from app.controllers.price_controller import PriceController
+from app.db.engine import Base
+from app.services.currency_service import CurrencyService
+from app.services.history_cache import HistoryCache
+
+
+def test_history_cache_generation_invalidates():
+    cache = HistoryCache(max_entries=4)
+    generation = cache.generation
+    etag = cache.put("page=1", b'{"a":1}', generation)
+
+    assert cache.get("page=1") == (etag, b'{"a":1}')
+    cache.invalidate()
+    assert cache.get("page=1") is None
+
+    # A body computed before the invalidation is not stored
+    cache.put("page=1", b'{"a":1}', generation)
+    assert cache.get("page=1") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_history_cache_bounds():
+    cache = HistoryCache(max_entries=2, max_bytes=100)
+    for i in range(3):
+        cache.put(f"page={i}", b"x" * 10, cache.generation)
+    assert cache.get("page=0") is None
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["evictions"] == 1
+
+    cache.put("big", b"x" * 95, cache.generation)
+    assert cache.stats()["bytes"] <= 100
+    assert cache.get("page=2") is None
+
+
+def test_history_cache_key_ignores_param_order():
+    assert HistoryCache.key({"page": "2", "currency": "btc"}) == HistoryCache.key({"currency": "btc", "page": "2"})
+
+
+@pytest_asyncio.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", echo=False, future=True)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_history_etag_and_invalidation(session_factory, aiohttp_client):
+    cache = HistoryCache()
+
+    async def get_history(request):
+        async with session_factory() as session:
+            service = CurrencyService(session, page_size=10)
+            return await PriceController(None, service, cache).get_history(request)
+
+    async def record(request):
+        async with session_factory() as session:
+            service = CurrencyService(session, page_size=10, history_cache=cache)
+            return web.json_response(await service.record_current_price("BTC", Decimal("1")))
+
+    app = web.Application()
+    app.router.add_get('/price/history', get_history)
+    app.router.add_post('/record', record)
+    client = await aiohttp_client(app)
+
+    await client.post('/record')
+    first = await client.get('/price/history')
+    assert first.status == 200
+    etag = first.headers['ETag']
+    assert len((await first.json())['data']['items']) == 1
+
+    cached = await client.get('/price/history')
+    assert cached.headers['ETag'] == etag
+    assert await cached.read() == await first.read()
+
+    not_modified = await client.get('/price/history', headers={'If-None-Match': etag})
+    assert not_modified.status == 304
+    assert cache.stats()["not_modified"] == 1
+
+    await client.post('/record')
+    fresh = await client.get('/price/history', headers={'If-None-Match': etag})
+    assert fresh.status == 200
+    assert fresh.headers['ETag'] != etag
+    assert len((await fresh.json())['data']['items']) == 2
+
+    invalid = await client.get('/price/history?from=garbage')
+    assert invalid.status == 400
+    assert 'ETag' not in invalid.headers
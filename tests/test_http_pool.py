@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import app.main
+
+from app.services.exchange_service import ExchangeService
+from app.services.http_pool import ExchangeHttpPool
+
+
+@pytest.mark.asyncio
+async def test_pool_reuses_keepalive_connections(aiohttp_server):
+    async def ping(request):
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_get("/ping", ping)
+    server = await aiohttp_server(app)
+
+    pool = ExchangeHttpPool(limit=10, limit_per_host=2)
+    try:
+        for _ in range(5):
+            async with pool.session.get(server.make_url("/ping")) as resp:
+                assert resp.status == 200
+                await resp.read()
+        stats = pool.stats()
+        assert stats["requests"] == 5
+        assert stats["new_connections"] == 1
+        assert stats["reused_connections"] == 4
+        assert stats["tls_handshakes"] == 0
+        assert stats["open"] == stats["idle"] == 1
+        assert stats["in_use"] == 0
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_ccxt_clients_share_the_pool_session():
+    pool = ExchangeHttpPool(request_timeout_seconds=3)
+    service = ExchangeService(("kucoin", "binance"), http_pool=pool)
+    clients = [backend.client for backend in service.backends]
+    assert all(client.session is pool.session for client in clients)
+    assert all(client.timeout == 3000 for client in clients)
+
+    await service.close()
+    assert pool.session.closed
+    assert service.stats()["http_pool"]["limit"] == 100
+
+
+def test_pool_works_on_the_loop_main_serves_from(monkeypatch):
+    """main() must build the app on the loop that serves it, not on one closed beforehand."""
+    for key, value in {
+        "DATABASE_URL": "sqlite+aiosqlite:///:memory:",
+        "ENABLE_UVLOOP": "false",
+        "MARKETS_WARMUP_ENABLED": "false",
+        "PARTITION_GRANULARITY": "none",
+        "RECENT_PRICES_WARMUP_MS": "0",
+    }.items():
+        monkeypatch.setenv(key, value)
+    statuses = []
+
+    async def serve(app_or_factory):
+        # What web.run_app does before serving: resolve the app on the serving loop, then start it
+        application = await app_or_factory if asyncio.iscoroutine(app_or_factory) else app_or_factory
+        runner = web.AppRunner(application)
+        await runner.setup()
+        try:
+            ping = web.Application()
+            ping.router.add_get("/ping", lambda request: web.json_response({"ok": True}))
+            async with TestServer(ping) as server:
+                async with application["http_pool"].session.get(server.make_url("/ping")) as resp:
+                    statuses.append(resp.status)
+        finally:
+            await runner.cleanup()
+
+    def run_app(app_or_factory, host=None, port=None):
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(serve(app_or_factory))
+        finally:
+            loop.close()
+
+    monkeypatch.setattr(app.main.web, "run_app", run_app)
+    app.main.main()
+    assert statuses == [200]
@@ -0,0 +1,35 @@
+import pytest
+
+from benchmarks.load_test import compare, parse_args, percentile, run
+
+
+def test_percentile_nearest_rank():
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 0.5) == 50.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile([], 0.5) == 0.0
+
+
+def test_compare_flags_regressions():
+    baseline = {"results": {"GET /health": {"p95_ms": 10.0, "rps": 1000.0}}}
+    current = {"results": {"GET /health": {"p95_ms": 13.0, "rps": 950.0}}}
+    assert compare(current, baseline, tolerance=0.2) == ["GET /health: p95 10.0ms -> 13.0ms"]
+    assert compare(current, baseline, tolerance=0.5) == []
+
+
+@pytest.mark.asyncio
+async def test_load_test_runs_against_real_app():
+    args = parse_args([
+        "--requests", "5", "--warmup", "0", "--concurrency", "2", "--seed-rows", "30",
+        "--latency-ms", "0", "--jitter-ms", "0", "--error-rate", "1", "--history-pages", "1", "2",
+    ])
+    report = await run(args)
+
+    results = report["results"]
+    assert set(results) == {
+        "GET /price/{currency}", "GET /price/history?page=1", "GET /price/history?page=2", "GET /health", "GET /metrics",
+    }
+    assert results["GET /price/{currency}"]["errors"] == 5
+    assert results["GET /price/history?page=2"]["errors"] == 0
+    assert report["meta"]["database"] == "sqlite+aiosqlite"
+    assert report["meta"]["history_cache_size"] == 0
@@ -0,0 +1,109 @@
+import asyncio
+import json
+import os
+
+import ccxt.async_support as ccxt
+import pytest
+
+from app.services.exchange_service import ExchangeService
+from app.services.markets_warmup import MarketsWarmup, snapshot_path
+
+
+class MarketsClient:
+    def __init__(self, error=None):
+        self.error = error
+        self.markets = None
+        self.currencies = None
+        self.loads = 0
+
+    async def load_markets(self, reload=False):
+        if self.markets is not None and not reload:
+            return self.markets
+        self.loads += 1
+        if self.error is not None:
+            raise self.error
+        self.set_markets({"BTC/USDT": {"symbol": "BTC/USDT"}}, {"BTC": {"code": "BTC"}})
+        return self.markets
+
+    def set_markets(self, markets, currencies=None):
+        self.markets = markets
+        self.currencies = currencies
+
+    async def fetch_ticker(self, symbol):
+        await self.load_markets()
+        return {"symbol": symbol, "bid": 1.0}
+
+    async def close(self):
+        pass
+
+
+def make_warmup(client, tmp_path, **kwargs):
+    service = ExchangeService("kucoin", clients={"kucoin": client})
+    return MarketsWarmup(service.backends, snapshot_dir=str(tmp_path), **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_warmup_downloads_then_next_worker_uses_snapshot(tmp_path):
+    first = MarketsClient()
+    warmup = make_warmup(first, tmp_path, refresh_interval_seconds=0)
+    await warmup.start()
+    assert first.loads == 1
+    assert warmup.stats()["sources"] == {"kucoin": "exchange"}
+    assert os.path.exists(snapshot_path(str(tmp_path), "kucoin"))
+
+    second = MarketsClient()
+    warmup = make_warmup(second, tmp_path, refresh_interval_seconds=0)
+    await warmup.start()
+    assert second.loads == 0
+    assert second.markets == first.markets
+    assert second.currencies == first.currencies
+    assert warmup.stats()["sources"] == {"kucoin": "snapshot"}
+
+
+@pytest.mark.asyncio
+async def test_expired_or_corrupt_snapshot_is_ignored(tmp_path):
+    path = snapshot_path(str(tmp_path), "kucoin")
+    with open(path, "w") as f:
+        json.dump({"saved_at": 0, "markets": {"OLD/USDT": {}}}, f)
+    client = MarketsClient()
+    await make_warmup(client, tmp_path, refresh_interval_seconds=0).start()
+    assert client.loads == 1
+    assert "BTC/USDT" in client.markets
+
+    with open(path, "w") as f:
+        f.write("{not json")
+    client = MarketsClient()
+    await make_warmup(client, tmp_path, refresh_interval_seconds=0).start()
+    assert client.loads == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_warmup_does_not_block_startup(tmp_path):
+    client = MarketsClient(error=ccxt.NetworkError("down"))
+    warmup = make_warmup(client, tmp_path, refresh_interval_seconds=0)
+    await warmup.start()
+    assert warmup.stats()["sources"] == {"kucoin": "failed"}
+    assert not os.path.exists(snapshot_path(str(tmp_path), "kucoin"))
+
+
+@pytest.mark.asyncio
+async def test_background_refresh_reloads_markets(tmp_path):
+    client = MarketsClient()
+    warmup = make_warmup(client, tmp_path, refresh_interval_seconds=0.01)
+    await warmup.start()
+    await asyncio.sleep(0.05)
+    await warmup.stop()
+    stats = warmup.stats()
+    assert client.loads > 1
+    assert stats["refreshes"] >= 1
+    assert stats["refresh_errors"] == 0
+
+
+@pytest.mark.asyncio
+async def test_time_to_first_fast_request_is_reported():
+    service = ExchangeService("kucoin", clients={"kucoin": MarketsClient()})
+    assert service.stats()["time_to_first_fast_request_seconds"] is None
+    await service.get_bid_price_usdt_pair("btc")
+    stats = service.stats()
+    assert stats["first_request_seconds"] is not None
+    assert stats["time_to_first_fast_request_seconds"] >= stats["first_request_seconds"]
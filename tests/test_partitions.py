@@ -0,0 +1,60 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.partitions import (
+    PartitionManager,
+    create_partition_sql,
+    next_period,
+    parse_upper_bound,
+    partition_name,
+    period_start,
+)
+
+
+def test_period_helpers_month():
+    start = period_start(datetime(2025, 12, 17, 13, 5), "month")
+    assert start == datetime(2025, 12, 1)
+    assert next_period(start, "month") == datetime(2026, 1, 1)
+    assert partition_name(start, "month") == "currencies_p202512"
+
+
+def test_period_helpers_day():
+    start = period_start(datetime(2025, 2, 28, 23, 59), "day")
+    assert start == datetime(2025, 2, 28)
+    assert next_period(start, "day") == datetime(2025, 3, 1)
+    assert partition_name(start, "day") == "currencies_p20250228"
+
+
+def test_create_partition_sql():
+    sql = create_partition_sql(datetime(2025, 10, 1), "month")
+    assert sql == (
+        "CREATE TABLE IF NOT EXISTS currencies_p202510 PARTITION OF currencies "
+        "FOR VALUES FROM ('2025-10-01 00:00:00') TO ('2025-11-01 00:00:00')"
+    )
+
+
+def test_parse_upper_bound():
+    assert parse_upper_bound(
+        "FOR VALUES FROM ('2025-10-01 00:00:00') TO ('2025-11-01 00:00:00')"
+    ) == datetime(2025, 11, 1)
+    assert parse_upper_bound("FOR VALUES FROM (MINVALUE) TO ('2025-10-01 00:00:00')") == datetime(2025, 10, 1)
+    assert parse_upper_bound("DEFAULT") is None
+
+
+def test_partition_manager_rejects_unknown_granularity():
+    with pytest.raises(ValueError):
+        PartitionManager(engine=None, granularity="week")
+
+
+@pytest.mark.asyncio
+async def test_partition_manager_noop_on_sqlite():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    manager = PartitionManager(engine)
+    await manager.start()
+    await manager.stop()
+    await engine.dispose()
+
+    assert manager.partitioned is False
+    assert manager.stats()["created"] == 0
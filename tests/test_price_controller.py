@@ -4,6 +4,7 @@ from aiohttp import web
 import pytest
 
 from app.controllers.price_controller import PriceController
+from app.services.resilience import CircuitOpenError
 from app.services.validation import CurrencyValidator
 
 
@@ -13,6 +14,11 @@ class DummyExchange:
             raise ValueError("Currency not found")
         return Decimal("123.45")
 
+    async def get_bid_prices_usdt_pairs(self, currencies):
+        prices = {c: Decimal("123.45") for c in currencies if c != "FAKE"}
+        errors = {c: f"Currency not found: {c}" for c in currencies if c == "FAKE"}
+        return prices, errors
+
     async def close(self):
         pass
 
@@ -21,7 +27,13 @@ class DummyCurrencyService:
     async def record_current_price(self, currency: str, price: Decimal) -> dict:
         return {"currency": currency, "price": str(price), "id": 1, "date_": "2025-10-16T00:00:00"}
 
-    async def get_history(self, page: int):
+    async def record_current_prices(self, prices) -> list:
+        return [
+            {"currency": c.lower(), "price": str(p), "id": i, "date_": "2025-10-16T00:00:00"}
+            for i, (c, p) in enumerate(prices.items(), start=1)
+        ]
+
+    async def get_history(self, page: int, include_total: bool = True, flt=None):
         return type("Page", (), {"__dict__": {"items": [], "page": page, "page_size": 10, "total": 0, "total_pages": 1}})()
 
     async def delete_all(self) -> int:
@@ -94,3 +106,89 @@ async def test_history_and_delete(aiohttp_client):
     assert resp2.status == 200
     data2 = await resp2.json()
     assert data2['deleted'] == 5
+
+
+@pytest.mark.asyncio
+async def test_get_prices_batch_partial_failure(aiohttp_client):
+    async def handler(request):
+        controller = PriceController(DummyExchange(), DummyCurrencyService())
+        return await controller.get_prices(request)
+
+    app = web.Application()
+    app.router.add_get('/price', handler)
+    client = await aiohttp_client(app)
+    resp = await client.get('/price?currencies=btc,ETH,bad-coin,FAKE,BTC')
+    assert resp.status == 200
+    data = await resp.json()
+    assert data['status'] == 'ok'
+    assert [d['currency'] for d in data['data']] == ['btc', 'eth']
+    assert {e['currency'] for e in data['errors']} == {'bad-coin', 'FAKE'}
+
+
+@pytest.mark.asyncio
+async def test_get_prices_batch_requires_currencies(aiohttp_client):
+    async def handler(request):
+        controller = PriceController(DummyExchange(), DummyCurrencyService())
+        return await controller.get_prices(request)
+
+    app = web.Application()
+    app.router.add_get('/price', handler)
+    client = await aiohttp_client(app)
+    resp = await client.get('/price')
+    assert resp.status == 400
+    resp = await client.get('/price?currencies=FAKE')
+    assert resp.status == 400
+
+
+@pytest.mark.asyncio
+async def test_history_filter_validation(aiohttp_client):
+    controller = PriceController(DummyExchange(), DummyCurrencyService())
+
+    async def get_h(request):
+        return await controller.get_history(request)
+
+    app = web.Application()
+    app.router.add_get('/price/history', get_h)
+    client = await aiohttp_client(app)
+
+    resp = await client.get('/price/history?currency=btc&from=2025-10-01T00:00:00Z')
+    assert resp.status == 200
+    resp = await client.get('/price/history?from=yesterday')
+    assert resp.status == 400
+    resp = await client.get('/price/history?currency=bad-coin')
+    assert resp.status == 400
+
+
+class UnavailableExchange(DummyExchange):
+    def __init__(self, stale=None):
+        self.stale = stale
+
+    async def get_bid_price_usdt_pair(self, currency: str) -> Decimal:
+        raise CircuitOpenError("circuit open")
+
+    def get_stale_bid(self, currency: str):
+        return self.stale
+
+
+@pytest.mark.asyncio
+async def test_get_price_exchange_unavailable(aiohttp_client):
+    exchanges = iter([UnavailableExchange(), UnavailableExchange(stale=(Decimal("99.5"), 2.5))])
+
+    async def handler(request):
+        controller = PriceController(next(exchanges), DummyCurrencyService())
+        return await controller.get_price(request)
+
+    app = web.Application()
+    app.router.add_get('/price/{currency}', handler)
+    client = await aiohttp_client(app)
+
+    resp = await client.get('/price/BTC')
+    assert resp.status == 503
+    assert resp.headers['Retry-After'] == '1'
+
+    resp = await client.get('/price/BTC')
+    assert resp.status == 200
+    assert 'Warning' in resp.headers
+    data = await resp.json()
+    assert data['stale'] is True
+    assert data['data'] == {'currency': 'BTC', 'price': '99.5', 'age_seconds': 2.5}
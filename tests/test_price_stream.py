@@ -0,0 +1,89 @@
+import asyncio
+from decimal import Decimal
+
+import pytest
+from aiohttp import web
+
+from app.services.price_stream import PriceBook, PriceStreamService, WebSocketTickerSource
+
+
+def make_fake_feed(bids, close_after=None):
+    """Fake ticker WebSocket server pushing the given {symbol: bid} updates."""
+    connections = []
+
+    async def handler(request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        connections.append(ws)
+        subscribe = await ws.receive_json()
+        for symbol in subscribe["symbols"]:
+            if symbol in bids:
+                await ws.send_json({"symbol": symbol, "bid": bids[symbol]})
+        if close_after is not None and len(connections) <= close_after:
+            await ws.close()
+            return ws
+        async for _ in ws:
+            pass
+        return ws
+
+    app = web.Application()
+    app.router.add_get("/ws", handler)
+    return app, connections
+
+
+async def wait_for(predicate, timeout=2.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate():
+        if loop.time() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.01)
+
+
+def test_price_book_staleness():
+    book = PriceBook(["BTC/USDT"], stale_after_seconds=0)
+    book.update("BTC/USDT", Decimal("1"))
+    book.update("ETH/USDT", Decimal("2"))  # not subscribed, ignored
+
+    assert book.get_bid("BTC/USDT") is None
+    assert book.get_bid("ETH/USDT") is None
+    assert book.stats()["stale"] == 1
+    assert list(book.stats()["symbols"]) == ["BTC/USDT"]
+
+
+@pytest.mark.asyncio
+async def test_price_stream_fills_book(aiohttp_server):
+    app, _ = make_fake_feed({"BTC/USDT": "50000.5"})
+    server = await aiohttp_server(app)
+
+    book = PriceBook(["BTC/USDT", "ETH/USDT"], stale_after_seconds=10)
+    stream = PriceStreamService(WebSocketTickerSource(str(server.make_url("/ws"))), book)
+    await stream.start()
+    try:
+        await wait_for(lambda: book.get_bid("BTC/USDT") is not None)
+        assert book.get_bid("BTC/USDT") == Decimal("50000.5")
+        stats = stream.stats()
+        assert stats["connected"] is True
+        assert stats["symbols"]["ETH/USDT"] is None
+        assert stats["symbols"]["BTC/USDT"] >= 0
+    finally:
+        await stream.stop()
+
+
+@pytest.mark.asyncio
+async def test_price_stream_reconnects(aiohttp_server):
+    app, connections = make_fake_feed({"BTC/USDT": "1"}, close_after=1)
+    server = await aiohttp_server(app)
+
+    book = PriceBook(["BTC/USDT"], stale_after_seconds=10)
+    stream = PriceStreamService(
+        WebSocketTickerSource(str(server.make_url("/ws"))),
+        book,
+        min_backoff_seconds=0.01,
+    )
+    await stream.start()
+    try:
+        await wait_for(lambda: len(connections) >= 2)
+        assert stream.stats()["reconnects"] >= 1
+    finally:
+        await stream.stop()
@@ -0,0 +1,81 @@
+import asyncio
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+
+from app.db.engine import Base
+from app.repositories.currency_repository import CurrencyRepository
+from app.services.price_writer import PriceWriteBuffer, WriteBufferFull
+
+
+@pytest_asyncio.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", echo=False, future=True)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
+    await engine.dispose()
+
+
+async def count_rows(session_factory) -> int:
+    async with session_factory() as session:
+        _, total = await CurrencyRepository(session).list_paginated(page=1, page_size=1)
+        return total
+
+
+@pytest.mark.asyncio
+async def test_write_buffer_ack_after_flush_batches(session_factory):
+    flushed = []
+    buffer = PriceWriteBuffer(
+        session_factory, flush_interval_seconds=0.05, max_batch=100, on_flush=lambda: flushed.append(1)
+    )
+    await buffer.start()
+    now = datetime(2025, 10, 16, 12, 0, 0)
+
+    results = await asyncio.gather(*[
+        buffer.submit("btc", now, Decimal(i)) for i in range(10)
+    ])
+    assert flushed == [1]
+    await buffer.stop()
+
+    assert all(r["id"] is not None for r in results)
+    assert [r["price"] for r in results] == [str(Decimal(i)) for i in range(10)]
+    stats = buffer.stats()
+    assert stats["flushed_rows"] == 10
+    assert stats["flushes"] == 1
+    assert await count_rows(session_factory) == 10
+
+
+@pytest.mark.asyncio
+async def test_write_buffer_ack_after_enqueue_drains_on_stop(session_factory):
+    buffer = PriceWriteBuffer(session_factory, flush_interval_seconds=10, max_batch=3, ack="enqueue")
+    await buffer.start()
+    now = datetime(2025, 10, 16, 12, 0, 0)
+
+    for i in range(7):
+        result = await buffer.submit("eth", now, Decimal(i))
+        assert result["id"] is None
+
+    await buffer.stop()
+
+    assert await count_rows(session_factory) == 7
+    with pytest.raises(RuntimeError):
+        await buffer.submit("eth", now, Decimal(1))
+
+
+@pytest.mark.asyncio
+async def test_write_buffer_backpressure(session_factory):
+    buffer = PriceWriteBuffer(
+        session_factory, max_queue=1, ack="enqueue", enqueue_timeout_seconds=0.01
+    )
+    # Mark as running without a flusher so the queue never drains
+    buffer._task = asyncio.get_running_loop().create_future()
+    now = datetime(2025, 10, 16, 12, 0, 0)
+
+    await buffer.submit("btc", now, Decimal(1))
+    with pytest.raises(WriteBufferFull):
+        await buffer.submit("btc", now, Decimal(2))
+    assert buffer.stats()["rejected"] == 1
@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.controllers.price_controller import PriceController
+from app.db.engine import Base
+from app.models.candle import Candle
+from app.repositories.candle_repository import CandleRepository
+from app.repositories.currency_repository import CurrencyRepository, HistoryFilter
+from app.services.purge_jobs import DONE, PurgeJobManager
+
+START = datetime(2025, 10, 1)
+
+
+@pytest_asyncio.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
+    async with factory() as session:
+        rows = [("btc", START + timedelta(days=i), Decimal("100") + i) for i in range(15)]
+        rows += [("eth", START + timedelta(days=i), Decimal("10") + i) for i in range(10)]
+        entities = await CurrencyRepository(session).add_many(rows)
+        await CandleRepository(session).apply_ticks((e.id, e.currency, e.date_, e.price) for e in entities)
+        await session.commit()
+    yield factory
+    await engine.dispose()
+
+
+async def remaining(factory, currency=None):
+    async with factory() as session:
+        total, _ = await CurrencyRepository(session).count(flt=HistoryFilter(currency=currency))
+        candles = await session.scalar(
+            select(func.count()).select_from(Candle).where(Candle.currency == currency)
+            if currency else select(func.count()).select_from(Candle)
+        )
+        return total, candles
+
+
+@pytest.mark.asyncio
+async def test_currency_purge_runs_in_batches(session_factory):
+    progress = []
+    manager = PurgeJobManager(session_factory, batch_size=10, pause_seconds=0, on_progress=lambda: progress.append(1))
+    job = manager.submit(HistoryFilter(currency="btc"))
+    await manager.wait(job.id)
+
+    status = job.to_dict()
+    assert status["status"] == DONE
+    assert status["method"] == "batches"
+    assert status["deleted"] == status["total"] == 15
+    assert status["batches"] == 2
+    assert status["rows_per_second"] > 0
+    assert await remaining(session_factory, "btc") == (0, 0)
+    assert (await remaining(session_factory, "eth"))[0] == 10
+    assert len(progress) >= 2
+    assert manager.stats()["rows_deleted"] == 15
+
+
+@pytest.mark.asyncio
+async def test_before_purge_keeps_candles_and_unfiltered_purge_empties(session_factory):
+    manager = PurgeJobManager(session_factory, batch_size=4, pause_seconds=0)
+    _, candles_before = await remaining(session_factory)
+
+    job = manager.submit(HistoryFilter(date_to=START + timedelta(days=5)))
+    await manager.wait(job.id)
+    assert job.deleted == 10
+    total, candles = await remaining(session_factory)
+    assert total == 15
+    assert candles == candles_before
+
+    job = manager.submit()
+    await manager.wait(job.id)
+    assert job.deleted == 15
+    assert await remaining(session_factory) == (0, 0)
+    assert manager.stats()["completed"] == 2
+
+
+@pytest.mark.asyncio
+async def test_purge_endpoints(aiohttp_client, session_factory):
+    manager = PurgeJobManager(session_factory, batch_size=10, pause_seconds=0)
+    controller = PriceController(None, None, purge_jobs=manager)
+
+    app = web.Application()
+    app.router.add_delete("/price/history", controller.delete_history)
+    app.router.add_get("/price/history/purge/{job_id}", controller.get_purge_status)
+    client = await aiohttp_client(app)
+
+    resp = await client.delete("/price/history?currency=ETH&before=2025-10-04T00:00:00Z")
+    assert resp.status == 202
+    job = (await resp.json())["job"]
+    assert job["filter"] == {"currency": "eth", "before": "2025-10-04T00:00:00"}
+    await manager.wait(job["id"])
+
+    resp = await client.get(resp.headers["Location"])
+    assert resp.status == 200
+    job = (await resp.json())["job"]
+    assert job["status"] == "done"
+    assert job["deleted"] == 3
+    assert job["eta_seconds"] is None
+
+    assert (await client.get("/price/history/purge/unknown")).status == 404
+    assert (await client.delete("/price/history?before=yesterday")).status == 400
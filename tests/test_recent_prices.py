@@ -0,0 +1,163 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.controllers.price_controller import PriceController
+from app.db.engine import Base
+from app.repositories.currency_repository import CurrencyRepository
+from app.services.currency_service import CurrencyService
+from app.services.purge_jobs import PurgeJobManager
+from app.services.recent_prices import RecentPrices, utc_now
+
+
+@pytest_asyncio.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
+    await engine.dispose()
+
+
+def test_ring_wraps_and_reports_coverage():
+    now = utc_now().replace(microsecond=0)
+    store = RecentPrices(capacity=5, max_currencies=2)
+    for i in range(8):
+        store.add("BTC", now + timedelta(seconds=i), Decimal("100.5") + i)
+
+    items, complete = store.window("btc", now + timedelta(seconds=4))
+    assert [i["price"] for i in items] == ["104.5", "105.5", "106.5", "107.5"]
+    assert items[0]["date_"] == now + timedelta(seconds=4)
+    assert complete
+    # Ticks 0-2 were overwritten, so a window reaching back to them is incomplete
+    items, complete = store.window("btc", now)
+    assert len(items) == 5
+    assert not complete
+    assert store.stats()["bytes"] == 5 * 16
+
+    store.add("eth", now, Decimal("1"))
+    store.add("sol", now, Decimal("2"))
+    # btc was evicted, so only windows after its last tick are known to be complete
+    assert store.window("btc", now) == ([], False)
+    assert store.window("btc", now + timedelta(seconds=8)) == ([], True)
+    assert store.stats()["evictions"] == 1
+
+
+def test_out_of_order_adds_stay_sorted():
+    now = utc_now().replace(microsecond=0)
+    at = lambda seconds: now + timedelta(seconds=seconds)  # noqa: E731
+    store = RecentPrices(capacity=4)
+    # Requests commit in a different order than their timestamps
+    store.add("btc", at(11), Decimal("11"))
+    store.add("btc", at(10), Decimal("10"))
+    assert [i["price"] for i in store.window("btc", at(11))[0]] == ["11.0"]
+    assert [i["price"] for i in store.window("btc", at(10))[0]] == ["10.0", "11.0"]
+
+    for seconds in (13, 14, 12, 15):
+        store.add("btc", at(seconds), Decimal(seconds))
+    items, complete = store.window("btc", at(0))
+    assert [i["price"] for i in items] == ["12.0", "13.0", "14.0", "15.0"]
+    assert not complete
+    assert store.window("btc", at(12))[1]
+    # Older than everything kept in a full ring: dropped
+    store.add("btc", at(1), Decimal("1"))
+    assert [i["price"] for i in store.window("btc", at(0))[0]] == ["12.0", "13.0", "14.0", "15.0"]
+
+
+def test_windows_are_never_complete_with_other_writers():
+    now = utc_now()
+    store = RecentPrices(capacity=10, single_writer=False)
+    store.add("btc", now, Decimal("1"))
+    items, complete = store.window("btc", now)
+    assert len(items) == 1
+    assert not complete
+    assert store.window("eth", now + timedelta(seconds=1)) == ([], False)
+
+
+def test_drop_before_trims_sorted_rings():
+    now = utc_now().replace(microsecond=0)
+    store = RecentPrices(capacity=4)
+    for i in range(6):
+        store.add("btc", now + timedelta(seconds=i), Decimal(i))
+    store.add("eth", now, Decimal("1"))
+    store.add("eth", now + timedelta(seconds=5), Decimal("2"))
+
+    # btc's ring has wrapped; ticks 2-5 are left and 2-3 go
+    assert store.drop_before(now + timedelta(seconds=4), currency="BTC") == 2
+    assert [i["price"] for i in store.window("btc", now)[0]] == ["4.0", "5.0"]
+    assert len(store.window("eth", now)[0]) == 2
+    assert store.drop_before(now + timedelta(seconds=5)) == 2
+    assert [i["price"] for i in store.window("btc", now)[0]] == ["5.0"]
+    assert [i["price"] for i in store.window("eth", now)[0]] == ["2.0"]
+    store.add("btc", now + timedelta(seconds=6), Decimal("6"))
+    assert [i["price"] for i in store.window("btc", now)[0]] == ["5.0", "6.0"]
+
+
+@pytest.mark.asyncio
+async def test_before_purge_drops_recent_prices(aiohttp_client, session_factory):
+    store = RecentPrices(capacity=10)
+    now = utc_now().replace(microsecond=0)
+    store.add("btc", now - timedelta(minutes=2), Decimal("1"))
+    store.add("btc", now, Decimal("2"))
+    purge_jobs = PurgeJobManager(session_factory, pause_seconds=0)
+    controller = PriceController(None, None, purge_jobs=purge_jobs, recent_prices=store)
+
+    app = web.Application()
+    app.router.add_delete("/price/history", controller.delete_history)
+    client = await aiohttp_client(app)
+    before = (now - timedelta(minutes=1)).isoformat()
+    resp = await client.delete(f"/price/history?before={before}Z")
+    assert resp.status == 202
+    await purge_jobs.wait((await resp.json())["job"]["id"])
+
+    assert [i["price"] for i in store.window("btc", now - timedelta(hours=1))[0]] == ["2.0"]
+
+
+@pytest.mark.asyncio
+async def test_warm_up_and_writes_fill_the_store(session_factory):
+    now = utc_now().replace(microsecond=0)
+    async with session_factory() as session:
+        await CurrencyRepository(session).add_many(
+            [("btc", now - timedelta(hours=2), Decimal("1"))]
+            + [("btc", now - timedelta(minutes=m), Decimal(100 - m)) for m in range(10, 0, -1)]
+        )
+        await session.commit()
+
+    store = RecentPrices(capacity=100)
+    assert await store.warm(session_factory, window_seconds=3600) == 10
+    items, complete = store.window("BTC", now - timedelta(minutes=5))
+    assert [i["price"] for i in items] == ["95.0", "96.0", "97.0", "98.0", "99.0"]
+    assert complete
+    assert not store.window("btc", now - timedelta(hours=3))[1]
+
+    async with session_factory() as session:
+        await CurrencyService(session, 10, recent_prices=store).record_current_price("BTC", Decimal("123.25"))
+    items, _ = store.window("btc", now)
+    assert items[-1]["price"] == "123.25"
+
+
+@pytest.mark.asyncio
+async def test_recent_prices_endpoint(aiohttp_client):
+    store = RecentPrices(capacity=10)
+    now = utc_now()
+    store.add("btc", now - timedelta(minutes=30), Decimal("1"))
+    store.add("btc", now - timedelta(seconds=10), Decimal("2"))
+
+    async def handler(request):
+        return await PriceController(None, None, recent_prices=store).get_recent_prices(request)
+
+    app = web.Application()
+    app.router.add_get("/price/{currency}/recent", handler)
+    client = await aiohttp_client(app)
+
+    data = (await (await client.get("/price/BTC/recent")).json())["data"]
+    assert data["window_seconds"] == 300
+    assert [p["price"] for p in data["prices"]] == ["2.0"]
+    data = (await (await client.get("/price/btc/recent?window=1h")).json())["data"]
+    assert [p["price"] for p in data["prices"]] == ["1.0", "2.0"]
+    assert data["complete"] is False
+    assert (await client.get("/price/btc/recent?window=soon")).status == 400
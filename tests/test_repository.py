@@ -5,7 +5,7 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sess
 from sqlalchemy import text
 
 from app.db.engine import Base
-from app.repositories.currency_repository import CurrencyRepository
+from app.repositories.currency_repository import CurrencyRepository, HistoryFilter
 from datetime import datetime
 
 
@@ -63,3 +63,114 @@ async def test_currency_repository_delete_all(test_session):
     
     items, total = await repo.list_paginated(page=1, page_size=10)
     assert total == 0
+
+
+@pytest.mark.asyncio
+async def test_currency_repository_add_many(test_session):
+    repo = CurrencyRepository(test_session)
+
+    now = datetime.now()
+    entities = await repo.add_many([
+        ("btc", now, Decimal("50000")),
+        ("eth", now, Decimal("3000")),
+    ])
+    await test_session.commit()
+
+    assert [e.currency for e in entities] == ["btc", "eth"]
+    assert all(e.id is not None for e in entities)
+
+    items, total = await repo.list_paginated(page=1, page_size=10)
+    assert total == 2
+
+
+@pytest.mark.asyncio
+async def test_currency_repository_list_after_keyset(test_session):
+    repo = CurrencyRepository(test_session)
+
+    now = datetime(2025, 10, 16, 12, 0, 0)
+    await repo.add_many([("btc", now, Decimal(i)) for i in range(5)])
+    await test_session.commit()
+
+    first = await repo.list_after(after=None, limit=2)
+    assert [e.id for e in first] == [5, 4]
+
+    second = await repo.list_after(after=(first[-1].date_, first[-1].id), limit=2)
+    assert [e.id for e in second] == [3, 2]
+
+    last = await repo.list_after(after=(second[-1].date_, second[-1].id), limit=2)
+    assert [e.id for e in last] == [1]
+
+
+@pytest.mark.asyncio
+async def test_currency_repository_row_counter(test_session):
+    repo = CurrencyRepository(test_session)
+
+    now = datetime.now()
+    await repo.add(currency="btc", date_=now, price=Decimal("1"))
+    await repo.add_many([("eth", now, Decimal("2")), ("sol", now, Decimal("3"))])
+    await test_session.commit()
+
+    assert await repo.count("counter") == (3, False)
+    assert await repo.count("exact") == (3, False)
+    # SQLite has no planner statistics, so estimated falls back to the counter
+    assert await repo.count("estimated") == (3, False)
+
+    await repo.delete_all()
+    await test_session.rollback()
+    assert await repo.count("counter") == (3, False)
+
+    await repo.delete_all()
+    await test_session.commit()
+    assert await repo.count("counter") == (0, False)
+
+
+@pytest.mark.asyncio
+async def test_row_counter_is_striped(test_session):
+    repo = CurrencyRepository(test_session)
+    for i in range(40):
+        await repo.add(currency="btc", date_=datetime(2025, 10, 1, 0, 0, i), price=Decimal("1"))
+    await test_session.commit()
+
+    assert await repo.count("counter") == (40, False)
+    stripes = await test_session.execute(text("SELECT stripe, value FROM row_counts WHERE value <> 0"))
+    # Writers spread over the stripes instead of all updating one row
+    assert len(stripes.all()) > 1
+
+
+@pytest.mark.asyncio
+async def test_currency_repository_history_filter(test_session):
+    repo = CurrencyRepository(test_session)
+
+    await repo.add_many([
+        ("btc", datetime(2025, 10, 1), Decimal("1")),
+        ("btc", datetime(2025, 10, 2), Decimal("2")),
+        ("eth", datetime(2025, 10, 2), Decimal("3")),
+        ("btc", datetime(2025, 10, 3), Decimal("4")),
+    ])
+    await test_session.commit()
+
+    flt = HistoryFilter(currency="btc", date_from=datetime(2025, 10, 2), date_to=datetime(2025, 10, 3))
+    items = await repo.list_page(page=1, page_size=10, flt=flt)
+    assert [(i.currency, i.price) for i in items] == [("btc", Decimal("2"))]
+    assert await repo.count("counter", flt=flt) == (1, False)
+
+    btc = await repo.list_after(after=None, limit=10, flt=HistoryFilter(currency="btc"))
+    assert [i.date_.day for i in btc] == [3, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_currency_repository_delete_before(test_session):
+    repo = CurrencyRepository(test_session)
+
+    await repo.add_many([
+        ("btc", datetime(2025, 9, 30), Decimal("1")),
+        ("btc", datetime(2025, 10, 1), Decimal("2")),
+        ("btc", datetime(2025, 10, 2), Decimal("3")),
+    ])
+    await test_session.commit()
+
+    deleted = await repo.delete_before(datetime(2025, 10, 1))
+    await test_session.commit()
+
+    assert deleted == 1
+    assert await repo.count("counter") == (2, False)
@@ -0,0 +1,108 @@
+import asyncio
+import time
+from decimal import Decimal
+
+import pytest
+
+from app.services.exchange_service import ExchangeService
+from app.services.resilience import (
+    AdaptiveLimiter,
+    CircuitBreaker,
+    CircuitOpenError,
+    ConcurrencyLimitExceeded,
+    ExchangeTimeout,
+)
+from app.services.ticker_cache import TickerCache
+
+
+def test_circuit_breaker_opens_and_probes():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout_seconds=0.05)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+    # Only one probe at a time while half-open
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.stats()["opens"] == 1
+
+
+def test_limiter_aimd():
+    limiter = AdaptiveLimiter(initial_limit=4, min_limit=1, max_limit=8, latency_target_seconds=0.1)
+    limiter._inflight = 1
+    limiter.release(0.5, ok=False)
+    assert limiter.limit == 2
+    for _ in range(10):
+        limiter._inflight = 1
+        limiter.release(0.01, ok=True)
+    assert limiter.limit >= 4
+    limiter._inflight = 1
+    limiter.release(0.01, ok=None)
+    assert limiter.stats()["inflight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_limiter_bounded_queue():
+    limiter = AdaptiveLimiter(initial_limit=1, max_queue=1, queue_timeout_seconds=0.05)
+    await limiter.acquire()
+
+    waiter = asyncio.ensure_future(limiter.acquire())
+    await asyncio.sleep(0)
+    with pytest.raises(ConcurrencyLimitExceeded):
+        await limiter.acquire()
+
+    # ok=None hands the slot over without growing the limit
+    limiter.release(0.01, ok=None)
+    await waiter
+    assert limiter.stats()["inflight"] == 1
+
+    blocked = asyncio.ensure_future(limiter.acquire())
+    with pytest.raises(ConcurrencyLimitExceeded):
+        await blocked
+    assert limiter.stats()["queue_timeouts"] == 1
+    assert limiter.stats()["rejected"] == 1
+
+
+class HangingExchange:
+    def __init__(self):
+        self.calls = 0
+
+    async def fetch_ticker(self, symbol):
+        self.calls += 1
+        await asyncio.sleep(10)
+
+    async def close(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_exchange_times_out_then_fails_fast_and_serves_stale():
+    cache = TickerCache(ttl_seconds=0.01)
+    cache.put("BTC/USDT", Decimal("42"))
+    client = HangingExchange()
+    service = ExchangeService(
+        "kucoin", ticker_cache=cache, clients={"kucoin": client},
+        timeout_seconds=0.01, breaker_failures=2, stale_max_age_seconds=5,
+    )
+    await asyncio.sleep(0.02)
+
+    for _ in range(2):
+        with pytest.raises(ExchangeTimeout):
+            await service.get_bid_price_usdt_pair("btc")
+    with pytest.raises(CircuitOpenError):
+        await service.get_bid_price_usdt_pair("btc")
+    assert client.calls == 2
+
+    bid, age = service.get_stale_bid("btc")
+    assert bid == Decimal("42")
+    assert age > 0
+    stats = service.stats()
+    assert stats["stale_served"] == 1
+    assert stats["backends"]["kucoin"]["breaker"]["state"] == "open"
+    assert stats["backends"]["kucoin"]["limiter"]["inflight"] == 0
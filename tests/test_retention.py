@@ -0,0 +1,191 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import app.services.currency_service as currency_service
+from app.db.engine import Base
+from app.models.candle import Candle
+from app.repositories.candle_repository import CandleRepository
+from app.repositories.currency_repository import CurrencyRepository, HistoryFilter
+from app.services.candle_service import backfill_candles
+from app.services.currency_service import CurrencyService
+from app.services.history_tiers import history_tiers
+from app.services.retention import RetentionCompactor, RetentionPolicy
+
+NOW = datetime(2025, 10, 20, 12, 30)
+START = datetime(2025, 10, 1)
+POLICY = RetentionPolicy(raw_days=7, minute_days=14)
+RAW_CUTOFF = datetime(2025, 10, 13, 12)
+MINUTE_CUTOFF = datetime(2025, 10, 6, 12)
+# One tick per currency every 6 hours, 19 days back from NOW
+TIMES = [START + timedelta(hours=6 * i) for i in range(76)]
+
+
+@pytest_asyncio.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
+    async with factory() as session:
+        rows = []
+        for i, t in enumerate(TIMES):
+            rows += [("btc", t, Decimal("100") + i), ("eth", t, Decimal("10") + i)]
+        entities = await CurrencyRepository(session).add_many(rows)
+        await CandleRepository(session).apply_ticks((e.id, e.currency, e.date_, e.price) for e in entities)
+        await session.commit()
+    yield factory
+    await engine.dispose()
+
+
+def expected(currency=None, date_from=None, date_to=None):
+    """(currency, date_, price) of every tick matching the filter, newest first."""
+    rows = []
+    for i, t in enumerate(TIMES):
+        if (date_from and t < date_from) or (date_to and t >= date_to):
+            continue
+        rows += [("btc", t, Decimal("100") + i), ("eth", t, Decimal("10") + i)]
+    rows = [row for row in rows if currency in (None, row[0])]
+    return sorted(rows, key=lambda row: (row[1], row[0]), reverse=True)
+
+
+async def all_candles(factory):
+    async with factory() as session:
+        candles = await session.scalars(select(Candle))
+        return {(c.currency, c.interval_, c.bucket_start): c.to_dict() for c in candles}
+
+
+async def count_candles(factory, interval):
+    async with factory() as session:
+        return await session.scalar(
+            select(func.count()).select_from(Candle).where(Candle.interval_ == interval)
+        )
+
+
+def test_policy_validation_and_tiers():
+    with pytest.raises(ValueError):
+        RetentionPolicy(raw_days=7, minute_days=3)
+    with pytest.raises(ValueError):
+        RetentionPolicy(minute_days=30)
+    assert not RetentionPolicy().enabled
+
+    tiers = history_tiers(POLICY, HistoryFilter(), NOW)
+    assert [(t.interval, t.date_from, t.date_to) for t in tiers] == [
+        ("", RAW_CUTOFF, None),
+        ("1m", MINUTE_CUTOFF, RAW_CUTOFF),
+        ("1h", None, MINUTE_CUTOFF),
+    ]
+    old = history_tiers(POLICY, HistoryFilter(date_from=START, date_to=datetime(2025, 10, 8)), NOW)
+    assert [(t.interval, t.date_from, t.date_to) for t in old] == [
+        ("1m", MINUTE_CUTOFF, datetime(2025, 10, 8)),
+        ("1h", START, MINUTE_CUTOFF),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_compaction_deletes_expired_rows_in_batches(session_factory):
+    progress = []
+    compactor = RetentionCompactor(
+        session_factory, POLICY, batch_size=20, pause_seconds=0, on_progress=lambda: progress.append(1)
+    )
+    hourly = await count_candles(session_factory, "1h")
+
+    deleted = await compactor.compact(now=NOW)
+
+    raw_expired = 2 * sum(1 for t in TIMES if t < RAW_CUTOFF)
+    minute_expired = 2 * sum(1 for t in TIMES if t < MINUTE_CUTOFF)
+    assert deleted == {"raw": raw_expired, "minute_candles": 2 * minute_expired}
+    assert len(progress) >= raw_expired // 20
+    async with session_factory() as session:
+        total, _ = await CurrencyRepository(session).count(flt=HistoryFilter())
+    assert total == 2 * len(TIMES) - raw_expired
+    assert await count_candles(session_factory, "1m") == 2 * len(TIMES) - minute_expired
+    assert await count_candles(session_factory, "1h") == hourly
+
+    assert await compactor.compact(now=NOW) == {"raw": 0, "minute_candles": 0}
+    assert compactor.stats()["runs"] == 2
+    assert compactor.stats()["raw_deleted"] == raw_expired
+
+
+@pytest.mark.asyncio
+async def test_history_reads_fall_through_to_downsampled_tiers(session_factory, monkeypatch):
+    await RetentionCompactor(session_factory, POLICY, pause_seconds=0).compact(now=NOW)
+    monkeypatch.setattr(currency_service, "utc_now", lambda: NOW)
+
+    for flt in (
+        HistoryFilter(),
+        HistoryFilter(currency="eth"),
+        HistoryFilter(date_from=datetime(2025, 10, 4), date_to=datetime(2025, 10, 15)),
+    ):
+        want = expected(flt.currency, flt.date_from, flt.date_to)
+        async with session_factory() as session:
+            service = CurrencyService(session, page_size=7, total_mode="exact", retention=POLICY)
+            paged, page = [], 1
+            while True:
+                result = await service.get_history(page=page, flt=flt)
+                paged += result.items
+                if page >= result.total_pages:
+                    break
+                page += 1
+            assert result.total == len(want)
+            assert not result.total_estimated
+
+            keyset, cursor = [], None
+            while True:
+                result = await service.get_history_after(cursor=cursor, flt=flt)
+                keyset += result.items
+                cursor = result.next_cursor
+                if cursor is None:
+                    break
+
+        for items in (paged, keyset):
+            assert [(i["currency"], i["date_"], i["price"]) for i in items] == want
+        intervals = {i.get("interval") for i in paged}
+        assert intervals <= {None, "1m", "1h"}
+        assert [i.get("interval") for i in paged] == [
+            None if t >= RAW_CUTOFF else "1m" if t >= MINUTE_CUTOFF else "1h" for _, t, _ in want
+        ]
+
+
+@pytest.mark.asyncio
+async def test_tiered_totals_follow_total_mode_without_full_counts(session_factory, monkeypatch):
+    await RetentionCompactor(session_factory, POLICY, pause_seconds=0).compact(now=NOW)
+    monkeypatch.setattr(currency_service, "utc_now", lambda: NOW)
+    statements = []
+
+    async with session_factory() as session:
+        engine = session.bind.sync_engine
+        listener = lambda conn, cursor, statement, *args: statements.append(statement.lower())  # noqa: E731
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            page = await CurrencyService(session, page_size=7, retention=POLICY).get_history(page=1)
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+
+    assert page.total_estimated
+    # Four evenly spaced ticks a day stay below every bucket cap, so the estimate is exact here
+    assert page.total == 2 * len(TIMES)
+    assert len(page.items) == 7
+    assert not [s for s in statements if "count(" in s]
+
+
+@pytest.mark.asyncio
+async def test_backfill_keeps_compacted_tiers(session_factory):
+    await RetentionCompactor(session_factory, POLICY, pause_seconds=0).compact(now=NOW)
+    before = await all_candles(session_factory)
+    assert {interval for _, interval, start in before if start < RAW_CUTOFF} == {"1m", "5m", "1h", "1d"}
+
+    # Unbounded: only whole days after the raw cutoff are deleted and rebuilt
+    rows = await backfill_candles(session_factory, retention=POLICY, now=NOW)
+    assert rows == 2 * sum(1 for t in TIMES if t >= datetime(2025, 10, 14))
+    assert await all_candles(session_factory) == before
+
+    # Entirely before the cutoff: nothing to rebuild, nothing deleted
+    assert await backfill_candles(
+        session_factory, date_from=START, date_to=datetime(2025, 10, 10), retention=POLICY, now=NOW
+    ) == 0
+    assert await all_candles(session_factory) == before
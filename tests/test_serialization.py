@@ -0,0 +1,37 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from app.services import serialization
+
+
+ROW = {
+    "id": 7,
+    "currency": "btc",
+    "date_": datetime(2025, 10, 16, 12, 0, 5, 123456),
+    "price": Decimal("50000.1200000000"),
+}
+EXPECTED = {"id": 7, "currency": "btc", "date_": "2025-10-16T12:00:05", "price": "50000.1200000000"}
+
+
+def test_dumps_formats_decimal_and_datetime():
+    assert json.loads(serialization.dumps({"items": [ROW]})) == {"items": [EXPECTED]}
+
+
+def test_stdlib_and_orjson_encoders_agree():
+    pytest.importorskip("orjson")
+    assert serialization._orjson_dumps(ROW) == serialization._stdlib_dumps(ROW)
+
+
+def test_dumps_rejects_unknown_types():
+    with pytest.raises(TypeError):
+        serialization._stdlib_dumps({"x": object()})
+
+
+def test_json_response():
+    response = serialization.json_response({"status": "error"}, status=400)
+    assert response.status == 400
+    assert response.content_type == "application/json"
+    assert json.loads(response.body) == {"status": "error"}
@@ -0,0 +1,110 @@
+import os
+
+import pytest
+
+from app.services.metrics_service import MetricsService
+from app.services.shared_metrics import SharedMetricsSegment
+
+
+@pytest.fixture
+def segment(tmp_path):
+    segment = SharedMetricsSegment.create(str(tmp_path / "metrics"), num_slots=4, max_series=2)
+    yield segment
+    segment.close()
+
+
+def test_shared_metrics_aggregates_slots(segment):
+    first = segment.slot(0)
+    first.claim(101)
+    second = segment.slot(1)
+    second.claim(102)
+    worker_a = MetricsService(first)
+    worker_b = MetricsService(second)
+
+    for _ in range(3):
+        worker_a.increment_request_count()
+        worker_a.observe_request("/price/{currency}", "GET", 200, 0.004)
+    worker_b.increment_request_count()
+    worker_b.increment_error_count()
+    worker_b.observe_request("/price/{currency}", "GET", 200, 0.2)
+
+    assert worker_a.get_metrics()["requests_total"] == 3
+
+    cluster = segment.aggregate()
+    assert cluster["requests_total"] == 4
+    assert cluster["errors_total"] == 1
+    assert cluster["workers"]["101"]["requests_total"] == 3
+    assert cluster["workers"]["102"]["errors_total"] == 1
+    snapshot = cluster["latency_seconds"]["/price/{currency}"]["GET"]["2xx"]
+    assert snapshot["count"] == 4
+    assert snapshot["p50"] == 0.005
+    assert snapshot["sum"] == pytest.approx(0.212)
+
+
+def test_shared_metrics_visible_across_fork(segment):
+    pid = os.fork()
+    if pid == 0:
+        try:
+            child = SharedMetricsSegment(segment.path)
+            slot = child.slot(2)
+            slot.claim(os.getpid())
+            metrics = MetricsService(slot)
+            for _ in range(5):
+                metrics.increment_request_count()
+                metrics.observe_request("/health", "GET", 200, 0.001)
+        finally:
+            os._exit(0)
+    os.waitpid(pid, 0)
+
+    cluster = segment.aggregate()
+    assert cluster["requests_total"] == 5
+    assert cluster["workers"][str(pid)]["slot"] == 2
+    assert cluster["latency_seconds"]["/health"]["GET"]["2xx"]["count"] == 5
+
+
+def test_shared_metrics_reclaimed_slot_keeps_counting(segment):
+    slot = segment.slot(0)
+    slot.claim(1)
+    MetricsService(slot).increment_request_count()
+
+    # A restarted worker reopens the same slot and continues from its totals
+    restarted = segment.slot(0)
+    restarted.claim(2)
+    metrics = MetricsService(restarted)
+    metrics.increment_request_count()
+
+    cluster = segment.aggregate()
+    assert cluster["requests_total"] == 2
+    assert list(cluster["workers"]) == ["2"]
+
+
+def test_shared_metrics_series_overflow_falls_back_to_local(segment):
+    slot = segment.slot(0)
+    slot.claim(1)
+    metrics = MetricsService(slot)
+    for route in ("/a", "/b", "/c"):
+        metrics.observe_request(route, "GET", 200, 0.01)
+
+    assert set(metrics.get_metrics()["latency_seconds"]) == {"/a", "/b", "/c"}
+    assert set(segment.aggregate()["latency_seconds"]) == {"/a", "/b"}
+
+
+def test_shared_metrics_rejects_foreign_file(tmp_path):
+    path = tmp_path / "junk"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        SharedMetricsSegment(str(path))
+
+
+def test_metrics_service_reports_cluster(segment):
+    slot = segment.slot(0)
+    slot.claim(55)
+    metrics = MetricsService(slot)
+    metrics.increment_request_count()
+    metrics.observe_request("/health", "GET", 200, 0.003)
+
+    assert metrics.get_metrics()["cluster"]["workers"]["55"]["requests_total"] == 1
+    text = metrics.render_prometheus()
+    assert "app_cluster_requests_total 1" in text
+    assert 'app_worker_requests_total{pid="55",slot="0"} 1' in text
+    assert 'app_cluster_request_duration_seconds_bucket{route="/health",method="GET",status="2xx",le="0.005"} 1' in text
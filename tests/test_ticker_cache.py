@@ -0,0 +1,111 @@
+import asyncio
+from decimal import Decimal
+
+import pytest
+
+from app.services.metrics_service import MetricsService
+from app.services.ticker_cache import TickerCache
+
+
+@pytest.mark.asyncio
+async def test_ticker_cache_hit_after_miss():
+    cache = TickerCache(ttl_seconds=10, max_size=4)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        return Decimal("1.5")
+
+    assert await cache.get_or_fetch("BTC/USDT", fetch) == Decimal("1.5")
+    assert await cache.get_or_fetch("BTC/USDT", fetch) == Decimal("1.5")
+
+    stats = cache.stats()
+    assert calls == 1
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_ticker_cache_coalesces_concurrent_fetches():
+    cache = TickerCache(ttl_seconds=10, max_size=4)
+    calls = 0
+    release = asyncio.Event()
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return Decimal("42")
+
+    tasks = [asyncio.create_task(cache.get_or_fetch("BTC/USDT", fetch)) for _ in range(20)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert calls == 1
+    assert all(r == Decimal("42") for r in results)
+    assert cache.stats()["coalesced"] == 19
+
+
+@pytest.mark.asyncio
+async def test_ticker_cache_expires_entries():
+    cache = TickerCache(ttl_seconds=0.01, max_size=4)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        return Decimal(calls)
+
+    assert await cache.get_or_fetch("BTC/USDT", fetch) == Decimal(1)
+    await asyncio.sleep(0.02)
+    assert await cache.get_or_fetch("BTC/USDT", fetch) == Decimal(2)
+
+
+@pytest.mark.asyncio
+async def test_ticker_cache_lru_eviction():
+    cache = TickerCache(ttl_seconds=10, max_size=2)
+
+    async def fetch():
+        return Decimal("1")
+
+    await cache.get_or_fetch("A/USDT", fetch)
+    await cache.get_or_fetch("B/USDT", fetch)
+    await cache.get_or_fetch("A/USDT", fetch)  # A becomes most recent
+    await cache.get_or_fetch("C/USDT", fetch)  # evicts B
+
+    stats = cache.stats()
+    assert stats["size"] == 2
+    assert stats["evictions"] == 1
+    await cache.get_or_fetch("A/USDT", fetch)
+    assert cache.stats()["hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_ticker_cache_does_not_cache_errors():
+    cache = TickerCache(ttl_seconds=10, max_size=4)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise ValueError("Currency not found")
+        return Decimal("7")
+
+    with pytest.raises(ValueError):
+        await cache.get_or_fetch("X/USDT", fetch)
+    assert await cache.get_or_fetch("X/USDT", fetch) == Decimal("7")
+    assert cache.stats()["inflight"] == 0
+
+
+def test_ticker_cache_stats_in_metrics():
+    cache = TickerCache(ttl_seconds=1, max_size=4)
+    metrics_service = MetricsService()
+    metrics_service.register_collector("ticker_cache", cache.stats)
+
+    metrics = metrics_service.get_metrics()
+
+    assert metrics["ticker_cache"]["hits"] == 0
+    assert metrics["ticker_cache"]["max_size"] == 4
@@ -1,4 +1,6 @@
-from app.services.validation import CurrencyValidator
+from datetime import datetime
+
+from app.services.validation import CurrencyValidator, DateTimeValidator, DurationValidator
 import pytest
 
 
@@ -12,3 +14,30 @@ def test_currency_validator_ok(value):
 def test_currency_validator_bad(value):
     with pytest.raises(ValueError):
         CurrencyValidator.normalize_and_validate(value)
+
+
+@pytest.mark.parametrize("value,expected", [
+    ("2025-10-16T12:00:00", datetime(2025, 10, 16, 12, 0, 0)),
+    ("2025-10-16T12:00:00Z", datetime(2025, 10, 16, 12, 0, 0)),
+    ("2025-10-16T14:00:00+02:00", datetime(2025, 10, 16, 12, 0, 0)),
+    ("2025-10-16", datetime(2025, 10, 16)),
+])
+def test_datetime_validator_ok(value, expected):
+    assert DateTimeValidator.parse_utc_naive(value) == expected
+
+
+@pytest.mark.parametrize("value", ["", "yesterday", "2025-13-01"])
+def test_datetime_validator_bad(value):
+    with pytest.raises(ValueError):
+        DateTimeValidator.parse_utc_naive(value)
+
+
+@pytest.mark.parametrize("value,expected", [("300", 300), ("90s", 90), ("15m", 900), (" 2H ", 7200)])
+def test_duration_validator_ok(value, expected):
+    assert DurationValidator.parse_seconds(value) == expected
+
+
+@pytest.mark.parametrize("value", ["", "0", "-5", "1d", "5 m", "abc"])
+def test_duration_validator_bad(value):
+    with pytest.raises(ValueError):
+        DurationValidator.parse_seconds(value)